@@ -0,0 +1,86 @@
+# benchmarks/bench_control_flow.py
+"""
+Compiles and times sample programs before and after the control-flow pass.
+
+Usage: python benchmarks/bench_control_flow.py [--budget 0.2] [--repeat 3] [programs.c ...]
+"""
+
+import os
+import sys
+import glob
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from lexer import Lexer
+from code_parser import Parser
+from code_generator import CodeGenerator
+from control_flow import ControlFlowObfuscator
+
+PROGRAMS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'programs')
+
+
+def compile_and_time(code, workdir, name, compiler, opt_level, repeat):
+    """
+    Compiles the generated C code and returns (best wall time, exit status).
+    """
+    source_path = os.path.join(workdir, f'{name}.c')
+    binary_path = os.path.join(workdir, name)
+    with open(source_path, 'w') as f:
+        f.write(code)
+    subprocess.run([compiler, opt_level, '-w', '-o', binary_path, source_path], check=True)
+    best = None
+    status = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        status = subprocess.run([binary_path]).returncode
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, status
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('programs', nargs='*', help="C programs to benchmark (defaults to benchmarks/programs)")
+    arg_parser.add_argument('--budget', type=float, default=0.2, help="Control-flow overhead budget")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="Runs per binary; the fastest is kept")
+    arg_parser.add_argument('--compiler', default=os.environ.get('CC', 'cc'))
+    arg_parser.add_argument('--opt-level', default='-O2')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+
+    if shutil.which(args.compiler) is None:
+        print(f"Compiler not found: {args.compiler}")
+        sys.exit(1)
+
+    programs = args.programs or sorted(glob.glob(os.path.join(PROGRAMS_DIR, '*.c')))
+    generator = CodeGenerator()
+    print(f"{'program':<20} {'applied':>7} {'static':>8} {'before (s)':>11} {'after (s)':>10} {'overhead':>9}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for path in programs:
+            name = os.path.splitext(os.path.basename(path))[0]
+            with open(path, 'r') as f:
+                source_code = f.read()
+            # Both variants go through the generator so formatting does not skew the comparison
+            before_code = generator.generate(Parser(Lexer(source_code).tokenize()).parse())
+            ast = Parser(Lexer(source_code).tokenize()).parse()
+            control_flow = ControlFlowObfuscator(budget=args.budget, seed=args.seed)
+            after_code = generator.generate(control_flow.obfuscate(ast))
+
+            before, before_status = compile_and_time(before_code, workdir, f'{name}_before', args.compiler, args.opt_level, args.repeat)
+            after, after_status = compile_and_time(after_code, workdir, f'{name}_after', args.compiler, args.opt_level, args.repeat)
+            if before_status != after_status:
+                print(f"{name}: exit status changed from {before_status} to {after_status}")
+                sys.exit(1)
+
+            static = control_flow.spent / control_flow.baseline_cost if control_flow.baseline_cost else 0.0
+            overhead = (after - before) / before if before else 0.0
+            print(f"{name:<20} {len(control_flow.applied):>7} {static:>8.1%} {before:>11.3f} {after:>10.3f} {overhead:>9.1%}")
+
+
+if __name__ == '__main__':
+    main()
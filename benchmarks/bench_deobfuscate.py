@@ -0,0 +1,73 @@
+# benchmarks/bench_deobfuscate.py
+"""
+Compares AST round-trip deobfuscation with the token-level fast path.
+
+Usage: python benchmarks/bench_deobfuscate.py [--functions 200] [--repeat 5]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from lexer import Lexer
+from code_parser import Parser
+from code_generator import CodeGenerator
+from obfuscator import Obfuscator
+from deobfuscator import Deobfuscator
+
+
+def make_source(functions):
+    parts = []
+    for i in range(functions):
+        parts.append(
+            f"int func_{i}(int left_{i}, int right_{i}) {{\n"
+            f"    int total_{i} = left_{i} * right_{i} + {i};\n"
+            f"    while (total_{i} > 100) {{\n"
+            f"        total_{i} = total_{i} - right_{i};\n"
+            f"    }}\n"
+            f"    return total_{i};\n"
+            f"}}\n\n"
+        )
+    return ''.join(parts)
+
+
+def best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--functions', type=int, default=200)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    obfuscator = Obfuscator()
+    ast = obfuscator.obfuscate(Parser(Lexer(make_source(args.functions)).tokenize()).parse())
+    obf_code = CodeGenerator().generate(ast)
+    deobfuscator = Deobfuscator(obfuscator.identifier_map)
+
+    def via_ast():
+        tree = Parser(Lexer(obf_code).tokenize()).parse()
+        return CodeGenerator().generate(deobfuscator.deobfuscate(tree))
+
+    def via_tokens():
+        return deobfuscator.deobfuscate_source(obf_code)
+
+    ast_time = best_of(args.repeat, via_ast)
+    token_time = best_of(args.repeat, via_tokens)
+    print(f"input: {len(obf_code)} bytes, {len(obfuscator.identifier_map)} identifiers")
+    print(f"AST round trip: {ast_time * 1000:.2f} ms")
+    print(f"token path:     {token_time * 1000:.2f} ms ({ast_time / token_time:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
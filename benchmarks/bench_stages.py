@@ -0,0 +1,148 @@
+# benchmarks/bench_stages.py
+"""
+Times each pipeline stage on a synthetic corpus and compares against a baseline.
+
+Usage: python benchmarks/bench_stages.py [--functions 20] [--statements 30] [--depth 3]
+                                         [--identifiers 64] [--bytes N] [--seed 0] [--repeat 5]
+                                         [--baseline benchmarks/baseline.json] [--threshold 1.25]
+                                         [--update-baseline]
+
+Exits with status 1 if any stage is slower than its baseline by more than the
+threshold factor. Baselines are machine-specific: record one with
+--update-baseline on the machine that runs the comparison.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from lexer import Lexer
+from code_parser import Parser
+from code_generator import CodeGenerator
+from obfuscator import Obfuscator
+from deobfuscator import Deobfuscator
+from synthetic import generate_program
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+STAGES = ['lex', 'parse', 'obfuscate', 'generate', 'deobfuscate']
+
+
+def best_of(repeat, setup, func):
+    """
+    Returns the best time of func(setup()) over repeat runs; setup is not timed.
+    """
+    best = None
+    for _ in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        func(argument)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def time_stages(source_code, repeat):
+    """
+    Times Lexer.tokenize, Parser.parse, Obfuscator.obfuscate,
+    CodeGenerator.generate and Deobfuscator.deobfuscate separately.
+
+    Obfuscation and deobfuscation rename the tree in place, so each run gets
+    a freshly parsed tree outside the timed region.
+
+    Returns:
+        dict: Stage name mapped to its best time in seconds.
+    """
+    tokens = Lexer(source_code).tokenize()
+
+    def parsed():
+        return Parser(tokens).parse()
+
+    obfuscator = Obfuscator()
+    obf_ast = obfuscator.obfuscate(parsed())
+    obf_tokens = Lexer(CodeGenerator().generate(obf_ast)).tokenize()
+    deobfuscator = Deobfuscator(obfuscator.identifier_map)
+
+    return {
+        'lex': best_of(repeat, lambda: source_code, lambda code: Lexer(code).tokenize()),
+        'parse': best_of(repeat, lambda: tokens, lambda toks: Parser(toks).parse()),
+        'obfuscate': best_of(repeat, parsed, lambda ast: Obfuscator().obfuscate(ast)),
+        'generate': best_of(repeat, lambda: obf_ast, lambda ast: CodeGenerator().generate(ast)),
+        'deobfuscate': best_of(repeat, lambda: Parser(obf_tokens).parse(), deobfuscator.deobfuscate),
+    }
+
+
+def compare(timings, baseline, threshold):
+    """
+    Returns the stages slower than threshold times their baseline, as
+    (stage, current seconds, baseline seconds) tuples.
+    """
+    regressions = []
+    for stage in STAGES:
+        reference = baseline['stages'].get(stage)
+        if reference and timings[stage] > reference * threshold:
+            regressions.append((stage, timings[stage], reference))
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--functions', type=int, default=20)
+    arg_parser.add_argument('--statements', type=int, default=30)
+    arg_parser.add_argument('--depth', type=int, default=3)
+    arg_parser.add_argument('--identifiers', type=int, default=64)
+    arg_parser.add_argument('--bytes', type=int, default=None, dest='target_bytes')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    arg_parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    arg_parser.add_argument('--threshold', type=float, default=1.25,
+                            help='Allowed slowdown factor before a stage counts as a regression')
+    arg_parser.add_argument('--update-baseline', action='store_true')
+    args = arg_parser.parse_args()
+
+    config = {
+        'functions': args.functions,
+        'statements': args.statements,
+        'depth': args.depth,
+        'identifiers': args.identifiers,
+        'target_bytes': args.target_bytes,
+        'seed': args.seed,
+    }
+    source_code = generate_program(**config)
+    timings = time_stages(source_code, args.repeat)
+
+    megabytes = len(source_code) / 1e6
+    print(f"corpus: {len(source_code)} bytes, {config['functions']} functions requested")
+    for stage in STAGES:
+        print(f"{stage:<12} {timings[stage] * 1000:9.2f} ms  {megabytes / timings[stage]:7.2f} MB/s")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({'config': config, 'stages': timings}, f, indent=4)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one.")
+        return 0
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get('config') != config:
+        print("Baseline was recorded with different corpus settings; not comparing.")
+        return 0
+
+    regressions = compare(timings, baseline, args.threshold)
+    for stage, current, reference in regressions:
+        print(f"REGRESSION {stage}: {current * 1000:.2f} ms vs baseline {reference * 1000:.2f} ms "
+              f"({current / reference:.2f}x, threshold {args.threshold:.2f}x)")
+    if not regressions:
+        print(f"No stage slower than {args.threshold:.2f}x its baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
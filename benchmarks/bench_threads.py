@@ -0,0 +1,82 @@
+# benchmarks/bench_threads.py
+"""
+Measures obfuscation throughput with one set of pipeline instances shared by a thread pool.
+
+Usage: python benchmarks/bench_threads.py [--files 64] [--functions 5] [--statements 20]
+                                          [--threads 1,2,4,8] [--repeat 3]
+
+Each run pushes the same synthetic files through lex, parse, obfuscate and
+generate using a single Lexer, Parser, Obfuscator and CodeGenerator. On a GIL
+build the pool can only overlap work, so speedups stay near 1x; run it again
+on a free-threaded build (python3.13t or later) to see the stages scale.
+"""
+
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from lexer import Lexer
+from code_parser import Parser
+from code_generator import CodeGenerator
+from obfuscator import Obfuscator
+from synthetic import generate_program
+
+
+def gil_enabled():
+    """
+    Returns whether this interpreter runs with the GIL (always true before 3.13).
+    """
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def run(sources, threads):
+    """
+    Obfuscates every source with a pool of the given size and returns the wall time.
+    """
+    lexer = Lexer()
+    parser = Parser()
+    generator = CodeGenerator()
+    obfuscator = Obfuscator()
+
+    def obfuscate(source):
+        return generator.generate(obfuscator.obfuscate(parser.parse(lexer.tokenize(source))))
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        start = time.perf_counter()
+        for _ in executor.map(obfuscate, sources):
+            pass
+        return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--files', type=int, default=64)
+    arg_parser.add_argument('--functions', type=int, default=5)
+    arg_parser.add_argument('--statements', type=int, default=20)
+    arg_parser.add_argument('--threads', default='1,2,4,8',
+                            help='Comma-separated pool sizes to try')
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    sources = [generate_program(functions=args.functions, statements=args.statements, seed=seed)
+               for seed in range(args.files)]
+    megabytes = sum(len(source) for source in sources) / 1e6
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil_enabled() else 'disabled'}, "
+          f"{os.cpu_count()} CPUs")
+    print(f"corpus: {args.files} files, {megabytes:.2f} MB")
+
+    single = None
+    for threads in [int(count) for count in args.threads.split(',')]:
+        best = min(run(sources, threads) for _ in range(args.repeat))
+        single = single or best
+        print(f"{threads:>3} threads {best * 1000:9.2f} ms  {megabytes / best:7.2f} MB/s  {single / best:5.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
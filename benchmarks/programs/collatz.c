@@ -0,0 +1,28 @@
+// benchmarks/programs/collatz.c
+int steps(int n) {
+    int count = 0;
+    while (n > 1) {
+        int odd = n - n / 2 * 2;
+        if (odd == 1) {
+            n = 3 * n + 1;
+        }
+        if (odd == 0) {
+            n = n / 2;
+        }
+        count = count + 1;
+    }
+    return count;
+}
+
+int main() {
+    int i = 1;
+    int longest = 0;
+    while (i < 100000) {
+        int s = steps(i);
+        if (s > longest) {
+            longest = s;
+        }
+        i = i + 1;
+    }
+    return longest;
+}
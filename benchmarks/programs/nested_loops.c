@@ -0,0 +1,20 @@
+// benchmarks/programs/nested_loops.c
+int main() {
+    int total = 0;
+    int i = 0;
+    if (total == 0) {
+        total = 1;
+    }
+    while (i < 12000) {
+        int j = 0;
+        while (j < 12000) {
+            if (j > i) {
+                total = total + 1;
+            }
+            j = j + 1;
+        }
+        total = total - i / 7;
+        i = i + 1;
+    }
+    return total;
+}
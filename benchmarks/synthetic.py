@@ -0,0 +1,141 @@
+# benchmarks/synthetic.py
+"""
+Generates synthetic C programs restricted to the grammar Parser supports.
+
+Usage: python benchmarks/synthetic.py [--functions 20] [--statements 30] [--depth 3]
+                                      [--identifiers 64] [--bytes N] [--seed 0]
+"""
+
+import random
+import argparse
+
+BINARY_OPERATORS = ['+', '-', '*', '/', '<', '>', '<=', '>=', '==', '!=', '&&', '||']
+UNARY_OPERATORS = ['-', '!']
+
+
+class ProgramGenerator:
+    def __init__(self, statements=30, depth=3, identifiers=64, seed=0):
+        """
+        Initializes a generator of well-formed programs: every variable is
+        declared before use and every call targets an earlier function, so the
+        output also compiles as C.
+
+        Only constructs the parser understands are produced: int functions
+        with parameters, declarations, assignments, if and while blocks,
+        calls, returns, and expressions over the binary and unary operators
+        above. Operators are always surrounded by spaces because the lexer
+        reads runs of operator characters as one token.
+
+        Args:
+            statements (int, optional): Statements per function body, before nesting.
+            depth (int, optional): Maximum nesting of if/while blocks.
+            identifiers (int, optional): Size of the variable name pool shared by all functions.
+            seed (int, optional): Random seed; equal knobs and seed give equal output.
+        """
+        self.statements = statements
+        self.depth = depth
+        self.names = [f"v{i}_{'abcdefghij'[i % 10]}" for i in range(max(identifiers, 3))]
+        self.random = random.Random(seed)
+        self.functions = []
+
+    def expression(self, scope, depth=2):
+        if depth == 0 or self.random.random() < 0.3:
+            if self.random.random() < 0.6:
+                return self.random.choice(scope)
+            return str(self.random.randint(0, 999))
+        choice = self.random.random()
+        if choice < 0.1:
+            operand = self.expression(scope, depth - 1)
+            if ' ' in operand or operand[0] in '-!':
+                # "--x" would lex as a single operator token
+                operand = f"({operand})"
+            return f"{self.random.choice(UNARY_OPERATORS)}{operand}"
+        if choice < 0.2 and self.functions:
+            return self.call(scope, depth - 1)
+        left = self.expression(scope, depth - 1)
+        right = self.expression(scope, depth - 1)
+        operator = self.random.choice(BINARY_OPERATORS)
+        if self.random.random() < 0.3:
+            return f"({left} {operator} {right})"
+        return f"{left} {operator} {right}"
+
+    def call(self, scope, depth=1):
+        name = self.random.choice(self.functions)
+        return f"{name}({self.expression(scope, depth)}, {self.expression(scope, depth)})"
+
+    def block(self, scope, depth, count, indent):
+        pad = '    ' * indent
+        lines = []
+        for _ in range(count):
+            choice = self.random.random()
+            if choice < 0.15 and depth > 0:
+                keyword = 'if' if self.random.random() < 0.6 else 'while'
+                lines.append(f"{pad}{keyword} ({self.expression(scope)}) {{")
+                lines.extend(self.block(scope, depth - 1, max(count // 3, 1), indent + 1))
+                lines.append(f"{pad}}}")
+            elif choice < 0.25 and self.functions:
+                lines.append(f"{pad}{self.call(scope)};")
+            else:
+                lines.append(f"{pad}{self.random.choice(scope)} = {self.expression(scope)};")
+        return lines
+
+    def function(self):
+        """
+        Returns the source of one more function, callable by later ones.
+        """
+        name = f"fn_{len(self.functions)}"
+        params = self.random.sample(self.names, 2)
+        local_count = min(len(self.names) - 2, self.random.randint(2, 6))
+        locals_ = self.random.sample([n for n in self.names if n not in params], local_count)
+        scope = params + locals_
+        lines = [f"int {name}(int {params[0]}, int {params[1]}) {{"]
+        for local in locals_:
+            lines.append(f"    int {local} = {self.expression(params, 1)};")
+        lines.extend(self.block(scope, self.depth, self.statements, 1))
+        lines.append(f"    return {self.expression(scope)};")
+        lines.append("}")
+        self.functions.append(name)
+        return '\n'.join(lines) + '\n\n'
+
+
+def generate_program(functions=20, statements=30, depth=3, identifiers=64, target_bytes=None, seed=0):
+    """
+    Generates one synthetic C program.
+
+    Args:
+        functions (int, optional): Number of functions.
+        statements (int, optional): Statements per function body, before nesting.
+        depth (int, optional): Maximum nesting of if/while blocks.
+        identifiers (int, optional): Size of the variable name pool.
+        target_bytes (int, optional): Keep adding functions until the program
+            is at least this large.
+        seed (int, optional): Random seed.
+
+    Returns:
+        str: The program source.
+    """
+    generator = ProgramGenerator(statements, depth, identifiers, seed)
+    parts = []
+    size = 0
+    while len(parts) < functions or (target_bytes is not None and size < target_bytes):
+        part = generator.function()
+        parts.append(part)
+        size += len(part)
+    return ''.join(parts)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--functions', type=int, default=20)
+    arg_parser.add_argument('--statements', type=int, default=30)
+    arg_parser.add_argument('--depth', type=int, default=3)
+    arg_parser.add_argument('--identifiers', type=int, default=64)
+    arg_parser.add_argument('--bytes', type=int, default=None, dest='target_bytes')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    print(generate_program(args.functions, args.statements, args.depth, args.identifiers,
+                           args.target_bytes, args.seed), end='')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+# src/artifacts.py
+
+import time
+import uuid
+import threading
+from collections import OrderedDict
+
+
+class ArtifactStore:
+    def __init__(self, max_bytes=256 * 1024 * 1024, ttl=15 * 60, clock=time.monotonic):
+        """
+        Initializes an in-memory store for generated downloads.
+
+        Entries are keyed by unique ids, so concurrent users never see each
+        other's archives. The store is bounded twice over: entries untouched
+        for longer than the TTL expire, and when the total size would exceed
+        max_bytes the least recently used entries are evicted. Entries are
+        kept in access order, so both checks only ever look at the oldest end
+        and every operation is O(1) amortized.
+
+        Args:
+            max_bytes (int, optional): Total size of all stored artifacts.
+            ttl (float, optional): Seconds an artifact survives without being accessed.
+            clock (callable, optional): Time source, for tests.
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.total_bytes = 0
+        self.entries = OrderedDict()  # id -> (data, download name, last access)
+        self.lock = threading.Lock()
+
+    def put(self, data, download_name, artifact_id=None):
+        """
+        Stores an artifact, evicting expired and least recently used ones to make room.
+
+        Args:
+            data (bytes): The artifact contents.
+            download_name (str): File name offered to the browser.
+            artifact_id (str, optional): Key to store under, e.g. a job id; a new
+                unique id by default. An existing entry with the same id is replaced.
+
+        Returns:
+            str: The artifact id.
+
+        Raises:
+            ValueError: If the artifact alone is larger than max_bytes.
+        """
+        if len(data) > self.max_bytes:
+            raise ValueError(f"Artifact of {len(data)} bytes exceeds the store limit of {self.max_bytes} bytes.")
+        artifact_id = artifact_id or uuid.uuid4().hex
+        with self.lock:
+            now = self.clock()
+            self._discard(artifact_id)
+            self._expire(now)
+            while self.total_bytes + len(data) > self.max_bytes:
+                self._discard(next(iter(self.entries)))
+            self.entries[artifact_id] = (data, download_name, now)
+            self.total_bytes += len(data)
+        return artifact_id
+
+    def get(self, artifact_id):
+        """
+        Returns (data, download name) for an artifact and marks it recently
+        used, or None if it is unknown, expired or evicted.
+        """
+        with self.lock:
+            now = self.clock()
+            self._expire(now)
+            entry = self.entries.get(artifact_id)
+            if entry is None:
+                return None
+            data, download_name, _ = entry
+            self.entries[artifact_id] = (data, download_name, now)
+            self.entries.move_to_end(artifact_id)
+            return data, download_name
+
+    def __contains__(self, artifact_id):
+        with self.lock:
+            self._expire(self.clock())
+            return artifact_id in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _expire(self, now):
+        # The oldest access is always first, so stop at the first live entry
+        while self.entries:
+            artifact_id, (_, _, accessed) = next(iter(self.entries.items()))
+            if now - accessed < self.ttl:
+                break
+            self._discard(artifact_id)
+
+    def _discard(self, artifact_id):
+        entry = self.entries.pop(artifact_id, None)
+        if entry is not None:
+            self.total_bytes -= len(entry[0])
@@ -0,0 +1,278 @@
+# src/batch.py
+
+import os
+import glob
+import time
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from lexer import Lexer
+from code_parser import Parser
+from code_generator import CodeGenerator
+from control_flow import ControlFlowObfuscator
+from optimizer import Optimizer
+from obfuscator import count_identifiers
+from hooks import StageHooks
+from fileutil import write_atomic
+
+# Set in each worker process by _init_worker and never in the parent. With
+# the fork start method the initializer's arguments are inherited rather than
+# pickled, so workers share the compiled map copy-on-write.
+_worker_deobfuscator = None
+
+
+def _init_worker(deobfuscator):
+    global _worker_deobfuscator
+    _worker_deobfuscator = deobfuscator
+
+
+def deobfuscated_path(file_path, output_dir):
+    """
+    Returns the output path for a deobfuscated file, turning
+    'obfuscated_x.c' into 'deobfuscated_x.c'.
+    """
+    name = os.path.basename(file_path)
+    if name.startswith('obfuscated_'):
+        name = name[len('obfuscated_'):]
+    return os.path.join(output_dir, f"deobfuscated_{name}")
+
+
+def _deobfuscate_file(task, deobfuscator=None):
+    """
+    Worker entry point: deobfuscates one file and reports how it went.
+
+    Args:
+        task (tuple): (file_path, output_dir, via_ast).
+        deobfuscator (Deobfuscator, optional): Defaults to the worker's own.
+
+    Returns:
+        tuple: (file_path, output_path or None, seconds, error message or None).
+    """
+    file_path, output_dir, via_ast = task
+    deobfuscator = deobfuscator if deobfuscator is not None else _worker_deobfuscator
+    start = time.perf_counter()
+    try:
+        with open(file_path, 'r') as f:
+            obf_code = f.read()
+        if via_ast:
+            ast = Parser(Lexer(obf_code).tokenize()).parse()
+            original_code = CodeGenerator().generate(deobfuscator.deobfuscate(ast))
+        else:
+            original_code = deobfuscator.deobfuscate_source(obf_code)
+        output_path = deobfuscated_path(file_path, output_dir)
+        with open(output_path, 'w') as f:
+            f.write(original_code)
+    except Exception as e:
+        return file_path, None, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+    return file_path, output_path, time.perf_counter() - start, None
+
+
+def deobfuscate_files(deobfuscator, file_paths, output_dir='.', jobs=None, via_ast=False):
+    """
+    Deobfuscates many files with a process pool sharing one compiled map.
+
+    A failing file is reported in its result and does not stop the batch.
+
+    Args:
+        deobfuscator (Deobfuscator): The deobfuscator to share with all workers.
+        file_paths (list): Obfuscated files to process.
+        output_dir (str, optional): Where to write the deobfuscated files.
+        jobs (int, optional): Worker processes; defaults to the CPU count.
+        via_ast (bool, optional): Re-parse each file instead of using the token-level path.
+
+    Yields:
+        tuple: (file_path, output_path or None, seconds, error message or None),
+        in completion order.
+    """
+    tasks = [(path, output_dir, via_ast) for path in file_paths]
+    if jobs == 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _deobfuscate_file(task, deobfuscator)
+        return
+
+    # Inherited under fork, pickled once per worker otherwise; never per task
+    with multiprocessing.get_context().Pool(jobs, initializer=_init_worker, initargs=(deobfuscator,)) as pool:
+        yield from pool.imap_unordered(_deobfuscate_file, tasks)
+
+
+def collect_sources(args, extension='.c'):
+    """
+    Expands files, directories (searched recursively) and glob patterns.
+
+    Args:
+        args (list): Paths, directories or glob patterns.
+        extension (str, optional): File extension to pick up inside directories.
+
+    Returns:
+        list: (size, path, relative output path) tuples, largest file first so
+        long files start early and do not straggle at the end of the run.
+    """
+    sources = {}
+    for arg in args:
+        if os.path.isdir(arg):
+            for root, _, files in os.walk(arg):
+                for name in files:
+                    if name.endswith(extension):
+                        path = os.path.join(root, name)
+                        sources[path] = os.path.relpath(path, arg)
+        else:
+            for path in glob.glob(arg, recursive=True) if glob.has_magic(arg) else [arg]:
+                if os.path.isfile(path):
+                    relative = os.path.relpath(path)
+                    sources[path] = relative if not relative.startswith('..') else os.path.basename(path)
+    return sorted(((os.path.getsize(path), path, relative) for path, relative in sources.items()), reverse=True)
+
+
+# Source bytes whose ASTs the declaring scan keeps for the renaming pass.
+# Larger projects re-parse the files beyond it rather than hold every AST.
+SCAN_CACHE_BYTES = 8 * 1024 * 1024
+
+
+def _scan_file(path, hooks, keep):
+    """
+    Lexes and parses one file and returns its identifier counts, the names
+    it declares and, if keep is set, its AST; or None if it does not parse.
+    """
+    counts = Counter()
+    named = set()
+    try:
+        with open(path, 'r') as f:
+            source_code = f.read()
+        with hooks.stage('lex', path=path):
+            tokens = Lexer(source_code).tokenize()
+        with hooks.stage('parse', path=path):
+            ast = Parser(tokens).parse()
+        with hooks.stage('declare', path=path):
+            count_identifiers(ast, counts, named)
+    except Exception:
+        # Reported by the obfuscation pass, which fails on the same file
+        return None
+    return counts, named, ast if keep else None
+
+
+def declare_names(sources, obfuscator, jobs=None, hooks=None, keep_bytes=0):
+    """
+    Adds the names every file declares to the identifier map before any file
+    is renamed.
+
+    A use is only renamed if its name is already mapped, so without this a
+    global declared in one file and read in another would be renamed or not
+    depending on which file a worker finished first. Files are scanned in
+    parallel but merged in the order given, so the result does not depend on
+    scheduling. With a minifying obfuscator this also ranks names by their
+    project-wide frequency.
+
+    Args:
+        sources (list): (size, path, relative path) tuples from collect_sources().
+        obfuscator (Obfuscator): The obfuscator about to process the files.
+        jobs (int, optional): Worker threads; defaults to the CPU count.
+        hooks (StageHooks, optional): Hooks run around each file's stages.
+        keep_bytes (int, optional): Keep the ASTs of files, in the order given,
+            while their total source size stays within this many bytes.
+
+    Returns:
+        dict: The kept ASTs by path; they have not been renamed yet.
+    """
+    hooks = hooks or StageHooks()
+    keep = set()
+    for size, path, _ in sources:
+        if size <= keep_bytes:
+            keep.add(path)
+            keep_bytes -= size
+    counts = Counter()
+    named = set()
+    asts = {}
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+        scans = executor.map(lambda source: _scan_file(source[1], hooks, source[1] in keep), sources)
+        for (_, path, _), scanned in zip(sources, scans):
+            if scanned is not None:
+                counts.update(scanned[0])
+                named.update(scanned[1])
+                if scanned[2] is not None:
+                    asts[path] = scanned[2]
+    obfuscator.declare(counts, named)
+    return asts
+
+
+def _obfuscate_file(path, output_path, obfuscator, ast, cf_budget, hooks, headers, optimize):
+    """
+    Runs one file through lex, parse, obfuscate, generate and write, starting
+    from its AST if the declaring scan kept it. Nothing is kept once the file
+    is written.
+    """
+    start = time.perf_counter()
+    try:
+        if ast is None:
+            with open(path, 'r') as f:
+                source_code = f.read()
+            with hooks.stage('lex', path=path):
+                tokens = Lexer(source_code).tokenize()
+            with hooks.stage('parse', path=path):
+                ast = Parser(tokens).parse()
+        if headers is not None:
+            headers.prepare(path, ast)
+        if optimize:
+            with hooks.stage('optimize', path=path):
+                ast = Optimizer().optimize(ast)
+        if cf_budget is not None:
+            ControlFlowObfuscator(budget=cf_budget).obfuscate(ast)
+        # Names are declared up front, so workers only add to the map under
+        # the obfuscator's own lock
+        with hooks.stage('obfuscate', path=path):
+            obfuscator.obfuscate(ast)
+        with hooks.stage('generate', path=path):
+            obf_code = CodeGenerator().generate(ast)
+        with hooks.stage('write', path=output_path):
+            write_atomic(output_path, obf_code)
+    except Exception as e:
+        return path, None, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+    return path, output_path, time.perf_counter() - start, None
+
+
+def obfuscate_files(sources, output_dir, obfuscator, jobs=None, cf_budget=None, hooks=None, headers=None,
+                    optimize=False):
+    """
+    Streams files through the obfuscation pipeline with a bounded pool.
+
+    Workers are threads because every file adds to the one identifier map
+    held by the shared obfuscator. At most twice as many files as workers
+    are in flight, so peak memory depends on the largest files, not on how
+    many there are. The names of all files are declared first (see
+    declare_names()), so the output does not depend on the order in which
+    workers finish; the ASTs of the first SCAN_CACHE_BYTES of source are
+    kept from that scan so those files are parsed once.
+
+    Args:
+        sources (list): (size, path, relative path) tuples from collect_sources().
+        output_dir (str): Root directory for the obfuscated tree.
+        obfuscator (Obfuscator): Shared obfuscator whose identifier map grows across files.
+        jobs (int, optional): Worker threads; defaults to the CPU count.
+        cf_budget (float, optional): Also run the control-flow pass with this budget.
+        hooks (StageHooks, optional): Hooks run around each file's stages, from
+            the worker thread processing it.
+        headers (HeaderCache, optional): Project mode: process the local
+            headers each file includes, once per header, before the file itself.
+        optimize (bool, optional): Fold constants and drop dead code before obfuscating.
+
+    Yields:
+        tuple: (file_path, output_path or None, seconds, error message or None),
+        in completion order.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    hooks = hooks or StageHooks()
+    asts = declare_names(sources, obfuscator, jobs, hooks, SCAN_CACHE_BYTES)
+    pending = set()
+    remaining = iter(sources)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while True:
+            for _, path, relative in remaining:
+                output_path = os.path.join(output_dir, relative)
+                pending.add(executor.submit(_obfuscate_file, path, output_path, obfuscator, asts.pop(path, None),
+                                            cf_budget, hooks, headers, optimize))
+                if len(pending) >= jobs * 2:
+                    break
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
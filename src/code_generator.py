@@ -1,11 +1,26 @@
+BINARY_NODE_TYPES = {
+    'BIN_OP', 'LogicalOr', 'LogicalAnd', 'Equality',
+    'Relational', 'Additive', 'Multiplicative'
+}
+
 class CodeGenerator:
-    def __init__(self):
-        pass
+    def __init__(self, node_hook=None):
+        """
+        Initializes the CodeGenerator.
+
+        Args:
+            node_hook (callable, optional): Called with every node just before
+                it is emitted, in pre-order. Lets per-node passes such as
+                renaming run during generation instead of in a walk of their own.
+        """
+        self.node_hook = node_hook
 
     def generate(self, ast):
         return self.generate_node(ast)
 
     def generate_node(self, node):
+        if self.node_hook is not None:
+            self.node_hook(node)
         method_name = f'gen_{node.type}'
         method = getattr(self, method_name, self.gen_default)
         return method(node)
@@ -23,15 +38,14 @@ class CodeGenerator:
         return code
 
     def gen_FunctionDeclaration(self, node):
-        return f"{self.generate_node(node.children[0])} {node.value}({self.generate_parameters(node.children[1])}) {{\n{self.generate_node(node.children[2])}}}\n\n"
+        return f"{self.generate_node(node.children[0])} {node.value}({self.generate_node(node.children[1])}) {{\n{self.generate_node(node.children[2])}}}\n\n"
+
+    def gen_FunctionPrototype(self, node):
+        return f"{self.generate_node(node.children[0])} {node.value}({self.generate_node(node.children[1])});\n"
 
-    def generate_parameters(self, node):
-        params = []
-        for param in node.children:
-            param_type = self.generate_node(param.children[0])
-            param_name = param.value
-            params.append(f"{param_type} {param_name}")
-        return ", ".join(params)
+    def gen_Parameter(self, node):
+        param_type = self.generate_node(node.children[0])
+        return f"{param_type} {node.value}"
 
     def gen_ReturnType(self, node):
         return node.value
@@ -40,8 +54,7 @@ class CodeGenerator:
         return node.value
 
     def gen_Parameters(self, node):
-        # Handled separately in gen_FunctionDeclaration
-        return ""
+        return ", ".join(self.generate_node(param) for param in node.children)
 
     def gen_Body(self, node):
         code = ""
@@ -64,25 +77,54 @@ class CodeGenerator:
         return f"{var_name} = {expr};\n"
 
     def gen_BIN_OP(self, node):
-        left = self.generate_node(node.children[0])
+        left = self.generate_operand(node.children[0])
         op = node.value
-        right = self.generate_node(node.children[1])
+        right = self.generate_operand(node.children[1])
         return f"{left} {op} {right}"
 
+    # The parser names binary nodes after their precedence level
+    gen_LogicalOr = gen_BIN_OP
+    gen_LogicalAnd = gen_BIN_OP
+    gen_Equality = gen_BIN_OP
+    gen_Relational = gen_BIN_OP
+    gen_Additive = gen_BIN_OP
+    gen_Multiplicative = gen_BIN_OP
+
+    def generate_operand(self, node):
+        # Parenthesize nested binary expressions so the original grouping survives
+        code = self.generate_node(node)
+        if node.type in BINARY_NODE_TYPES:
+            return f"({code})"
+        return code
+
     def gen_Number(self, node):
         return f"{node.value}"
 
     def gen_String(self, node):
         return f"\"{node.value}\""
 
+    def gen_Char(self, node):
+        # Kept with its quotes, so escapes such as '\n' are emitted unchanged
+        return node.value
+
     def gen_Identifier(self, node):
         return f"{node.value}"
 
     def gen_UnaryOp(self, node):
         op = node.value
-        operand = self.generate_node(node.children[0])
+        operand = self.generate_operand(node.children[0])
+        if node.children[0].type == 'UnaryOp':
+            # "-!x" would lex back as a single "-!" operator
+            operand = f"({operand})"
         return f"{op}{operand}"
 
+    def gen_FunctionCall(self, node):
+        args = ", ".join(self.generate_node(arg) for arg in node.children)
+        return f"{node.value}({args})"
+
+    def gen_FunctionCallStatement(self, node):
+        return f"{self.generate_node(node.children[0])};\n"
+
     def gen_ReturnStatement(self, node):
         if node.children:
             expr = self.generate_node(node.children[0])
@@ -116,6 +158,9 @@ class CodeGenerator:
         return f"{expr};\n"
 
     def gen_PreprocessorDirective(self, node):
-        return f"{node.value}\n"
+        if node.value in {'include', 'define'}:
+            return f"#{node.value} {node.children[0].value}\n"
+        # Unrecognized directives keep their original text
+        return f"{node.children[0].value}\n"
 
     # Add more methods as needed for other AST node types
\ No newline at end of file
@@ -1,9 +1,13 @@
 # src/code_parser.py
 
 import re  # Imported to handle regular expressions in preprocessor directives
+import copy
 from lexer import Lexer, Token
 from collections import namedtuple
 
+INCLUDE_REGEX = re.compile(r'#\s*include\s*(\"[^\"]*\"|<[^>]*>)')
+DEFINE_REGEX = re.compile(r'#\s*define\s+(.*\S)')
+
 class ASTNode:
     def __init__(self, type, value=None, children=None):
         """
@@ -36,39 +40,88 @@ class ASTNode:
             ret += child.__repr__(level + 1)
         return ret
 
-    def to_dict(self):
+    def to_dict(self, depth=None):
         """
         Recursively converts the ASTNode and its children into a dictionary.
         
+        Args:
+            depth (int, optional): Levels of children to include; deeper nodes
+                are left out and only counted. Defaults to the whole tree.
+        
         Returns:
             dict: A dictionary representation of the ASTNode.
         """
+        if depth is not None and depth <= 0:
+            children = []
+        else:
+            next_depth = None if depth is None else depth - 1
+            children = [child.to_dict(next_depth) for child in self.children]
         node_dict = {
             'type': self.type,
             'value': self.value,
-            'children': [child.to_dict() for child in self.children] if self.children else []
+            'child_count': len(self.children),
+            'children': children
         }
         return node_dict
 
+    def hash_tree(self):
+        """
+        Computes Merkle-style structural hashes for this node and all its
+        descendants in one bottom-up pass.
+
+        A node's digest covers its type, its value and the digests of its
+        children in order, so two subtrees have equal digests exactly when they
+        are structurally identical.
+
+        Returns:
+            tuple: (digest bytes, list of child hash trees).
+        """
+        import hashlib  # Only needed for verification and caching; keeps startup lean
+        child_trees = [child.hash_tree() for child in self.children]
+        digest = hashlib.blake2b(f"{self.type}\0{self.value!r}\0".encode(), digest_size=16)
+        for child_digest, _ in child_trees:
+            digest.update(child_digest)
+        return digest.digest(), child_trees
+
+    def structural_hash(self):
+        """
+        Returns the structural digest of this subtree (see hash_tree).
+        """
+        return self.hash_tree()[0]
+
 class Parser:
-    def __init__(self, tokens):
+    def __init__(self, tokens=None):
         """
         Initializes the Parser with a list of tokens.
         
         Args:
-            tokens (list): List of tokens obtained from the Lexer.
+            tokens (list, optional): List of tokens obtained from the Lexer.
         """
-        self.tokens = tokens
+        self.tokens = tokens if tokens is not None else []
         self.position = 0
+        self.ast = None
 
-    def parse(self):
+    def parse(self, tokens=None):
         """
         Initiates the parsing process and returns the root of the AST.
         
+        Each call parses with a cursor of its own, leaving this instance's
+        position alone, so one Parser can be shared between threads.
+        
+        Args:
+            tokens (list, optional): Tokens to parse. Defaults to the
+                constructor's tokens, whose AST is then also kept in self.ast.
+        
         Returns:
             ASTNode: The root node representing the program.
         """
-        return self.program()
+        cursor = copy.copy(self)
+        cursor.position = 0
+        if tokens is not None:
+            cursor.tokens = tokens
+            return cursor.program()
+        self.ast = cursor.program()
+        return self.ast
 
     def program(self):
         """
@@ -141,16 +194,16 @@ class Parser:
             directive (str): The preprocessor directive (e.g., '#include <stdio.h>').
         
         Returns:
-            tuple: A tuple containing the directive type and its associated value.
-        """
-        if directive.startswith('#include'):
-            match = re.match(r'#\s*include\s*[\"<](.*)[\">]', directive)
-            if match:
-                return 'include', match.group(1)
-        elif directive.startswith('#define'):
-            parts = directive.split(maxsplit=2)
-            if len(parts) >= 3:
-                return 'define', ' '.join(parts[1:])
+            tuple: A tuple containing the directive type and its associated value
+            (e.g., ('include', '<stdio.h>') or ('define', 'SIZE 10')).
+        """
+        match = INCLUDE_REGEX.match(directive)
+        if match:
+            # Keep the delimiters: "x.h" is searched for locally, <x.h> is not
+            return 'include', match.group(1)
+        match = DEFINE_REGEX.match(directive)
+        if match:
+            return 'define', match.group(1)
         return 'unknown', directive
 
     def declaration(self):
@@ -181,7 +234,7 @@ class Parser:
 
     def function_declaration(self):
         """
-        Parses a function declaration.
+        Parses a function declaration, or a prototype if it ends in ';'.
         
         Returns:
             ASTNode: The AST node representing the function declaration.
@@ -191,6 +244,13 @@ class Parser:
         self.consume('LPAREN')  # Consume '('
         parameters = self.parameter_list()
         self.consume('RPAREN')  # Consume ')'
+        if self.current_token().type == 'SEMICOLON':
+            # A prototype, as found in headers
+            self.consume('SEMICOLON')
+            return ASTNode('FunctionPrototype', value=func_name, children=[
+                ASTNode('ReturnType', value=return_type),
+                ASTNode('Parameters', children=parameters)
+            ])
         self.consume('LBRACE')  # Consume '{'
         body = []
         while not self.current_token().type == 'RBRACE':
@@ -416,6 +476,9 @@ class Parser:
         elif token.type == 'STRING':
             self.consume('STRING')
             return ASTNode('String', value=token.value)
+        elif token.type == 'CHAR':
+            self.consume('CHAR')
+            return ASTNode('Char', value=token.value)
         elif token.type == 'IDENT':
             next_token = self.peek_token()
             if next_token.type == 'LPAREN':
@@ -481,10 +544,11 @@ class Parser:
 
     def get_parse_tree(self):
         """
-        Converts the AST into a JSON-serializable dictionary.
+        Converts the AST into a JSON-serializable dictionary, parsing first if
+        parse() has not been called yet.
         
         Returns:
             dict: The parse tree in dictionary format.
         """
-        ast_root = self.parse()
+        ast_root = self.ast if self.ast is not None else self.parse()
         return ast_root.to_dict()
\ No newline at end of file
@@ -0,0 +1,175 @@
+# src/control_flow.py
+
+import random
+import logging
+from code_parser import ASTNode
+
+logger = logging.getLogger(__name__)
+
+# Nodes that only describe program structure and cost nothing at runtime
+STRUCTURAL_NODE_TYPES = {
+    'Program', 'FunctionDeclaration', 'FunctionPrototype', 'ReturnType', 'Parameters',
+    'Parameter', 'Type', 'Body', 'Then', 'Assignment', 'PreprocessorDirective', 'Value'
+}
+
+
+class ControlFlowObfuscator:
+    def __init__(self, budget=0.2, loop_weight=10, seed=None):
+        """
+        Initializes the control-flow pass.
+
+        Args:
+            budget (float, optional): Allowed estimated overhead as a fraction of the
+                program's own estimated cost (0.2 means at most 20% extra work).
+            loop_weight (int, optional): Assumed iteration count of every 'while' loop,
+                used to scale the cost of anything evaluated inside one.
+            seed (int, optional): Seed for the choice of opaque-predicate variables.
+        """
+        self.budget = budget
+        self.loop_weight = loop_weight
+        self.random = random.Random(seed)
+        self.baseline_cost = 0
+        self.spent = 0
+        self.applied = []
+
+    def obfuscate(self, ast):
+        """
+        Inserts opaque predicates and bogus branches into 'if' and 'while' statements,
+        cheapest candidates first, until the overhead budget is used up.
+
+        Every call gets the full budget. baseline_cost, spent and applied
+        describe the most recent call; concurrent calls each see their own
+        totals while running.
+
+        Args:
+            ast (ASTNode): The root node of the AST.
+
+        Returns:
+            ASTNode: The transformed AST.
+        """
+        baseline_cost = self.estimate_cost(ast)
+        allowance = baseline_cost * self.budget
+        spent = 0
+        applied = []
+        candidates = []
+        self._collect_candidates(ast, set(), 1, candidates)
+        # Stable sort keeps traversal order among equally priced candidates
+        candidates.sort(key=lambda candidate: candidate[0])
+        for cost, kind, node, names in candidates:
+            if spent + cost > allowance:
+                continue
+            getattr(self, f'_apply_{kind}')(node, self.random.choice(names))
+            spent += cost
+            applied.append((kind, cost))
+            logger.debug("Applied %s to %s at estimated cost %s.", kind, node.type, cost)
+        logger.debug("Control-flow pass spent %s of %.1f (baseline %s).", spent, allowance, baseline_cost)
+        self.baseline_cost, self.spent, self.applied = baseline_cost, spent, applied
+        return ast
+
+    def estimate_cost(self, node, weight=1):
+        """
+        Statically estimates the runtime cost of a subtree as the number of
+        evaluated nodes, with everything inside a loop scaled by loop_weight.
+
+        Args:
+            node (ASTNode): The subtree to estimate.
+            weight (int, optional): How many times the subtree is expected to run.
+
+        Returns:
+            int: The estimated cost.
+        """
+        cost = 0 if node.type in STRUCTURAL_NODE_TYPES else weight
+        if node.type == 'WhileStatement':
+            # The condition runs once more than the body; both scale per iteration
+            weight *= self.loop_weight
+        for child in node.children:
+            cost += self.estimate_cost(child, weight)
+        return cost
+
+    def _collect_candidates(self, node, scope, weight, candidates):
+        """
+        Walks the AST tracking the 'int' variables in scope and records every
+        transform that could be applied, together with its estimated cost.
+
+        Args:
+            node (ASTNode): The current AST node.
+            scope (set): Names of 'int' variables visible and definitely
+                initialized at this node.
+            weight (int): Expected executions of this node.
+            candidates (list): Receives (cost, kind, node, names) tuples.
+        """
+        if node.type == 'FunctionDeclaration':
+            params = {param.value for param in node.children[1].children
+                      if param.children[0].value == 'int'}
+            self._collect_block(node.children[2], scope | params, weight, candidates)
+        elif node.type in {'Program', 'Body', 'Then'}:
+            self._collect_block(node, scope, weight, candidates)
+        elif node.type == 'IfStatement':
+            if scope:
+                names = sorted(scope)
+                predicate_cost = self.estimate_cost(self._opaque_predicate(names[0], True), weight)
+                candidates.append((predicate_cost, 'opaque_predicate', node, names))
+                candidates.append((predicate_cost, 'bogus_branch', node, names))
+            # The parser builds an IfStatement from a condition and a Then
+            # block only; there is no Else branch to collect.
+            self._collect_block(node.children[1], set(scope), weight, candidates)
+        elif node.type == 'WhileStatement':
+            loop_weight = weight * self.loop_weight
+            if scope:
+                names = sorted(scope)
+                predicate_cost = self.estimate_cost(self._opaque_predicate(names[0], True), loop_weight)
+                candidates.append((predicate_cost, 'opaque_predicate', node, names))
+            self._collect_block(node.children[1], set(scope), loop_weight, candidates)
+
+    def _collect_block(self, block, scope, weight, candidates):
+        """
+        Collects candidates from a sequence of statements, adding 'int'
+        declarations to the scope as they appear. Only initialized ones are
+        added (globals always are), since reading any other is undefined.
+        """
+        for stmt in block.children:
+            self._collect_candidates(stmt, scope, weight, candidates)
+            if stmt.type == 'Declaration' and stmt.children[0].value == 'int' \
+                    and (len(stmt.children) > 1 or block.type == 'Program'):
+                scope.add(stmt.value)
+
+    def _apply_opaque_predicate(self, node, name):
+        # cond  ->  (cond) && <always true>
+        node.children[0] = ASTNode('LogicalAnd', '&&', [
+            node.children[0],
+            self._opaque_predicate(name, True)
+        ])
+
+    def _apply_bogus_branch(self, node, name):
+        # Prepend a branch guarded by an always-false predicate to the 'then' block
+        junk = ASTNode('AssignmentStatement', value=name, children=[
+            ASTNode('Additive', '+', [ASTNode('Identifier', value=name), ASTNode('Number', value=1)])
+        ])
+        node.children[1].children.insert(0, ASTNode('IfStatement', children=[
+            self._opaque_predicate(name, False),
+            ASTNode('Then', children=[junk])
+        ]))
+
+    def _opaque_predicate(self, name, truth):
+        """
+        Builds r * (r * r - 1) == 0 with r = x - x / 2 * 2, the remainder of
+        x divided by 2. C truncates the quotient, so r is -1, 0 or 1 and the
+        product is always 0. No intermediate value can overflow, whatever x is.
+
+        Args:
+            name (str): The 'int' variable to build the predicate over.
+            truth (bool): Build the always-true (==) or always-false (!=) form.
+
+        Returns:
+            ASTNode: The predicate expression.
+        """
+        def remainder():
+            halved = ASTNode('Multiplicative', '/', [ASTNode('Identifier', value=name), ASTNode('Number', value=2)])
+            doubled = ASTNode('Multiplicative', '*', [halved, ASTNode('Number', value=2)])
+            return ASTNode('Additive', '-', [ASTNode('Identifier', value=name), doubled])
+        square = ASTNode('Multiplicative', '*', [remainder(), remainder()])
+        cube_minus = ASTNode('Multiplicative', '*', [
+            remainder(),
+            ASTNode('Additive', '-', [square, ASTNode('Number', value=1)])
+        ])
+        return ASTNode('Equality', '==' if truth else '!=', [cube_minus, ASTNode('Number', value=0)])
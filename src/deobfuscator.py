@@ -1,6 +1,20 @@
 # src/deobfuscator.py
 
+import re
+import sys
 import logging
+from lexer import Lexer
+from obfuscator import NAMING_NODE_TYPES, USING_NODE_TYPES
+
+logger = logging.getLogger(__name__)
+
+# The only nodes the obfuscator renames. Others, such as String, Type and
+# Number, may hold text equal to an obfuscated name and must stay as they are.
+IDENTIFIER_NODE_TYPES = NAMING_NODE_TYPES | USING_NODE_TYPES
+
+# Characters that may continue an identifier; used for boundary checks
+IDENT_CHARS = rb'A-Za-z0-9_'
+IDENT_BYTES = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_'
 
 class Deobfuscator:
     def __init__(self, identifier_map):
@@ -8,11 +22,26 @@ class Deobfuscator:
         Initializes the Deobfuscator with a reverse mapping.
 
         Args:
-            identifier_map (dict): A dictionary mapping original identifiers to obfuscated names.
+            identifier_map (dict or MappedIdentifierMap): A mapping of original identifiers to obfuscated names.
         """
         # Create a reverse mapping: obfuscated_name -> original_name
-        self.reverse_map = {v: k for k, v in identifier_map.items()}
-        logging.debug(f"Reverse Identifier Map: {self.reverse_map}")  # Logging Statement
+        if hasattr(identifier_map, 'reverse_view'):
+            # Binary maps already carry a sorted reverse section; look up lazily
+            self.reverse_map = identifier_map.reverse_view()
+        else:
+            self.reverse_map = {v: k for k, v in identifier_map.items()}
+        logger.debug("Reverse Identifier Map: %s", self.reverse_map)  # Logging Statement
+        self._matcher = None
+
+    def update(self, identifier_map):
+        """
+        Adds entries to the reverse mapping, e.g. as a shared obfuscator's map grows.
+
+        Args:
+            identifier_map (dict): New original-to-obfuscated entries.
+        """
+        self.reverse_map.update((v, k) for k, v in identifier_map.items())
+        self._matcher = None
 
     def deobfuscate(self, ast):
         """
@@ -27,6 +56,32 @@ class Deobfuscator:
         self._deobfuscate_node(ast)
         return ast
 
+    def deobfuscate_source(self, source_code):
+        """
+        Restores original names directly in the source text, skipping the
+        parser and code generator.
+
+        Identifiers are located with the lexer's regex in a single pass and
+        replaced in place, so formatting and comments are preserved and files
+        the parser cannot handle are still deobfuscated.
+
+        Args:
+            source_code (str): The obfuscated source code.
+
+        Returns:
+            str: The deobfuscated source code.
+        """
+        pieces = []
+        last = 0
+        for start, end, name in Lexer(source_code).identifier_spans():
+            original_name = self.reverse_map.get(name)
+            if original_name is not None:
+                pieces.append(source_code[last:start])
+                pieces.append(original_name)
+                last = end
+        pieces.append(source_code[last:])
+        return ''.join(pieces)
+
     def _deobfuscate_node(self, node):
         """
         Recursively traverses the AST and replaces obfuscated identifiers.
@@ -34,13 +89,135 @@ class Deobfuscator:
         Args:
             node (ASTNode): The current AST node.
         """
-        # Check if the current node contains an identifier to deobfuscate
-        if hasattr(node, 'value') and node.value in self.reverse_map:
-            original_name = self.reverse_map[node.value]
-            logging.debug(f"Deobfuscating '{node.value}' to '{original_name}'")  # Logging Statement
-            node.value = original_name
+        self.visit_node(node)
 
         # If the node has children, traverse them recursively
         for child in getattr(node, 'children', []):
             if child:
-                self._deobfuscate_node(child)
\ No newline at end of file
+                self._deobfuscate_node(child)
+
+    def visit_node(self, node):
+        """
+        Restores the original name held by a single node, without recursing,
+        so a Pipeline can apply it as the code generator emits each node.
+
+        Args:
+            node (ASTNode): The node to rename.
+        """
+        # Check if the current node holds an identifier to deobfuscate
+        if node.type in IDENTIFIER_NODE_TYPES and node.value in self.reverse_map:
+            original_name = self.reverse_map[node.value]
+            logger.debug("Deobfuscating '%s' to '%s'", node.value, original_name)  # Logging Statement
+            node.value = original_name
+
+    def compile_matcher(self):
+        """
+        Compiles the reverse map into a single matcher for arbitrary text.
+
+        Every obfuscated name is a whole identifier, so one regex that finds
+        identifier-shaped words (bounded to the shortest and longest name
+        lengths) plus a hash lookup matches all map entries at once, with the
+        same cost whether the map holds ten entries or a million. Binary maps
+        are searched in place rather than copied into a dict.
+
+        Returns:
+            tuple: (compiled bytes pattern, lookup function taking and
+            returning bytes, length of the longest obfuscated name).
+        """
+        if self._matcher is None:
+            if hasattr(self.reverse_map, 'get_bytes'):
+                lookup = self.reverse_map.get_bytes
+                shortest, longest = self.reverse_map.key_lengths() or (1, 1)
+            else:
+                lookup = {k.encode(): v.encode() for k, v in self.reverse_map.items()}.get
+                lengths = [len(name.encode()) for name in self.reverse_map] or [1]
+                shortest, longest = min(lengths), max(lengths)
+            pattern = re.compile(
+                rb'(?<![%s])([A-Za-z_][%s]{%d,%d})(?![%s])'
+                % (IDENT_CHARS, IDENT_CHARS, shortest - 1, longest - 1, IDENT_CHARS)
+            )
+            self._matcher = (pattern, lookup, longest)
+        return self._matcher
+
+    def deobfuscate_bytes(self, data):
+        """
+        Replaces obfuscated names anywhere in a block of text.
+
+        Args:
+            data (bytes): Text such as log lines, stack traces or symbol listings.
+
+        Returns:
+            bytes: The text with original names restored.
+        """
+        pattern, lookup, _ = self.compile_matcher()
+        parts = pattern.split(data)
+        # split() puts every matched identifier at an odd index
+        names = parts[1::2]
+        parts[1::2] = map(lookup, names, names)
+        return b''.join(parts)
+
+    def deobfuscate_stream(self, infile, outfile, chunk_size=1 << 20):
+        """
+        Deobfuscates a binary stream in chunks, so memory use is bounded by
+        chunk_size plus the longest obfuscated name regardless of input size.
+
+        Names never span a non-identifier byte, so each chunk is replaced up
+        to its last one and only a trailing partial name is carried over. A
+        run of identifier characters longer than any obfuscated name can never
+        match, so it is written out unchanged as it arrives.
+
+        Args:
+            infile: Binary file object to read from.
+            outfile: Binary file object to write to.
+            chunk_size (int, optional): Bytes read per iteration.
+        """
+        _, _, longest = self.compile_matcher()
+        pending = b''
+        # Whether the last byte written is inside a name too long to be in the map
+        in_long_name = False
+        while True:
+            chunk = infile.read(chunk_size)
+            if not chunk:
+                break
+            if in_long_name:
+                rest = chunk.lstrip(IDENT_BYTES)
+                outfile.write(chunk[:len(chunk) - len(rest)])
+                chunk = rest
+                if not chunk:
+                    continue
+                in_long_name = False
+            chunk = pending + chunk
+            cut = len(chunk.rstrip(IDENT_BYTES))
+            outfile.write(self.deobfuscate_bytes(chunk[:cut]))
+            pending = chunk[cut:]
+            if len(pending) > longest:
+                outfile.write(pending)
+                pending = b''
+                in_long_name = True
+        if pending:
+            outfile.write(self.deobfuscate_bytes(pending))
+
+def main():
+    """
+    Streams files (or stdin) to stdout with obfuscated names restored.
+
+    Usage: python deobfuscator.py <identifier_map.json|.cidmap> [file ...]
+    """
+    if len(sys.argv) < 2:
+        print("Usage: python deobfuscator.py <identifier_map.json|.cidmap> [file ...]", file=sys.stderr)
+        sys.exit(1)
+
+    from identifier_map import load_identifier_map
+    deobfuscator = Deobfuscator(load_identifier_map(sys.argv[1]))
+
+    out = sys.stdout.buffer
+    if len(sys.argv) == 2:
+        deobfuscator.deobfuscate_stream(sys.stdin.buffer, out)
+    for path in sys.argv[2:]:
+        with open(path, 'rb') as f:
+            deobfuscator.deobfuscate_stream(f, out)
+    out.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# src/deobfuscator_cache.py
+
+import sys
+import hashlib
+import threading
+from collections import OrderedDict
+from deobfuscator import Deobfuscator
+from identifier_map import decode_identifier_map
+
+
+def map_digest(map_bytes):
+    """
+    Returns the cache key for an identifier map: a digest of its exact bytes.
+    """
+    return hashlib.blake2b(map_bytes, digest_size=16).hexdigest()
+
+
+def estimate_size(deobfuscator, map_bytes):
+    """
+    Estimates the memory a deobfuscator keeps alive, in bytes.
+
+    A dict reverse map is counted as the dict plus every key and value string;
+    a binary map is searched in place, so it costs the map bytes themselves.
+    """
+    reverse_map = deobfuscator.reverse_map
+    if not isinstance(reverse_map, dict):
+        return len(map_bytes)
+    size = sys.getsizeof(reverse_map)
+    for obfuscated, original in reverse_map.items():
+        size += sys.getsizeof(obfuscated) + sys.getsizeof(original)
+    return size
+
+
+class DeobfuscatorCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        """
+        Initializes a bounded cache of ready-to-use deobfuscators.
+
+        Deobfuscators are keyed by a digest of the map bytes they were built
+        from, so uploading the same map again skips decoding it and building
+        the reverse map. Each entry is charged its estimated size, and the
+        least recently used entries are evicted to stay under max_bytes.
+        Cached deobfuscators are shared, so callers must not modify them.
+
+        Args:
+            max_bytes (int, optional): Total estimated size of all cached deobfuscators.
+        """
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()  # digest -> (deobfuscator, estimated size)
+        self.lock = threading.Lock()
+
+    def get(self, map_bytes):
+        """
+        Returns the deobfuscator for a map, building and caching it on a miss.
+
+        A map whose deobfuscator alone would exceed max_bytes is still
+        returned, just not cached.
+
+        Args:
+            map_bytes (bytes): A JSON or binary identifier map.
+
+        Returns:
+            tuple: (Deobfuscator, True if it came from the cache).
+
+        Raises:
+            ValueError: If the bytes are not a valid identifier map.
+        """
+        digest = map_digest(map_bytes)
+        with self.lock:
+            entry = self.entries.get(digest)
+            if entry is not None:
+                self.entries.move_to_end(digest)
+                self.hits += 1
+                return entry[0], True
+            self.misses += 1
+
+        # Built outside the lock; two concurrent misses on one map both build it
+        deobfuscator = Deobfuscator(decode_identifier_map(map_bytes))
+        size = estimate_size(deobfuscator, map_bytes)
+        if size > self.max_bytes:
+            return deobfuscator, False
+        with self.lock:
+            self._discard(digest)
+            while self.total_bytes + size > self.max_bytes:
+                self._discard(next(iter(self.entries)))
+            self.entries[digest] = (deobfuscator, size)
+            self.total_bytes += size
+        return deobfuscator, False
+
+    def lookup(self, digest):
+        """
+        Returns the cached deobfuscator for a map digest (see map_digest()),
+        or None, without building anything.
+        """
+        with self.lock:
+            entry = self.entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(digest)
+            self.hits += 1
+            return entry[0]
+
+    def __contains__(self, map_bytes):
+        return map_digest(map_bytes) in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _discard(self, digest):
+        entry = self.entries.pop(digest, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
@@ -0,0 +1,54 @@
+# src/fileutil.py
+
+import os
+import tempfile
+import threading
+
+_umask_lock = threading.Lock()
+
+
+def current_umask():
+    """
+    Returns the process umask without changing it.
+
+    Linux reports it in /proc; elsewhere the only way to read it also sets
+    it, so the read-and-restore is done under a lock.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except OSError:
+        pass
+    with _umask_lock:
+        umask = os.umask(0o077)
+        os.umask(umask)
+    return umask
+
+
+def write_atomic(path, text):
+    """
+    Writes a file so readers only ever see the old or the complete new
+    contents: the text goes to a temporary file in the same directory,
+    which then replaces the target.
+
+    The file keeps the mode of the one it replaces; a new file gets the mode
+    a normal open() would give it.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_', suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        # mkstemp creates owner-only files
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~current_umask()
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
@@ -0,0 +1,82 @@
+# src/hooks.py
+
+import time
+from contextlib import contextmanager
+
+# The stages main.py reports; other callers may use their own names (e.g. 'zip')
+STAGES = ('declare', 'lex', 'parse', 'optimize', 'obfuscate', 'generate', 'write')
+
+
+class StageHook:
+    """
+    Base class for objects notified around pipeline stages. Subclasses
+    override whichever of the two methods they need.
+    """
+
+    def before_stage(self, stage, info):
+        """
+        Called just before a stage runs.
+
+        Args:
+            stage (str): Stage name, e.g. 'lex'.
+            info (dict): Context given by the caller (such as 'path'); shared
+                with after_stage, so hooks may stash their own entries in it.
+        """
+
+    def after_stage(self, stage, info):
+        """
+        Called when a stage finishes, whether or not it raised. info also holds
+        'seconds' (wall time of the stage) and 'error' (the exception or None).
+        """
+
+
+class StageHooks:
+    def __init__(self, hooks=None):
+        """
+        Initializes an ordered set of hooks run around each pipeline stage.
+
+        Args:
+            hooks (list, optional): StageHook instances to register.
+        """
+        self.hooks = list(hooks or [])
+
+    def register(self, hook):
+        """
+        Adds a hook and returns it.
+        """
+        self.hooks.append(hook)
+        return hook
+
+    def unregister(self, hook):
+        self.hooks.remove(hook)
+
+    @contextmanager
+    def stage(self, name, **info):
+        """
+        Runs the with-block as the named stage: before_stage hooks in
+        registration order, then the block, then after_stage hooks in reverse
+        order. With no hooks registered this costs a single check.
+
+        Args:
+            name (str): Stage name.
+            **info: Context passed to the hooks.
+
+        Yields:
+            dict: The info dict passed to the hooks.
+        """
+        if not self.hooks:
+            yield info
+            return
+        for hook in self.hooks:
+            hook.before_stage(name, info)
+        info['error'] = None
+        start = time.perf_counter()
+        try:
+            yield info
+        except BaseException as e:
+            info['error'] = e
+            raise
+        finally:
+            info['seconds'] = time.perf_counter() - start
+            for hook in reversed(self.hooks):
+                hook.after_stage(name, info)
@@ -0,0 +1,277 @@
+# src/identifier_map.py
+
+import os
+import sys
+import json
+import mmap
+import struct
+
+# File layout (all integers little-endian):
+#   header   MAGIC, entry count, then byte offsets of the three sections below
+#   entries  count x (original offset, original length, obfuscated offset, obfuscated length)
+#   forward  count x entry index, sorted by original name
+#   reverse  count x entry index, sorted by obfuscated name
+#   strings  UTF-8 names referenced by the entries table
+MAGIC = b'CIDMAP1\0'
+HEADER = struct.Struct('<8sIQQQ')
+ENTRY = struct.Struct('<IIII')
+INDEX = struct.Struct('<I')
+
+
+def write_binary_map(identifier_map, filepath):
+    """
+    Writes an identifier map in the sorted binary format.
+
+    Args:
+        identifier_map (dict): Original identifiers mapped to obfuscated names.
+        filepath (str): Destination path.
+    """
+    pool = bytearray()
+    entries = []
+    for original, obfuscated in identifier_map.items():
+        original, obfuscated = original.encode(), obfuscated.encode()
+        entries.append((original, obfuscated, len(pool), len(pool) + len(original)))
+        pool += original + obfuscated
+    # UTF-8 byte order matches code point order, so lookups can compare raw bytes
+    forward = sorted(range(len(entries)), key=lambda i: entries[i][0])
+    reverse = sorted(range(len(entries)), key=lambda i: entries[i][1])
+
+    entries_offset = HEADER.size
+    forward_offset = entries_offset + ENTRY.size * len(entries)
+    reverse_offset = forward_offset + INDEX.size * len(entries)
+    strings_offset = reverse_offset + INDEX.size * len(entries)
+
+    with open(filepath, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(entries), forward_offset, reverse_offset, strings_offset))
+        for original, obfuscated, original_offset, obfuscated_offset in entries:
+            f.write(ENTRY.pack(original_offset, len(original), obfuscated_offset, len(obfuscated)))
+        f.write(struct.pack(f'<{len(forward)}I', *forward))
+        f.write(struct.pack(f'<{len(reverse)}I', *reverse))
+        f.write(pool)
+
+
+class MappedIdentifierMap:
+    """
+    Read-only view of a binary identifier map.
+
+    The file is memory-mapped and nothing is decoded up front: every lookup
+    is a binary search over the sorted index, so opening a map with millions
+    of entries costs the same as opening one with ten.
+    """
+
+    def __init__(self, buffer, filepath=None, _reverse=False):
+        """
+        Args:
+            buffer: An mmap or bytes object holding the binary map.
+            filepath (str, optional): Path the buffer was mapped from, used for pickling.
+
+        Raises:
+            ValueError: If the buffer is not a binary map, or is truncated
+                so that its sections or names point past its end.
+        """
+        if len(buffer) < HEADER.size:
+            raise ValueError("Truncated binary identifier map.")
+        magic, count, forward_offset, reverse_offset, strings_offset = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a binary identifier map.")
+        # Each section must fit between the end of the one before it and the end of the buffer
+        if not (HEADER.size + ENTRY.size * count <= forward_offset
+                and forward_offset + INDEX.size * count <= reverse_offset
+                and reverse_offset + INDEX.size * count <= strings_offset <= len(buffer)):
+            raise ValueError("Corrupt binary identifier map: sections overlap or are truncated.")
+        self._buffer = buffer
+        self._filepath = filepath
+        self._count = count
+        self._strings_offset = strings_offset
+        self._forward_offset = forward_offset
+        self._reverse_offset = reverse_offset
+        self._reverse = _reverse
+        self._index_offset = reverse_offset if _reverse else forward_offset
+        if count:
+            # Names are written in entry order, so the last one ends the file
+            self._entry(count - 1)
+
+    @classmethod
+    def open(cls, filepath):
+        """
+        Memory-maps a binary identifier map file.
+        """
+        with open(filepath, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, filepath)
+
+    def reverse_view(self):
+        """
+        Returns a view over the same file that maps obfuscated names back to originals.
+        """
+        return MappedIdentifierMap(self._buffer, self._filepath, _reverse=not self._reverse)
+
+    def _entry(self, index):
+        original_offset, original_length, obfuscated_offset, obfuscated_length = ENTRY.unpack_from(
+            self._buffer, HEADER.size + ENTRY.size * index)
+        start = self._strings_offset
+        if start + max(original_offset + original_length, obfuscated_offset + obfuscated_length) > len(self._buffer):
+            raise ValueError("Corrupt binary identifier map: name out of range.")
+        original = self._buffer[start + original_offset:start + original_offset + original_length]
+        obfuscated = self._buffer[start + obfuscated_offset:start + obfuscated_offset + obfuscated_length]
+        return (obfuscated, original) if self._reverse else (original, obfuscated)
+
+    def _sorted_entry(self, position):
+        index, = INDEX.unpack_from(self._buffer, self._index_offset + INDEX.size * position)
+        if index >= self._count:
+            raise ValueError("Corrupt binary identifier map: index entry out of range.")
+        return self._entry(index)
+
+    def get(self, key, default=None):
+        if not isinstance(key, str):
+            return default
+        value = self.get_bytes(key.encode())
+        return default if value is None else value.decode()
+
+    def get_bytes(self, key, default=None):
+        """
+        Looks up a UTF-8 encoded name and returns the encoded value, so
+        callers working on bytes skip decoding entirely.
+        """
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            name, value = self._sorted_entry(mid)
+            if name < key:
+                low = mid + 1
+            elif name > key:
+                high = mid
+            else:
+                return value
+        return default
+
+    def key_lengths(self):
+        """
+        Returns the byte lengths of the shortest and longest keys, read from
+        the entries table without touching the names themselves.
+
+        Returns:
+            tuple: (shortest, longest), or None if the map is empty.
+        """
+        if not self._count:
+            return None
+        field = 3 if self._reverse else 1  # Obfuscated or original length
+        with memoryview(self._buffer) as view:
+            entries = view[HEADER.size:HEADER.size + ENTRY.size * self._count]
+            lengths = [entry[field] for entry in ENTRY.iter_unpack(entries)]
+            entries.release()
+        return min(lengths), max(lengths)
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for position in range(self._count):
+            yield self._sorted_entry(position)[0].decode()
+
+    def keys(self):
+        return iter(self)
+
+    def values(self):
+        for position in range(self._count):
+            yield self._sorted_entry(position)[1].decode()
+
+    def items(self):
+        for position in range(self._count):
+            name, value = self._sorted_entry(position)
+            yield name.decode(), value.decode()
+
+    def __repr__(self):
+        return f"<MappedIdentifierMap {self._count} entries{' (reverse)' if self._reverse else ''}>"
+
+    def __reduce__(self):
+        # mmap objects cannot be pickled; re-open the file (or copy the bytes) instead
+        if self._filepath is not None:
+            return (_reopen, (self._filepath, self._reverse))
+        return (MappedIdentifierMap, (bytes(self._buffer), None, self._reverse))
+
+
+def _reopen(filepath, reverse):
+    mapped = MappedIdentifierMap.open(filepath)
+    return mapped.reverse_view() if reverse else mapped
+
+
+def is_binary_map(filepath):
+    with open(filepath, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def load_identifier_map(filepath):
+    """
+    Loads an identifier map in either format: binary maps are memory-mapped
+    lazily, JSON maps are read into a dict.
+
+    Args:
+        filepath (str): Path to a .json or binary map file.
+
+    Returns:
+        dict or MappedIdentifierMap: Original identifiers mapped to obfuscated names.
+    """
+    if is_binary_map(filepath):
+        return MappedIdentifierMap.open(filepath)
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
+
+def decode_identifier_map(map_bytes):
+    """
+    Decodes an identifier map held in memory, such as an upload.
+
+    Args:
+        map_bytes (bytes): A JSON or binary map.
+
+    Returns:
+        dict or MappedIdentifierMap: Original identifiers mapped to obfuscated
+        names; binary maps are searched in place and no dict is built.
+
+    Raises:
+        ValueError: If the bytes are neither a valid JSON nor a valid binary map.
+    """
+    if map_bytes.startswith(MAGIC):
+        return MappedIdentifierMap(map_bytes)
+    identifier_map = json.loads(map_bytes.decode('utf-8'))
+    if not isinstance(identifier_map, dict):
+        raise ValueError("Identifier map must be a JSON object.")
+    return identifier_map
+
+
+def json_to_binary(json_path, binary_path):
+    with open(json_path, 'r') as f:
+        write_binary_map(json.load(f), binary_path)
+
+
+def binary_to_json(binary_path, json_path):
+    mapped = MappedIdentifierMap.open(binary_path)
+    with open(json_path, 'w') as f:
+        json.dump(dict(mapped.items()), f, indent=4)
+
+
+def main():
+    """
+    Usage: python identifier_map.py to-binary <map.json> <map.cidmap>
+           python identifier_map.py to-json <map.cidmap> <map.json>
+    """
+    commands = {'to-binary': json_to_binary, 'to-json': binary_to_json}
+    if len(sys.argv) != 4 or sys.argv[1] not in commands:
+        print(main.__doc__.strip())
+        sys.exit(1)
+    commands[sys.argv[1]](sys.argv[2], sys.argv[3])
+    print(f"Wrote {os.path.abspath(sys.argv[3])}")
+
+
+if __name__ == "__main__":
+    main()
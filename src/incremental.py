@@ -0,0 +1,142 @@
+# src/incremental.py
+
+import os
+import json
+from collections import OrderedDict
+from code_parser import ASTNode
+from obfuscator import count_identifiers
+from pipeline import Pipeline
+from fileutil import write_atomic
+
+
+def _copy_tree(node):
+    return ASTNode(node.type, node.value, [_copy_tree(child) for child in node.children])
+
+
+class FragmentCache:
+    def __init__(self, path=None, config=None, max_entries=10000):
+        """
+        Initializes a store of generated code for top-level AST nodes, keyed
+        by the structural hash of the node before obfuscation.
+
+        Each fragment also records the original-to-obfuscated names it was
+        generated with (None for names it left alone), so it is only reused
+        while the identifier map still agrees with it.
+
+        Args:
+            path (str, optional): JSON file the cache is loaded from and saved
+                to; in memory only by default.
+            config (optional): JSON-serializable settings the fragments depend
+                on, such as the control-flow budget. A saved cache made with
+                other settings is discarded.
+            max_entries (int, optional): Fragments kept; the least recently
+                used are dropped first.
+        """
+        self.path = path
+        self.config = config
+        self.max_entries = max_entries
+        self.fragments = OrderedDict()  # digest -> {'code': str, 'names': {original: obfuscated or None}}
+        self.changed = False
+        if path is not None and os.path.exists(path):
+            with open(path, 'r') as f:
+                saved = json.load(f)
+            if saved.get('config') == config:
+                self.fragments.update(saved['fragments'])
+
+    def lookup(self, digest, identifier_map):
+        """
+        Returns the cached code for a node, or None if there is none or the
+        identifier map has since changed for a name the fragment uses.
+        """
+        fragment = self.fragments.get(digest)
+        if fragment is None:
+            return None
+        for original, obfuscated in fragment['names'].items():
+            if identifier_map.get(original) != obfuscated:
+                return None
+        self.fragments.move_to_end(digest)
+        return fragment['code']
+
+    def store(self, digest, code, names):
+        self.fragments[digest] = {'code': code, 'names': names}
+        self.fragments.move_to_end(digest)
+        while len(self.fragments) > self.max_entries:
+            self.fragments.popitem(last=False)
+        self.changed = True
+
+    def save(self):
+        """
+        Writes the cache to its file if anything was stored since the last save.
+        """
+        if self.path is None or not self.changed:
+            return
+        write_atomic(self.path, json.dumps({'config': self.config, 'fragments': self.fragments}))
+        self.changed = False
+
+
+class IncrementalGenerator:
+    def __init__(self, obfuscator, cache=None, passes=()):
+        """
+        Initializes a generator that only obfuscates and generates the
+        top-level declarations (chiefly functions) that are not cached yet.
+
+        Unchanged functions cost a structural hash and a lookup, so an edit
+        costs work in proportion to the functions it touches rather than to
+        the whole file. Lexing and parsing still cover the whole file.
+
+        Changed declarations are renamed on a copy, so an AST can be kept and
+        generated again after the identifier map has grown.
+
+        Args:
+            obfuscator (Obfuscator): The obfuscator whose identifier map the
+                fragments must agree with.
+            cache (FragmentCache, optional): Where fragments are kept; a new
+                in-memory cache by default.
+            passes (list, optional): Whole-tree passes (such as the
+                control-flow pass) run on each changed declaration first.
+        """
+        self.obfuscator = obfuscator
+        self.cache = cache if cache is not None else FragmentCache()
+        self.passes = list(passes)
+        self.reused = 0
+        self.regenerated = 0
+        self.unmapped = set()
+
+    def generate(self, ast):
+        """
+        Obfuscates and generates a parsed program, reusing cached fragments.
+
+        The AST is left as parsed. 'reused' and 'regenerated' count the
+        declarations of the most recent call, and 'unmapped' holds the names
+        it used but left alone because they were not in the identifier map.
+
+        Args:
+            ast (ASTNode): The 'Program' root from the Parser.
+
+        Returns:
+            str: The generated code, the same as regenerating the whole file.
+        """
+        self.reused = 0
+        self.regenerated = 0
+        self.unmapped = set()
+        code = []
+        for node in ast.children:
+            digest = node.structural_hash().hex()
+            fragment = self.cache.lookup(digest, self.obfuscator.identifier_map)
+            if fragment is None:
+                fragment = self._regenerate(node, digest)
+                self.regenerated += 1
+            else:
+                self.reused += 1
+            names = self.cache.fragments[digest]['names']
+            self.unmapped.update(name for name, obfuscated in names.items() if obfuscated is None)
+            code.append(fragment)
+        return ''.join(code)
+
+    def _regenerate(self, node, digest):
+        originals = list(count_identifiers(node))
+        # A one-declaration program, so the passes and the renaming see only this node
+        fragment = Pipeline(self.passes + [self.obfuscator]).apply(ASTNode('Program', children=[_copy_tree(node)]))
+        identifier_map = self.obfuscator.identifier_map
+        self.cache.store(digest, fragment, {name: identifier_map.get(name) for name in originals})
+        return fragment
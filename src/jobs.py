@@ -0,0 +1,213 @@
+# src/jobs.py
+
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from lexer import Lexer
+from code_parser import Parser
+from obfuscator import Obfuscator
+from code_generator import CodeGenerator
+from deobfuscator_cache import DeobfuscatorCache
+from metrics import timed
+
+# Each worker process keeps the deobfuscators of the maps it has seen, so a
+# job for a known map ships only its digest. Created on first use in the
+# worker; the web process never fills it.
+WORKER_CACHE_BYTES = 64 * 1024 * 1024
+_worker_deobfuscators = None
+
+
+class InputError(Exception):
+    """Raised by a job whose submitted code cannot be lexed or parsed."""
+
+
+class MapNotCached(Exception):
+    """Raised by a job sent only a map digest to a worker that lacks the map."""
+
+
+def parse_input(source_code, timings):
+    """
+    Lexes and parses submitted code, reporting failures as InputError so they
+    can be told apart from faults in the pipeline itself.
+    """
+    try:
+        with timed(timings, 'lex'):
+            tokens = Lexer(source_code).tokenize()
+        with timed(timings, 'parse'):
+            return Parser(tokens).parse()
+    except RuntimeError as e:
+        raise InputError(str(e)) from None
+
+
+def run_obfuscation(source_code):
+    """
+    Worker entry point: runs the obfuscation pipeline on one source file.
+
+    Returns:
+        dict: The obfuscated code, identifier map and per-stage timings.
+
+    Raises:
+        InputError: If the source cannot be lexed or parsed.
+    """
+    timings = {}
+    ast = parse_input(source_code, timings)
+    obfuscator = Obfuscator()
+    with timed(timings, 'obfuscate'):
+        obfuscator.obfuscate(ast)
+    with timed(timings, 'generate'):
+        obf_code = CodeGenerator().generate(ast)
+    return {'obf_code': obf_code, 'identifier_map': obfuscator.identifier_map, 'timings': timings}
+
+
+def worker_deobfuscator(digest, map_bytes=None):
+    """
+    Returns this worker's deobfuscator for a map, building it from map_bytes
+    on a miss.
+
+    Raises:
+        MapNotCached: If the map is not cached and map_bytes is None.
+        ValueError: If map_bytes is not a valid identifier map.
+    """
+    global _worker_deobfuscators
+    if _worker_deobfuscators is None:
+        _worker_deobfuscators = DeobfuscatorCache(max_bytes=WORKER_CACHE_BYTES)
+    deobfuscator = _worker_deobfuscators.lookup(digest)
+    if deobfuscator is None:
+        if map_bytes is None:
+            raise MapNotCached(digest)
+        deobfuscator, _ = _worker_deobfuscators.get(map_bytes)
+    return deobfuscator
+
+
+def run_deobfuscation(obf_code, digest, map_bytes=None, preserve_formatting=False):
+    """
+    Worker entry point: restores original names in one obfuscated file.
+
+    Args:
+        obf_code (str): The obfuscated source.
+        digest (str): map_digest() of the file's identifier map.
+        map_bytes (bytes, optional): The map itself; may be left out when
+            the workers are expected to have it cached already.
+        preserve_formatting (bool, optional): Replace names in the text
+            instead of re-parsing it.
+
+    Returns:
+        dict: The deobfuscated code and per-stage timings.
+
+    Raises:
+        InputError: If the code cannot be lexed or parsed.
+        MapNotCached: If map_bytes is None and this worker lacks the map.
+    """
+    timings = {}
+    deobfuscator = worker_deobfuscator(digest, map_bytes)
+    if preserve_formatting:
+        with timed(timings, 'deobfuscate'):
+            original_code = deobfuscator.deobfuscate_source(obf_code)
+    else:
+        ast = parse_input(obf_code, timings)
+        with timed(timings, 'deobfuscate'):
+            deobfuscator.deobfuscate(ast)
+        with timed(timings, 'generate'):
+            original_code = CodeGenerator().generate(ast)
+    return {'original_code': original_code, 'timings': timings}
+
+
+class QueueFull(Exception):
+    """Raised when the job queue is at capacity and the caller should retry later."""
+
+
+class JobQueue:
+    def __init__(self, max_workers=2, max_pending=8, max_finished=100):
+        """
+        Initializes a local job queue backed by a process pool.
+
+        Args:
+            max_workers (int, optional): Worker processes running pipelines.
+            max_pending (int, optional): Jobs allowed to be queued or running at once;
+                further submissions raise QueueFull.
+            max_finished (int, optional): Finished jobs kept for status/result polling;
+                the oldest are forgotten first.
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self._executor = None
+
+    def _pool(self):
+        # Created on first use so importing the app never forks
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def submit(self, kind, func, *args, fallback=None):
+        """
+        Queues a job.
+
+        Args:
+            kind (str): 'obfuscate' or 'deobfuscate', reported back with the result.
+            func (callable): Top-level worker function.
+            *args: Arguments for func.
+            fallback (tuple, optional): Arguments to run func with instead if
+                the job raises MapNotCached; the job stays running meanwhile.
+
+        Returns:
+            str: The new job id.
+
+        Raises:
+            QueueFull: If max_pending jobs are already queued or running.
+        """
+        with self.lock:
+            pending = sum(1 for job in self.jobs.values() if not job['future'].done())
+            if pending >= self.max_pending:
+                raise QueueFull()
+            job_id = uuid.uuid4().hex
+            job = self.jobs[job_id] = {'kind': kind, 'future': self._pool().submit(func, *args)}
+            if fallback is not None:
+                job['fallback'] = (func, fallback)
+            self._forget_old_jobs()
+        if fallback is not None:
+            # Outside the lock: the callback runs at once if the job already finished
+            job['future'].add_done_callback(lambda future: self._retry(job, future))
+        return job_id
+
+    def _retry(self, job, future):
+        with self.lock:
+            func, args = job.pop('fallback')
+            if future.cancelled() or not isinstance(future.exception(), MapNotCached) \
+                    or self._executor is None:
+                return
+            job['future'] = self._executor.submit(func, *args)
+
+    def _forget_old_jobs(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job['future'].done()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def status(self, job_id):
+        """
+        Returns 'queued', 'running', 'done', 'failed', or None for unknown jobs.
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            future = job['future']
+            retrying = 'fallback' in job
+        if future.running() or (retrying and future.done()):
+            return 'running'
+        if not future.done():
+            return 'queued'
+        return 'failed' if future.exception() else 'done'
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -5,52 +5,76 @@ from collections import namedtuple
 
 Token = namedtuple('Token', ['type', 'value', 'line', 'column'])
 
+KEYWORDS = frozenset({'if', 'else', 'while', 'return', 'int', 'float', 'void', 'char', 'double', 'include', 'define'})
+TOKEN_SPECIFICATION = [
+    ('COMMENT',        r'//.*|/\*[\s\S]*?\*/'),       # Single-line and multi-line comments
+    ('PREPROCESSOR',   r'\#\s*include\s*["<][^">\n]+[">]|\#\s*define\s+[^\n]+'),  # Preprocessor directives
+    ('NUMBER',         r'\d+(\.\d*)?'),               # Integer or decimal number
+    ('IDENT',          r'[A-Za-z_]\w*'),              # Identifiers
+    ('DOT',            r'\.'),          # Member access operator
+    ('OP',             r'[+\-*/%=<>!&|]+'),           # Operators
+    ('LPAREN',         r'\('),                         # Left Parenthesis
+    ('RPAREN',         r'\)'),                         # Right Parenthesis
+    ('LBRACE',         r'\{'),                         # Left Brace
+    ('RBRACE',         r'\}'),                         # Right Brace
+    ('SEMICOLON',      r';'),                          # Semicolon
+    ('COMMA',          r','),                          # Comma
+    ('STRING',         r'"(?:\\.|[^"\\])*"'),          # String literals, with escapes
+    ('CHAR',           r"'(?:\\.|[^'\\])'"),           # Character literals
+    ('NEWLINE',        r'\n'),                         # Line endings
+    ('SKIP',           r'[ \t]+'),                     # Skip spaces and tabs
+    ('MISMATCH',       r'.'),                          # Any other character
+]
+# Compiled once per process and shared by every Lexer instance
+TOKEN_REGEX = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in TOKEN_SPECIFICATION))
+
 class Lexer:
-    def __init__(self, source_code):
+    def __init__(self, source_code=''):
         self.source = source_code
         self.tokens = []
-        self.keywords = {'if', 'else', 'while', 'return', 'int', 'float', 'void', 'char', 'double', 'include', 'define'}
-        self.token_specification = [
-            ('COMMENT',        r'//.*|/\*[\s\S]*?\*/'),       # Single-line and multi-line comments
-            ('PREPROCESSOR',   r'\#\s*(include|define)\s+["<][^">]+[">]'),  # Preprocessor directives
-            ('NUMBER',         r'\d+(\.\d*)?'),               # Integer or decimal number
-            ('IDENT',          r'[A-Za-z_]\w*'),              # Identifiers
-            ('DOT',            r'\.'),          # Member access operator
-            ('OP',             r'[+\-*/%=<>!&|]+'),           # Operators
-            ('LPAREN',         r'\('),                         # Left Parenthesis
-            ('RPAREN',         r'\)'),                         # Right Parenthesis
-            ('LBRACE',         r'\{'),                         # Left Brace
-            ('RBRACE',         r'\}'),                         # Right Brace
-            ('SEMICOLON',      r';'),                          # Semicolon
-            ('COMMA',          r','),                          # Comma
-            ('STRING',         r'\".*?\"'),                    # String literals
-            ('NEWLINE',        r'\n'),                         # Line endings
-            ('SKIP',           r'[ \t]+'),                     # Skip spaces and tabs
-            ('MISMATCH',       r'.'),                          # Any other character
-        ]
-        # Compile the regex patterns into a pattern object
-        self.token_regex = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in self.token_specification))
-
-    def tokenize(self):
+        self.keywords = KEYWORDS
+        self.token_specification = TOKEN_SPECIFICATION
+        self.token_regex = TOKEN_REGEX
+
+    def tokenize(self, source_code=None):
+        """
+        Splits source code into tokens.
+
+        All scanning state is local to the call, so repeated calls return the
+        same tokens and one Lexer can tokenize many sources, from several
+        threads at once.
+
+        Args:
+            source_code (str, optional): Text to tokenize. Defaults to the
+                constructor's source, whose tokens are then also kept in
+                self.tokens.
+
+        Returns:
+            list: The tokens, ending with an EOF token.
+        """
+        tokens = []
         line_num = 1
         line_start = 0
-        for mo in self.token_regex.finditer(self.source):
+        column = 0
+        for mo in self.token_regex.finditer(self.source if source_code is None else source_code):
             kind = mo.lastgroup
             value = mo.group()
             column = mo.start() - line_start
             if kind == 'NUMBER':
                 value = float(value) if '.' in value else int(value)
-                self.tokens.append(Token(kind, value, line_num, column))
+                tokens.append(Token(kind, value, line_num, column))
             elif kind == 'IDENT':
                 if value in self.keywords:
                     kind = value.upper()
-                self.tokens.append(Token(kind, value, line_num, column))
+                tokens.append(Token(kind, value, line_num, column))
             elif kind in {'OP', 'LPAREN', 'RPAREN', 'LBRACE', 'RBRACE', 'SEMICOLON', 'COMMA'}:
-                self.tokens.append(Token(kind, value, line_num, column))
+                tokens.append(Token(kind, value, line_num, column))
             elif kind == 'STRING':
-                self.tokens.append(Token(kind, value[1:-1], line_num, column))  # Remove quotes
+                tokens.append(Token(kind, value[1:-1], line_num, column))  # Remove quotes
+            elif kind == 'CHAR':
+                tokens.append(Token(kind, value, line_num, column))
             elif kind == 'PREPROCESSOR':
-                self.tokens.append(Token(kind, value, line_num, column))
+                tokens.append(Token(kind, value, line_num, column))
             elif kind == 'NEWLINE':
                 line_num += 1
                 line_start = mo.end()
@@ -58,5 +82,24 @@ class Lexer:
                 continue  # Skip spaces, tabs, and comments
             elif kind == 'MISMATCH':
                 raise RuntimeError(f'{value!r} unexpected on line {line_num}')
-        self.tokens.append(Token('EOF', '', line_num, column))
-        return self.tokens
\ No newline at end of file
+        tokens.append(Token('EOF', '', line_num, column))
+        if source_code is None:
+            self.tokens = tokens
+        return tokens
+
+    def identifier_spans(self):
+        """
+        Yields the position of every non-keyword identifier in the source.
+
+        Unlike tokenize(), unknown characters are skipped instead of raising, so
+        this also works on partial files and constructs the parser rejects.
+        Comments, string and character literals are matched as a whole and never yielded.
+
+        Yields:
+            tuple: (start, end, name) offsets into the source text.
+        """
+        for mo in self.token_regex.finditer(self.source):
+            if mo.lastgroup == 'IDENT':
+                value = mo.group()
+                if value not in self.keywords:
+                    yield mo.start(), mo.end(), value
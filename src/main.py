@@ -1,20 +1,208 @@
 from lexer import Lexer
 from code_parser import Parser
 from obfuscator import Obfuscator
-from deobfuscator import Deobfuscator
 from code_generator import CodeGenerator
+from hooks import StageHooks
 import sys
 import os
-import json
+import glob
+import argparse
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python main.py <source_file1.c> <source_file2.c> ...")
+# Everything else is imported where it is used, so a plain obfuscation run
+# only pays for the modules on its own path.
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Obfuscate C source files.")
+    arg_parser.add_argument('source_files', nargs='+',
+                            help="C source files, directories (searched recursively) or glob patterns")
+    arg_parser.add_argument('--cf-budget', type=float, default=None,
+                            help="Enable control-flow obfuscation with this overhead budget (e.g. 0.2 for 20%%)")
+    arg_parser.add_argument('--optimize', action='store_true',
+                            help="Fold constant expressions and drop dead branches before obfuscating")
+    arg_parser.add_argument('--minify', action='store_true',
+                            help="Give the most frequent identifiers the shortest names instead of random ones")
+    arg_parser.add_argument('--verify', action='store_true',
+                            help="Check in memory that deobfuscating each AST gives back the original "
+                                 "(individual files only)")
+    arg_parser.add_argument('--write-deobfuscated', action='store_true',
+                            help="Re-read each obfuscated file and write a deobfuscated_*.c copy (individual files only)")
+    arg_parser.add_argument('--token-deobfuscate', action='store_true',
+                            help="With --write-deobfuscated, replace identifiers in the text instead of re-parsing it")
+    arg_parser.add_argument('--output-dir', default='obfuscated',
+                            help="Output root for directory/glob mode")
+    arg_parser.add_argument('--jobs', type=int, default=None,
+                            help="Worker threads for directory/glob mode (default: CPU count)")
+    arg_parser.add_argument('--project', action='store_true',
+                            help="Resolve local #include \"...\" headers and obfuscate each one once "
+                                 "(implies directory/glob mode)")
+    arg_parser.add_argument('-I', '--include-dir', action='append', default=[], metavar='DIR',
+                            help="With --project, also search DIR for included headers")
+    arg_parser.add_argument('--log-file', default=None,
+                            help="Write debug logging of every renaming step to this file")
+    arg_parser.add_argument('--profile', nargs='?', const='profile_report.txt', default=None, metavar='REPORT',
+                            help="Profile each stage (cProfile and tracemalloc) and write a report "
+                                 "(default: profile_report.txt)")
+    return arg_parser.parse_args(argv)
+
+def make_hooks(args):
+    """
+    Returns the stage hooks for this run and the profiler, if --profile was given.
+    """
+    hooks = StageHooks()
+    profiler = None
+    if args.profile:
+        from profiling import StageProfiler
+        profiler = hooks.register(StageProfiler())
+    return hooks, profiler
+
+def write_profile(profiler, report_path):
+    if profiler is None:
+        return
+    profiler.close()
+    with open(report_path, 'w') as f:
+        f.write(profiler.report())
+    print(f"Profile report saved as {report_path}")
+
+def configure_logging(log_file):
+    if log_file:
+        import logging
+        logging.basicConfig(
+            filename=log_file,
+            level=logging.DEBUG,
+            format='%(asctime)s %(levelname)s: %(message)s'
+        )
+
+def parse_deobfuscate_args(argv):
+    arg_parser = argparse.ArgumentParser(prog="main.py deobfuscate",
+                                         description="Deobfuscate many files with one identifier map.")
+    arg_parser.add_argument('obfuscated_files', nargs='+', help="Obfuscated C files")
+    arg_parser.add_argument('--map', default='identifier_map.json', help="Identifier map (JSON or binary)")
+    arg_parser.add_argument('--output-dir', default='.', help="Directory for deobfuscated files")
+    arg_parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: CPU count)")
+    arg_parser.add_argument('--via-ast', action='store_true',
+                            help="Re-parse and regenerate each file instead of replacing names in the text")
+    return arg_parser.parse_args(argv)
+
+def deobfuscate_main(argv):
+    from deobfuscator import Deobfuscator
+    from identifier_map import load_identifier_map
+    from batch import deobfuscate_files
+    args = parse_deobfuscate_args(argv)
+    deobfuscator = Deobfuscator(load_identifier_map(args.map))
+    os.makedirs(args.output_dir, exist_ok=True)
+    
+    failures = 0
+    total = 0.0
+    for file_path, output_path, seconds, error in deobfuscate_files(
+            deobfuscator, args.obfuscated_files, args.output_dir, args.jobs, args.via_ast):
+        total += seconds
+        if error:
+            failures += 1
+            print(f"FAILED {file_path} ({seconds * 1000:.1f} ms): {error}")
+        else:
+            print(f"ok     {file_path} -> {output_path} ({seconds * 1000:.1f} ms)")
+    print(f"{len(args.obfuscated_files) - failures} deobfuscated, {failures} failed, {total:.3f}s total worker time")
+    if failures:
+        sys.exit(1)
+
+def pipeline_main(args):
+    """
+    Directory/glob mode: streams every file through the whole pipeline one at
+    a time and reports progress instead of dumping tokens and ASTs.
+    """
+    from batch import obfuscate_files, collect_sources
+    if args.verify or args.write_deobfuscated:
+        # Files are streamed and dropped once written, so there is no AST left to check
+        print("--verify and --write-deobfuscated only work on individual files; in directory/glob mode "
+              "run 'main.py deobfuscate' on the output instead.")
+        sys.exit(2)
+    sources = collect_sources(args.source_files)
+    if not sources:
+        print("No valid source files to process.")
         sys.exit(1)
     
-    source_files = sys.argv[1:]
+    obfuscator = Obfuscator(minify=args.minify)
+    hooks, profiler = make_hooks(args)
+    headers = None
+    if args.project:
+        from project import HeaderCache
+        roots = [arg for arg in args.source_files if os.path.isdir(arg)] + [os.curdir]
+        headers = HeaderCache(obfuscator, args.output_dir, roots, args.include_dir, hooks)
+    # The profiler follows one thread, so profiled runs use a single worker
+    jobs = 1 if profiler else args.jobs
+    failures = 0
+    for count, (file_path, output_path, seconds, error) in enumerate(
+            obfuscate_files(sources, args.output_dir, obfuscator, jobs, args.cf_budget, hooks, headers,
+                            args.optimize), 1):
+        if error:
+            failures += 1
+            print(f"[{count}/{len(sources)}] FAILED {file_path}: {error}")
+        else:
+            print(f"[{count}/{len(sources)}] {file_path} -> {output_path} ({seconds * 1000:.1f} ms)")
+    
+    identifier_map_file = 'identifier_map.json'
+    obfuscator.save_identifier_map(identifier_map_file)
+    print(f"{len(sources) - failures} obfuscated, {failures} failed. Identifier map saved as {identifier_map_file}")
+    if headers is not None:
+        print(f"{len(headers.headers)} headers processed once each")
+    write_profile(profiler, args.profile)
+    if failures:
+        sys.exit(1)
+
+def watch_main(argv):
+    arg_parser = argparse.ArgumentParser(prog="main.py watch",
+                                         description="Re-obfuscate C files as they change.")
+    arg_parser.add_argument('source_files', nargs='+', help="Files, directories or glob patterns to watch")
+    arg_parser.add_argument('--output-dir', default='obfuscated', help="Output root for obfuscated files")
+    arg_parser.add_argument('--map', default='identifier_map.json',
+                            help="Identifier map to resume from and keep up to date")
+    arg_parser.add_argument('--interval', type=float, default=0.5, help="Seconds between polls")
+    arg_parser.add_argument('--cf-budget', type=float, default=None,
+                            help="Enable control-flow obfuscation with this overhead budget")
+    arg_parser.add_argument('--fragment-cache', default='fragment_cache.json',
+                            help="Where the generated code of unchanged functions is kept between runs")
+    args = arg_parser.parse_args(argv)
+    
+    from watch import Watcher
+    obfuscator = Obfuscator()
+    obfuscator.load_identifier_map(args.map)
+    watcher = Watcher(args.source_files, args.output_dir, obfuscator, args.cf_budget, args.map,
+                      args.fragment_cache)
+    print(f"Watching {', '.join(args.source_files)} (Ctrl+C to stop)")
+    watcher.run(args.interval)
+
+def serve_main(argv):
+    arg_parser = argparse.ArgumentParser(prog="main.py serve",
+                                         description="Answer JSON-lines requests on stdin/stdout.")
+    arg_parser.add_argument('--map', default=None,
+                            help="Identifier map to resume from and save on exit")
+    args = arg_parser.parse_args(argv)
+    
+    from server import WorkerServer
+    obfuscator = Obfuscator()
+    if args.map:
+        obfuscator.load_identifier_map(args.map)
+    WorkerServer(obfuscator, args.map).serve(sys.stdin, sys.stdout)
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        serve_main(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == 'deobfuscate':
+        deobfuscate_main(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == 'watch':
+        watch_main(sys.argv[2:])
+        return
+    args = parse_args()
+    configure_logging(args.log_file)
+    if args.project or any(os.path.isdir(arg) or glob.has_magic(arg) for arg in args.source_files):
+        pipeline_main(args)
+        return
+    source_files = args.source_files
     asts = []
     identifier_map = {}
+    hooks, profiler = make_hooks(args)
     
     # Process each source file
     for file_path in source_files:
@@ -27,7 +215,8 @@ def main():
         
         lexer = Lexer(source_code)
         try:
-            tokens = lexer.tokenize()
+            with hooks.stage('lex', path=file_path):
+                tokens = lexer.tokenize()
         except RuntimeError as e:
             print(f"Lexing Error in {file_path}: {e}")
             continue
@@ -39,7 +228,8 @@ def main():
         
         parser = Parser(tokens)
         try:
-            ast = parser.parse()
+            with hooks.stage('parse', path=file_path):
+                ast = parser.parse()
             asts.append((file_path, ast))
         except RuntimeError as e:
             print(f"Parsing Error in {file_path}: {e}")
@@ -53,12 +243,30 @@ def main():
         print("No valid source files to process.")
         sys.exit(1)
     
-    obfuscator = Obfuscator()
+    if args.optimize:
+        from optimizer import Optimizer
+        optimizer = Optimizer()
+        for file_path, ast in asts:
+            with hooks.stage('optimize', path=file_path):
+                optimizer.optimize(ast)
+    
+    obfuscator = Obfuscator(minify=args.minify)
+    hash_trees = {}
+    if args.minify:
+        # Rank names over every file at once for project-wide frequencies
+        obfuscator.rank([ast for _, ast in asts])
     
     # Obfuscate all ASTs while maintaining a global identifier map
     for file_path, ast in asts:
         try:
-            obfuscator.obfuscate(ast)
+            if args.cf_budget is not None:
+                from control_flow import ControlFlowObfuscator
+                ControlFlowObfuscator(budget=args.cf_budget).obfuscate(ast)
+            if args.verify:
+                # Record the pre-renaming structure; far smaller than a copy of the AST
+                hash_trees[file_path] = ast.hash_tree()
+            with hooks.stage('obfuscate', path=file_path):
+                obfuscator.obfuscate(ast)
         except Exception as e:
             print(f"Obfuscation Error in {file_path}: {e}")
             continue
@@ -68,24 +276,46 @@ def main():
     # Generate obfuscated code for each file
     for file_path, ast in asts:
         try:
-            obf_code = generator.generate(ast)
+            with hooks.stage('generate', path=file_path):
+                obf_code = generator.generate(ast)
         except Exception as e:
             print(f"Code Generation Error in {file_path}: {e}")
             continue
         
         obf_file_path = f"obfuscated_{os.path.basename(file_path)}"
-        with open(obf_file_path, 'w') as f:
-            f.write(obf_code)
+        with hooks.stage('write', path=obf_file_path):
+            with open(obf_file_path, 'w') as f:
+                f.write(obf_code)
         print(f"\nObfuscated code generated as {obf_file_path}")
     
     # Save the global identifier map
     identifier_map_file = 'identifier_map.json'
-    with open(identifier_map_file, 'w') as f:
-        json.dump(obfuscator.identifier_map, f, indent=4)
+    obfuscator.save_identifier_map(identifier_map_file)
     print(f"Identifier map saved as {identifier_map_file}")
+    write_profile(profiler, args.profile)
     
-    # Optional: Deobfuscation Process
+    if not (args.verify or args.write_deobfuscated):
+        return
+    
+    from deobfuscator import Deobfuscator
     deobfuscator = Deobfuscator(obfuscator.identifier_map)
+    
+    # Optional: In-memory round-trip verification
+    if args.verify:
+        from verify import find_mismatch
+        for file_path, ast in asts:
+            if file_path not in hash_trees:
+                continue
+            mismatch = find_mismatch(hash_trees[file_path], deobfuscator.deobfuscate(ast))
+            if mismatch:
+                print(f"Verification FAILED for {file_path} at {' > '.join(mismatch)}")
+            else:
+                print(f"Verified {file_path}")
+    
+    if not args.write_deobfuscated:
+        return
+    
+    # Optional: Deobfuscation Process
     for obf_file in [f"obfuscated_{os.path.basename(f)}" for f in source_files]:
         if not os.path.isfile(obf_file):
             print(f"Obfuscated file not found: {obf_file}")
@@ -94,33 +324,36 @@ def main():
         with open(obf_file, 'r') as f:
             obf_code = f.read()
         
-        lexer = Lexer(obf_code)
-        try:
-            tokens = lexer.tokenize()
-        except RuntimeError as e:
-            print(f"Lexing Error in {obf_file}: {e}")
-            continue
+        if args.token_deobfuscate:
+            original_code = deobfuscator.deobfuscate_source(obf_code)
+        else:
+            lexer = Lexer(obf_code)
+            try:
+                tokens = lexer.tokenize()
+            except RuntimeError as e:
+                print(f"Lexing Error in {obf_file}: {e}")
+                continue
         
-        parser = Parser(tokens)
-        try:
-            obf_ast = parser.parse()
-        except RuntimeError as e:
-            print(f"Parsing Error in {obf_file}: {e}")
-            continue
+            parser = Parser(tokens)
+            try:
+                obf_ast = parser.parse()
+            except RuntimeError as e:
+                print(f"Parsing Error in {obf_file}: {e}")
+                continue
         
-        try:
-            deobf_ast = deobfuscator.deobfuscate(obf_ast)
-        except Exception as e:
-            print(f"Deobfuscation Error in {obf_file}: {e}")
-            continue
+            try:
+                deobf_ast = deobfuscator.deobfuscate(obf_ast)
+            except Exception as e:
+                print(f"Deobfuscation Error in {obf_file}: {e}")
+                continue
         
-        try:
-            original_code = generator.generate(deobf_ast)
-        except Exception as e:
-            print(f"Code Generation Error in {obf_file}: {e}")
-            continue
+            try:
+                original_code = generator.generate(deobf_ast)
+            except Exception as e:
+                print(f"Code Generation Error in {obf_file}: {e}")
+                continue
         
-        deobf_file_path = f"deobfuscated_{os.path.basename(f)}"
+        deobf_file_path = f"deobfuscated_{obf_file[len('obfuscated_'):]}"
         with open(deobf_file_path, 'w') as f:
             f.write(original_code)
         print(f"Deobfuscated code generated as {deobf_file_path}")
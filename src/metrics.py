@@ -0,0 +1,127 @@
+# src/metrics.py
+
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from hooks import StageHook
+
+# Upper bounds in seconds; stages range from microseconds (small files) to seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@contextmanager
+def timed(timings, stage):
+    """
+    Adds the time spent in the with-block to timings[stage].
+
+    Used where a registry is not at hand, e.g. in worker processes whose
+    timings are sent back and recorded by the parent.
+
+    Args:
+        timings (dict): Stage names mapped to seconds.
+        stage (str): The stage being timed.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+class PipelineMetrics(StageHook):
+    def __init__(self, namespace='obfuscator', buckets=DEFAULT_BUCKETS):
+        """
+        Initializes per-stage latency histograms and input-size counters that
+        render in the Prometheus text exposition format. Registered with
+        StageHooks, it records every stage run through them.
+
+        Args:
+            namespace (str, optional): Prefix for every metric name.
+            buckets (tuple, optional): Histogram bucket upper bounds in seconds.
+        """
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        # stage -> [per-bucket counts (last one is +Inf), sum of seconds]
+        self.histograms = {}
+        # (metric, label value) -> total
+        self.counters = {}
+
+    @contextmanager
+    def time(self, stage):
+        """
+        Records the time spent in the with-block as one observation of stage.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def after_stage(self, stage, info):
+        self.observe(stage, info['seconds'])
+
+    def observe(self, stage, seconds):
+        """
+        Records one stage latency.
+
+        Args:
+            stage (str): Stage name, used as the 'stage' label.
+            seconds (float): How long the stage took.
+        """
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = [[0] * (len(self.buckets) + 1), 0.0]
+            histogram[0][bisect.bisect_left(self.buckets, seconds)] += 1
+            histogram[1] += seconds
+
+    def record(self, timings):
+        """
+        Records a dict of stage timings, e.g. one collected with timed().
+        """
+        for stage, seconds in timings.items():
+            self.observe(stage, seconds)
+
+    def count(self, metric, label, amount=1):
+        """
+        Adds to a counter.
+
+        Args:
+            metric (str): Counter name without namespace or '_total' suffix,
+                e.g. 'input_bytes'.
+            label (str): Value of the counter's 'kind' label.
+            amount (int, optional): How much to add.
+        """
+        with self.lock:
+            key = (metric, label)
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def render(self):
+        """
+        Returns all metrics in the Prometheus text exposition format.
+        """
+        name = f'{self.namespace}_stage_seconds'
+        lines = [
+            f'# HELP {name} Time spent in each pipeline stage.',
+            f'# TYPE {name} histogram',
+        ]
+        with self.lock:
+            for stage, (counts, total) in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ('+Inf',), counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {total}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {cumulative}')
+
+            metrics = sorted({metric for metric, _ in self.counters})
+            for metric in metrics:
+                name = f'{self.namespace}_{metric}_total'
+                lines.append(f"# HELP {name} Total {metric.replace('_', ' ')} received, by kind.")
+                lines.append(f'# TYPE {name} counter')
+                for (counter, label), value in sorted(self.counters.items()):
+                    if counter == metric:
+                        lines.append(f'{name}{{kind="{label}"}} {value}')
+        return '\n'.join(lines) + '\n'
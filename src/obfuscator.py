@@ -1,16 +1,69 @@
 # src/obfuscator.py
 
 import string
-import random
-import json
 import os
+import itertools
 import logging
+import threading
+from collections import Counter
+
+# Nodes whose name is renamed on sight, and nodes renamed only if already mapped
+NAMING_NODE_TYPES = {'Declaration', 'AssignmentStatement', 'FunctionDeclaration', 'FunctionPrototype', 'Parameter'}
+USING_NODE_TYPES = {'Identifier', 'FunctionCall'}
+
+logger = logging.getLogger(__name__)
+
+
+def short_names():
+    """
+    Yields every legal C identifier, shortest first: 'a' to 'Z', then 'aa',
+    'ab' and so on. Names never start with '_', which C reserves in many scopes.
+    """
+    rest_chars = string.ascii_letters + string.digits + '_'
+    for length in itertools.count(1):
+        for first in string.ascii_letters:
+            for rest in itertools.product(rest_chars, repeat=length - 1):
+                yield first + ''.join(rest)
+
+
+def count_identifiers(ast, counts=None, named=None):
+    """
+    Counts how often each identifier occurs in an AST.
+
+    Args:
+        ast (ASTNode): The root node of the AST.
+        counts (Counter, optional): Counts to add to; a new Counter by default.
+        named (set, optional): Receives the names the obfuscator renames on
+            sight (declarations, assignments, functions and parameters).
+
+    Returns:
+        Counter: Occurrences per identifier, in order of first occurrence.
+    """
+    counts = Counter() if counts is None else counts
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        if node.type in NAMING_NODE_TYPES:
+            counts[node.value] += 1
+            if named is not None:
+                named.add(node.value)
+        elif node.type in USING_NODE_TYPES:
+            counts[node.value] += 1
+        stack.extend(reversed(node.children))
+    return counts
+
 
 class Obfuscator:
-    def __init__(self):
+    def __init__(self, minify=False):
         """
         Initializes the Obfuscator with an empty identifier map and reserved keywords.
+
+        Args:
+            minify (bool, optional): Give the most frequent identifiers the
+                shortest names ('a', 'b', ..., 'aa', ...) instead of random
+                8-character ones. See rank().
         """
+        self.minify = minify
         self.identifier_map = {}
         self.reserved_keywords = {
             'if', 'else', 'while', 'for', 'return', 'int', 'float',
@@ -20,12 +73,13 @@ class Obfuscator:
             'register', 'volatile', 'union', 'auto', 'static', 'const',
             'break', 'continue', 'struct', 'typedef'
         }
-        # Configure logging
-        logging.basicConfig(
-            filename='obfuscator.log',
-            level=logging.DEBUG,
-            format='%(asctime)s %(levelname)s: %(message)s'
-        )
+        # Guards adding names, so threads sharing this obfuscator agree on them
+        self._map_lock = threading.Lock()
+        # Minifying state: the next short names to hand out, the names already
+        # taken (built on first use) and names used but never renamed
+        self._short_names = short_names()
+        self._taken_names = None
+        self._external_names = set()
 
     def obfuscate(self, ast):
         """
@@ -37,11 +91,61 @@ class Obfuscator:
         Returns:
             ASTNode: The obfuscated AST.
         """
-        logging.debug("Starting obfuscation process.")
+        logger.debug("Starting obfuscation process.")
+        self.prepare(ast)
         self._obfuscate_node(ast)
-        logging.debug(f"Obfuscation complete. Identifier map: {self.identifier_map}")
+        logger.debug("Obfuscation complete. Identifier map: %s", self.identifier_map)
         return ast
 
+    def prepare(self, ast):
+        """
+        Called with the whole tree before any of its nodes are visited. When
+        minifying, ranks the tree's identifiers; otherwise does nothing.
+        """
+        if self.minify:
+            self.rank([ast])
+
+    def rank(self, asts):
+        """
+        Assigns names to the identifiers of one or more ASTs, most frequent
+        first, so that the shortest names replace the most occurrences.
+
+        Ranking every file of a project in one call gives project-wide
+        frequencies. Identifiers that are used but never renamed (library
+        functions, macros, names from unprocessed headers) are never handed
+        out as new names. They can still clash with names given out for
+        earlier calls, so rank files that share names together.
+
+        Args:
+            asts (list): ASTNodes to count identifiers in.
+        """
+        counts = Counter()
+        named = set()
+        for ast in asts:
+            count_identifiers(ast, counts, named)
+        self.declare(counts, named)
+
+    def declare(self, counts, named):
+        """
+        Adds every name the obfuscator would rename on sight to the identifier
+        map up front, most frequent first, as counted by count_identifiers().
+
+        Uses are only renamed once their name is mapped, so declaring the
+        names of all files before renaming any of them makes the output
+        independent of the order the files are renamed in.
+
+        Args:
+            counts (Counter): Occurrences per identifier.
+            named (set): The identifiers renamed on sight.
+        """
+        with self._map_lock:
+            self._external_names.update(
+                name for name in counts
+                if name not in named and name not in self.identifier_map)
+        for name, _ in counts.most_common():
+            if name in named and self._should_obfuscate(name):
+                self._add_to_identifier_map(name)
+
     def _obfuscate_node(self, node):
         """
         Recursively traverses the AST nodes to obfuscate identifiers.
@@ -49,37 +153,58 @@ class Obfuscator:
         Args:
             node (ASTNode): The current AST node being processed.
         """
+        self.visit_node(node)
+
+        # Recursively process child nodes
+        for child in node.children:
+            if child:
+                self._obfuscate_node(child)
+
+    def visit_node(self, node):
+        """
+        Renames the identifier held by a single node, without recursing.
+
+        Nodes must be visited in pre-order (declarations before their uses),
+        which lets a Pipeline apply the renaming while the code generator
+        emits each node instead of in a traversal of its own.
+
+        Args:
+            node (ASTNode): The node to rename.
+        """
         if node.type in {'Declaration', 'AssignmentStatement'}:
             # Rename variable identifiers
             original_name = node.value
             if self._should_obfuscate(original_name):
                 self._add_to_identifier_map(original_name)
+            if original_name in self.identifier_map:
+                # Names already mapped (seen earlier or in another file) are renamed too
                 node.value = self.identifier_map[original_name]
-                logging.debug(f"Obfuscated identifier '{original_name}' to '{node.value}'.")
+                logger.debug("Obfuscated identifier '%s' to '%s'.", original_name, node.value)
 
-        elif node.type == 'Identifier':
-            # Rename identifiers used elsewhere (e.g., in expressions)
+        elif node.type in {'Identifier', 'FunctionCall'}:
+            # Rename identifiers used elsewhere (e.g., in expressions and calls)
             original_name = node.value
             if original_name in self.identifier_map:
-                logging.debug(f"Deobfuscating identifier '{original_name}' to '{self.identifier_map[original_name]}'.")
+                logger.debug("Deobfuscating identifier '%s' to '%s'.", original_name, self.identifier_map[original_name])
                 node.value = self.identifier_map[original_name]
 
-        elif node.type == 'FunctionDeclaration':
+        elif node.type in {'FunctionDeclaration', 'FunctionPrototype'}:
             # Rename function identifiers
             func_name = node.value
             if self._should_obfuscate(func_name):
                 self._add_to_identifier_map(func_name)
+            if func_name in self.identifier_map:
                 node.value = self.identifier_map[func_name]
-                logging.debug(f"Obfuscated function name '{func_name}' to '{node.value}'.")
+                logger.debug("Obfuscated function name '%s' to '%s'.", func_name, node.value)
 
-            # Obfuscate function parameters
-            parameters = node.children[1].children  # Parameters are the second child
-            for param in parameters:
-                param_name = param.value
-                if self._should_obfuscate(param_name):
-                    self._add_to_identifier_map(param_name)
-                    param.value = self.identifier_map[param_name]
-                    logging.debug(f"Obfuscated parameter name '{param_name}' to '{param.value}'.")
+        elif node.type == 'Parameter':
+            # Rename function parameters
+            param_name = node.value
+            if self._should_obfuscate(param_name):
+                self._add_to_identifier_map(param_name)
+            if param_name in self.identifier_map:
+                node.value = self.identifier_map[param_name]
+                logger.debug("Obfuscated parameter name '%s' to '%s'.", param_name, node.value)
 
         elif node.type == 'PreprocessorDirective':
             # Handle preprocessor directives (e.g., #define)
@@ -94,18 +219,13 @@ class Obfuscator:
                         obf_macro = self.identifier_map[macro_name]
                         new_directive = f'define {obf_macro} ' + ' '.join(parts[2:])
                         node.value = new_directive
-                        logging.debug(f"Obfuscated macro name '{macro_name}' to '{obf_macro}' in preprocessor directive.")
+                        logger.debug("Obfuscated macro name '%s' to '%s' in preprocessor directive.", macro_name, obf_macro)
 
         # Ensure that operators are not altered by skipping them
         elif node.type in {'BIN_OP', 'UNARY_OP'}:
             # Do not obfuscate operators
             pass
 
-        # Recursively process child nodes
-        for child in node.children:
-            if child:
-                self._obfuscate_node(child)
-
     def _should_obfuscate(self, identifier):
         """
         Determines whether an identifier should be obfuscated.
@@ -118,9 +238,9 @@ class Obfuscator:
         """
         should_obf = identifier not in self.identifier_map and identifier not in self.reserved_keywords
         if should_obf:
-            logging.debug(f"Identifier '{identifier}' is eligible for obfuscation.")
+            logger.debug("Identifier '%s' is eligible for obfuscation.", identifier)
         else:
-            logging.debug(f"Identifier '{identifier}' is NOT eligible for obfuscation.")
+            logger.debug("Identifier '%s' is NOT eligible for obfuscation.", identifier)
         return should_obf
 
     def _add_to_identifier_map(self, original_name, length=8):
@@ -131,12 +251,30 @@ class Obfuscator:
             original_name (str): The original identifier name.
             length (int, optional): Length of the obfuscated name. Defaults to 8.
         """
-        if original_name not in self.identifier_map:
-            obfuscated_name = self._generate_random_name(length)
-            while obfuscated_name in self.identifier_map.values():
-                obfuscated_name = self._generate_random_name(length)
-            self.identifier_map[original_name] = obfuscated_name
-            logging.debug(f"Assigned obfuscated name '{obfuscated_name}' to identifier '{original_name}'.")
+        if original_name in self.identifier_map:
+            return
+        with self._map_lock:
+            if original_name not in self.identifier_map:
+                if self.minify:
+                    obfuscated_name = self._next_short_name()
+                else:
+                    obfuscated_name = self._generate_random_name(length)
+                    while obfuscated_name in self.identifier_map.values():
+                        obfuscated_name = self._generate_random_name(length)
+                self.identifier_map[original_name] = obfuscated_name
+                logger.debug("Assigned obfuscated name '%s' to identifier '%s'.", obfuscated_name, original_name)
+
+    def _next_short_name(self):
+        """
+        Returns the shortest name not yet taken. Callers hold _map_lock.
+        """
+        if self._taken_names is None:
+            self._taken_names = set(self.identifier_map.values())
+        for name in self._short_names:
+            if name not in self._taken_names and name not in self.reserved_keywords \
+                    and name not in self._external_names:
+                self._taken_names.add(name)
+                return name
 
     def _generate_random_name(self, length=8):
         """
@@ -148,6 +286,7 @@ class Obfuscator:
         Returns:
             str: The generated random name.
         """
+        import random
         letters = string.ascii_letters
         # Ensure the first character is a letter or underscore
         first_char = random.choice(string.ascii_letters + "_")
@@ -161,20 +300,23 @@ class Obfuscator:
         Args:
             filepath (str, optional): Path to the JSON file. Defaults to 'identifier_map.json'.
         """
+        import json
         with open(filepath, 'w') as f:
             json.dump(self.identifier_map, f, indent=4)
-        logging.debug(f"Identifier map saved to {filepath}")
+        logger.debug("Identifier map saved to %s", filepath)
 
     def load_identifier_map(self, filepath='identifier_map.json'):
         """
-        Loads the identifier map from a JSON file.
+        Loads the identifier map from a JSON or binary map file.
 
         Args:
-            filepath (str, optional): Path to the JSON file. Defaults to 'identifier_map.json'.
+            filepath (str, optional): Path to the map file. Defaults to 'identifier_map.json'.
         """
+        from identifier_map import load_identifier_map
         if os.path.exists(filepath):
-            with open(filepath, 'r') as f:
-                self.identifier_map = json.load(f)
-            logging.debug(f"Identifier map loaded from {filepath}")
+            # New names get added, so binary maps are copied into a mutable dict
+            self.identifier_map = dict(load_identifier_map(filepath).items())
+            self._taken_names = None
+            logger.debug("Identifier map loaded from %s", filepath)
         else:
-            logging.warning(f"No identifier map found at {filepath}")
\ No newline at end of file
+            logger.warning("No identifier map found at %s", filepath)
\ No newline at end of file
@@ -0,0 +1,189 @@
+# src/optimizer.py
+
+from code_parser import ASTNode
+
+# Integer results are only folded if they fit a 32-bit int, so folding never
+# changes what an overflowing (undefined) expression would have done
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+# Nodes whose children are statements run in order
+BLOCK_NODE_TYPES = {'Program', 'Body', 'Then', 'Else'}
+
+
+def truncating_divide(a, b):
+    # C rounds integer quotients toward zero, Python's // toward minus infinity
+    quotient = abs(a) // abs(b)
+    return quotient if (a < 0) == (b < 0) else -quotient
+
+
+BINARY_OPERATIONS = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': truncating_divide,
+    '<': lambda a, b: int(a < b),
+    '>': lambda a, b: int(a > b),
+    '<=': lambda a, b: int(a <= b),
+    '>=': lambda a, b: int(a >= b),
+    '==': lambda a, b: int(a == b),
+    '!=': lambda a, b: int(a != b),
+    '&&': lambda a, b: int(bool(a) and bool(b)),
+    '||': lambda a, b: int(bool(a) or bool(b)),
+}
+# Operators whose result is always an int, so float operands are fine
+COMPARISON_OPERATORS = {'<', '>', '<=', '>=', '==', '!=', '&&', '||'}
+
+
+def constant_value(node):
+    """
+    Returns the value of a literal (a Number, or '-' applied to one), or None.
+    """
+    if node.type == 'Number':
+        return node.value
+    if node.type == 'UnaryOp' and node.value == '-' and node.children[0].type == 'Number':
+        return -node.children[0].value
+    return None
+
+
+def int_literal(value):
+    """
+    Returns the AST for an int constant; negative values become '-' applied
+    to a Number, the same shape the parser produces for them.
+    """
+    if value < 0:
+        return ASTNode('UnaryOp', '-', [ASTNode('Number', value=-value)])
+    return ASTNode('Number', value=value)
+
+
+def in_int_range(value):
+    return isinstance(value, int) and INT_MIN <= value <= INT_MAX
+
+
+def comparable(value):
+    # Python compares ints and floats exactly; C converts the int to double first
+    return isinstance(value, float) or in_int_range(value)
+
+
+class Optimizer:
+    def __init__(self):
+        """
+        Initializes an optimisation pass meant to run between the Parser and
+        the CodeGenerator.
+
+        It folds subexpressions whose operands are all literals and removes
+        code that provably never runs: 'if' and 'while' statements with a
+        constant false condition, and statements after a 'return'. An 'if'
+        with a constant true condition is replaced by its branch when that
+        declares no variables (which would otherwise change scope).
+
+        Only integer arithmetic is folded, and only when C would give the
+        same result: no division by zero, no results outside a 32-bit int.
+        Float operands are folded in comparisons and logical operators,
+        whose results are ints. 'folded' and 'removed' count what the most
+        recent call changed.
+        """
+        self.folded = 0
+        self.removed = 0
+
+    def optimize(self, ast):
+        """
+        Optimizes an AST in place.
+
+        Args:
+            ast (ASTNode): The root node of the AST.
+
+        Returns:
+            ASTNode: The optimized AST.
+        """
+        self.folded = 0
+        self.removed = 0
+        return self._visit(ast)
+
+    def _visit(self, node):
+        """
+        Optimizes a subtree bottom-up and returns the node to put in its place.
+        """
+        if node.type in BLOCK_NODE_TYPES:
+            node.children = self._optimize_block(node.children, node.type != 'Program')
+            return node
+        node.children = [self._visit(child) for child in node.children]
+        method = getattr(self, f'fold_{node.type}', None)
+        return method(node) if method is not None else node
+
+    def _optimize_block(self, statements, in_function):
+        """
+        Returns the statements of a block with dead ones removed and constant
+        'if' statements replaced by the branch that runs.
+        """
+        kept = []
+        for position, statement in enumerate(statements):
+            for replacement in self._prune(self._visit(statement)):
+                kept.append(replacement)
+                if in_function and replacement.type == 'ReturnStatement':
+                    # Nothing after a return in the same block can run
+                    self.removed += len(statements) - position - 1
+                    return kept
+        return kept
+
+    def _prune(self, statement):
+        """
+        Returns the statements that replace one statement: none if it can
+        never run, its branch if it is an 'if' with a constant condition.
+        """
+        if statement.type not in {'IfStatement', 'WhileStatement'}:
+            return [statement]
+        condition = constant_value(statement.children[0])
+        if condition is None:
+            return [statement]
+        if statement.type == 'WhileStatement':
+            if condition:
+                return [statement]
+            self.removed += 1
+            return []
+        branch = statement.children[1] if condition else (
+            statement.children[2] if len(statement.children) > 2 else None)
+        if branch is not None and any(child.type == 'Declaration' for child in branch.children):
+            return [statement]
+        self.removed += 1
+        return branch.children if branch is not None else []
+
+    def fold_binary(self, node):
+        left = constant_value(node.children[0])
+        op = node.value
+        # && and || never evaluate their right side once the left decides
+        if left is not None and ((op == '&&' and not left) or (op == '||' and left)):
+            self.folded += 1
+            return int_literal(int(op == '||'))
+        right = constant_value(node.children[1])
+        if left is None or right is None or op not in BINARY_OPERATIONS:
+            return node
+        allowed = comparable if op in COMPARISON_OPERATORS else in_int_range
+        if not (allowed(left) and allowed(right)) or (op == '/' and right == 0):
+            return node
+        result = BINARY_OPERATIONS[op](left, right)
+        if not in_int_range(result):
+            return node
+        self.folded += 1
+        return int_literal(result)
+
+    fold_LogicalOr = fold_binary
+    fold_LogicalAnd = fold_binary
+    fold_Equality = fold_binary
+    fold_Relational = fold_binary
+    fold_Additive = fold_binary
+    fold_Multiplicative = fold_binary
+
+    def fold_UnaryOp(self, node):
+        operand = node.children[0]
+        value = constant_value(operand)
+        if value is None:
+            return node
+        if node.value == '!':
+            self.folded += 1
+            return int_literal(int(value == 0))
+        if operand.type == 'Number' or not in_int_range(-value):
+            # '-' applied to a Number is already as folded as it gets
+            return node
+        self.folded += 1
+        return int_literal(-value)
@@ -0,0 +1,131 @@
+# src/pipeline.py
+
+from lexer import Lexer
+from code_parser import Parser
+from code_generator import CodeGenerator
+from hooks import StageHooks
+
+
+class FusedPass:
+    def __init__(self, passes):
+        """
+        Initializes a group of per-node passes applied together in one walk.
+
+        Each pass's visit_node(node) may read and change only the node it is
+        given, and is called in pre-order, so running the passes one after the
+        other on each node gives the same result as separate full walks.
+
+        Args:
+            passes (list): Objects with a visit_node(node) method.
+        """
+        self.passes = list(passes)
+
+    def prepare(self, ast):
+        """
+        Calls prepare(ast) on every pass that has one, before any node is
+        visited; a minifying Obfuscator uses it to rank the tree's names.
+        """
+        for node_pass in self.passes:
+            prepare = getattr(node_pass, 'prepare', None)
+            if prepare is not None:
+                prepare(ast)
+
+    def visit_node(self, node):
+        for node_pass in self.passes:
+            node_pass.visit_node(node)
+
+    def run(self, ast):
+        """
+        Applies every pass to the tree in a single pre-order walk.
+        """
+        self.prepare(ast)
+        stack = [ast]
+        while stack:
+            node = stack.pop()
+            self.visit_node(node)
+            stack.extend(reversed([child for child in node.children if child]))
+        return ast
+
+
+class Pipeline:
+    def __init__(self, passes=(), hooks=None):
+        """
+        Initializes a lexer -> parser -> passes -> generator pipeline.
+
+        Passes come in two kinds. Per-node passes are objects with a
+        visit_node(node) method, such as Obfuscator and Deobfuscator;
+        consecutive ones are fused into one traversal, and the trailing group
+        runs inside code generation, renaming each node as it is emitted.
+        Whole-tree passes are callables taking the AST, such as
+        ControlFlowObfuscator(...).obfuscate; they run on their own and end
+        any fused group before them.
+
+        Args:
+            passes (list, optional): Passes in the order they should apply.
+            hooks (StageHooks, optional): Hooks run around the 'lex', 'parse',
+                'transform' and 'generate' stages.
+        """
+        self.passes = list(passes)
+        self.hooks = hooks or StageHooks()
+
+    def plan(self):
+        """
+        Groups the passes into the walks that will actually run.
+
+        Returns:
+            tuple: (list of whole-tree callables and FusedPass groups to run
+            before generation, FusedPass to run during generation or None).
+        """
+        steps = []
+        group = []
+        for node_pass in self.passes:
+            if hasattr(node_pass, 'visit_node'):
+                group.append(node_pass)
+                continue
+            if group:
+                steps.append(FusedPass(group))
+                group = []
+            steps.append(node_pass)
+        return steps, FusedPass(group) if group else None
+
+    def parse(self, source_code):
+        """
+        Lexes and parses source code.
+
+        Returns:
+            ASTNode: The root of the AST.
+        """
+        with self.hooks.stage('lex'):
+            tokens = Lexer(source_code).tokenize()
+        with self.hooks.stage('parse'):
+            return Parser(tokens).parse()
+
+    def apply(self, ast):
+        """
+        Runs the passes over the AST and generates code from it. The AST is
+        transformed in place, as with running each pass separately.
+
+        Returns:
+            str: The generated code.
+        """
+        steps, fused = self.plan()
+        for step in steps:
+            with self.hooks.stage('transform'):
+                if isinstance(step, FusedPass):
+                    step.run(ast)
+                else:
+                    step(ast)
+        generator = CodeGenerator(fused.visit_node if fused else None)
+        with self.hooks.stage('generate'):
+            if fused:
+                fused.prepare(ast)
+            return generator.generate(ast)
+
+    def run(self, source_code):
+        """
+        Lexes, parses, transforms and generates code in one call.
+
+        Returns:
+            str: The generated code.
+        """
+        return self.apply(self.parse(source_code))
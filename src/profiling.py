@@ -0,0 +1,88 @@
+# src/profiling.py
+
+import io
+import cProfile
+import pstats
+import tracemalloc
+from hooks import StageHook
+
+
+class StageProfiler(StageHook):
+    def __init__(self, top=15):
+        """
+        Initializes a hook that profiles each stage separately: cProfile for
+        where the time goes and tracemalloc for peak memory and allocations.
+
+        Repeated runs of a stage (one per file) accumulate into one profile.
+        Stages must not nest, and only the thread running a stage is
+        profiled. Tracing memory slows the pipeline down considerably, so the
+        absolute times are only useful relative to each other.
+
+        Args:
+            top (int, optional): Functions listed per stage in the report.
+        """
+        self.top = top
+        self.profiles = {}
+        # stage -> {'calls', 'seconds', 'peak', 'blocks', 'bytes'}
+        self.totals = {}
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        self._filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]
+
+    def before_stage(self, stage, info):
+        info['_snapshot'] = tracemalloc.take_snapshot().filter_traces(self._filters)
+        tracemalloc.reset_peak()
+        info['_memory_before'] = tracemalloc.get_traced_memory()[0]
+        profile = self.profiles.get(stage)
+        if profile is None:
+            profile = self.profiles[stage] = cProfile.Profile()
+        profile.enable()
+
+    def after_stage(self, stage, info):
+        self.profiles[stage].disable()
+        peak = tracemalloc.get_traced_memory()[1] - info.pop('_memory_before')
+        snapshot = tracemalloc.take_snapshot().filter_traces(self._filters)
+        new_blocks = 0
+        new_bytes = 0
+        for stat in snapshot.compare_to(info.pop('_snapshot'), 'filename'):
+            new_blocks += stat.count_diff
+            new_bytes += stat.size_diff
+
+        totals = self.totals.setdefault(stage, {'calls': 0, 'seconds': 0.0, 'peak': 0, 'blocks': 0, 'bytes': 0})
+        totals['calls'] += 1
+        totals['seconds'] += info['seconds']
+        totals['peak'] = max(totals['peak'], peak)
+        totals['blocks'] += new_blocks
+        totals['bytes'] += new_bytes
+
+    def report(self):
+        """
+        Returns the combined report: a per-stage summary table followed by
+        each stage's top functions by cumulative time.
+
+        'Peak' is the most memory a single run of the stage allocated on top
+        of what was live when it started; 'Kept blocks' and 'Kept KiB' are the
+        allocations still alive when it finished (e.g. the tokens or AST it
+        produced).
+        """
+        out = io.StringIO()
+        out.write(f"{'Stage':<12}{'Calls':>7}{'Time (ms)':>12}{'Peak (KiB)':>12}{'Kept blocks':>13}{'Kept KiB':>11}\n")
+        for stage, totals in self.totals.items():
+            out.write(f"{stage:<12}{totals['calls']:>7}{totals['seconds'] * 1000:>12.2f}"
+                      f"{totals['peak'] / 1024:>12.1f}{totals['blocks']:>13}{totals['bytes'] / 1024:>11.1f}\n")
+        for stage, profile in self.profiles.items():
+            out.write(f"\n== {stage}: top {self.top} functions by cumulative time ==\n")
+            pstats.Stats(profile, stream=out).strip_dirs().sort_stats('cumulative').print_stats(self.top)
+        return out.getvalue()
+
+    def close(self):
+        """
+        Stops memory tracing if this profiler started it.
+        """
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self._started_tracing = False
@@ -0,0 +1,149 @@
+# src/project.py
+
+import os
+import threading
+from lexer import Lexer
+from code_parser import Parser
+from code_generator import CodeGenerator
+from fileutil import write_atomic
+from hooks import StageHooks
+
+def local_includes(ast):
+    """
+    Returns the names of the headers a file includes with #include "...".
+    System headers (#include <...>) are never resolved.
+    """
+    names = []
+    for node in ast.children:
+        if node.type == 'PreprocessorDirective' and node.value == 'include':
+            name = node.children[0].value
+            if name.startswith('"'):
+                names.append(name[1:-1])
+    return names
+
+
+class Header:
+    def __init__(self, path, output_path):
+        """
+        Initializes the cached result of processing one header.
+
+        Args:
+            path (str): Real path of the header.
+            output_path (str): Where its obfuscated copy is written.
+        """
+        self.path = path
+        self.output_path = output_path
+        self.includes = []
+        self.error = None
+
+
+class HeaderCache:
+    def __init__(self, obfuscator, output_dir, roots=(), include_dirs=(), hooks=None):
+        """
+        Initializes a cache that processes each local header of a project once.
+
+        The first file to include a header has it lexed, parsed, obfuscated
+        and written before the file itself is renamed, so the names the
+        header declares are in the identifier map by then; every later file
+        including it reuses the result. Headers a header includes are handled
+        first in the same way.
+
+        Args:
+            obfuscator (Obfuscator): The obfuscator shared with the source files.
+            output_dir (str): Root directory for the obfuscated tree.
+            roots (list, optional): Source directories; a header inside one is
+                written to the same relative path under output_dir.
+            include_dirs (list, optional): Directories searched, in order, for
+                headers not found next to the including file (like -I).
+            hooks (StageHooks, optional): Hooks run around each header's stages.
+        """
+        self.obfuscator = obfuscator
+        self.output_dir = output_dir
+        self.include_dirs = list(include_dirs)
+        self.roots = [os.path.realpath(root) for root in list(roots) + self.include_dirs]
+        self.hooks = hooks or StageHooks()
+        # real path -> Header
+        self.headers = {}
+        self._lock = threading.RLock()
+
+    def resolve(self, name, including_dir):
+        """
+        Finds the header named in #include "name".
+
+        Returns:
+            str: Its real path, or None if it is not a project header.
+        """
+        for directory in [including_dir] + self.include_dirs:
+            path = os.path.join(directory, name)
+            if os.path.isfile(path):
+                return os.path.realpath(path)
+        return None
+
+    def output_path(self, path):
+        """
+        Returns where the obfuscated copy of a header goes: its path relative
+        to the first root containing it, or just its name otherwise.
+        """
+        for root in self.roots:
+            relative = os.path.relpath(path, root)
+            if not relative.startswith('..'):
+                return os.path.join(self.output_dir, relative)
+        return os.path.join(self.output_dir, os.path.basename(path))
+
+    def prepare(self, path, ast):
+        """
+        Makes sure every project header a file includes, directly or not, has
+        been processed, so the file's uses of their names are renamed to match.
+
+        Args:
+            path (str): The including file.
+            ast (ASTNode): Its parsed AST.
+
+        Returns:
+            list: The Header of each directly included project header.
+        """
+        including_dir = os.path.dirname(os.path.abspath(path))
+        headers = []
+        for name in local_includes(ast):
+            header_path = self.resolve(name, including_dir)
+            if header_path is not None:
+                headers.append(self.load(header_path))
+        return headers
+
+    def load(self, path):
+        """
+        Returns the processed header, processing it on first use.
+
+        A header that fails to process raises the same error for every file
+        including it, without being processed again.
+
+        Raises:
+            RuntimeError: If the header cannot be lexed or parsed.
+        """
+        with self._lock:
+            header = self.headers.get(path)
+            if header is None:
+                # Cached before processing, so include cycles stop here
+                header = self.headers[path] = Header(path, self.output_path(path))
+                try:
+                    self._process(header)
+                except Exception as e:
+                    header.error = e
+        if header.error is not None:
+            raise RuntimeError(f"In header {header.path}: {header.error}")
+        return header
+
+    def _process(self, header):
+        with open(header.path, 'r') as f:
+            source_code = f.read()
+        with self.hooks.stage('lex', path=header.path):
+            tokens = Lexer(source_code).tokenize()
+        with self.hooks.stage('parse', path=header.path):
+            ast = Parser(tokens).parse()
+        header.includes = self.prepare(header.path, ast)
+        with self.hooks.stage('obfuscate', path=header.path):
+            self.obfuscator.obfuscate(ast)
+        with self.hooks.stage('generate', path=header.path):
+            obf_code = CodeGenerator().generate(ast)
+        with self.hooks.stage('write', path=header.output_path):
+            write_atomic(header.output_path, obf_code)
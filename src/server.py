@@ -0,0 +1,135 @@
+# src/server.py
+
+import json
+import time
+from obfuscator import Obfuscator
+from deobfuscator import Deobfuscator
+from deobfuscator_cache import DeobfuscatorCache
+from control_flow import ControlFlowObfuscator
+from pipeline import Pipeline
+from fileutil import write_atomic
+
+
+class WorkerServer:
+    def __init__(self, obfuscator=None, map_path=None):
+        """
+        Initializes a long-lived worker answering JSON-lines requests.
+
+        Every request shares one obfuscator, so all translation units of a
+        build get consistent names and a single identifier map.
+
+        Args:
+            obfuscator (Obfuscator, optional): Obfuscator to reuse; a new one by default.
+            map_path (str, optional): Where 'save_map' requests and shutdown write the map.
+        """
+        self.obfuscator = obfuscator or Obfuscator()
+        self.map_path = map_path
+        self.deobfuscator = Deobfuscator({})
+        self._synced = 0
+        # Deobfuscators for maps named in requests, keyed by the map file's contents
+        self.deobfuscators = DeobfuscatorCache()
+
+    def handle(self, request):
+        """
+        Handles one request and returns the response object.
+
+        Requests are objects with an 'op' of 'obfuscate', 'deobfuscate' or
+        'save_map'. Code comes from 'source' or is read from 'path'; it is
+        written to 'output' if given, otherwise returned as 'code'. An 'id'
+        is echoed back unchanged. 'deobfuscate' uses the shared map, or the
+        map file named by 'map' (cached by content, so repeating a map is free).
+
+        Args:
+            request (dict): The decoded request.
+
+        Returns:
+            dict: The response, with 'ok' and either results or 'error'.
+        """
+        start = time.perf_counter()
+        response = {'id': request.get('id')}
+        try:
+            op = request.get('op')
+            if op == 'obfuscate':
+                code = self._obfuscate(self._read_source(request), request.get('cf_budget'))
+            elif op == 'deobfuscate':
+                code = self._deobfuscate(self._read_source(request), request.get('mode', 'tokens'),
+                                         request.get('map'))
+            elif op == 'save_map':
+                path = request.get('path', self.map_path)
+                if path is None:
+                    raise ValueError("No map path given.")
+                self.save_map(path)
+                response.update(ok=True, path=path, entries=len(self.obfuscator.identifier_map))
+                return response
+            else:
+                raise ValueError(f"Unknown op {op!r}.")
+            if request.get('output'):
+                write_atomic(request['output'], code)
+                response['output'] = request['output']
+            else:
+                response['code'] = code
+            response['ok'] = True
+        except Exception as e:
+            response.update(ok=False, error=f"{type(e).__name__}: {e}")
+        response['ms'] = round((time.perf_counter() - start) * 1000, 3)
+        return response
+
+    def _read_source(self, request):
+        if 'source' in request:
+            return request['source']
+        with open(request['path'], 'r') as f:
+            return f.read()
+
+    def _obfuscate(self, source_code, cf_budget=None):
+        # Renaming is fused into code generation; the control-flow pass needs the whole tree first
+        passes = [] if cf_budget is None else [ControlFlowObfuscator(budget=cf_budget).obfuscate]
+        return Pipeline(passes + [self.obfuscator]).run(source_code)
+
+    def _deobfuscate(self, source_code, mode, map_path=None):
+        if map_path is not None:
+            with open(map_path, 'rb') as f:
+                deobfuscator, _ = self.deobfuscators.get(f.read())
+        else:
+            self._sync_reverse_map()
+            deobfuscator = self.deobfuscator
+        if mode == 'tokens':
+            return deobfuscator.deobfuscate_source(source_code)
+        if mode == 'ast':
+            return Pipeline([deobfuscator]).run(source_code)
+        raise ValueError(f"Unknown deobfuscation mode {mode!r}.")
+
+    def _sync_reverse_map(self):
+        # The identifier map only ever grows, so new entries are at its end
+        identifier_map = self.obfuscator.identifier_map
+        if len(identifier_map) == self._synced:
+            return
+        self.deobfuscator.update(dict(list(identifier_map.items())[self._synced:]))
+        self._synced = len(identifier_map)
+
+    def save_map(self, path):
+        write_atomic(path, json.dumps(self.obfuscator.identifier_map, indent=4))
+
+    def serve(self, infile, outfile):
+        """
+        Answers one JSON response line per request line until end of input,
+        then saves the map if a map path was configured.
+
+        Args:
+            infile: Text stream of JSON requests, one per line.
+            outfile: Text stream receiving JSON responses, one per line.
+        """
+        for line in infile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Request must be a JSON object.")
+            except ValueError as e:
+                response = {'id': None, 'ok': False, 'error': f"Invalid request: {e}"}
+            else:
+                response = self.handle(request)
+            outfile.write(json.dumps(response) + '\n')
+            outfile.flush()
+        if self.map_path is not None:
+            self.save_map(self.map_path)
@@ -0,0 +1,35 @@
+# src/verify.py
+
+def find_mismatch(expected_tree, node, path=()):
+    """
+    Compares an AST against hash trees recorded earlier with ASTNode.hash_tree().
+
+    Only subtrees whose digests differ are descended into, so identical
+    regions are skipped after a single comparison.
+
+    Args:
+        expected_tree (tuple): (digest, child trees) recorded from the original AST.
+        node (ASTNode): The AST to check, e.g. the deobfuscated one.
+        path (tuple, optional): Node types leading to this node, for reporting.
+
+    Returns:
+        tuple or None: Node types from the root down to the deepest differing
+        node, or None if the trees are identical.
+    """
+    actual_tree = node.hash_tree()
+    return _first_difference(expected_tree, actual_tree, node, path + (node.type,))
+
+
+def _first_difference(expected_tree, actual_tree, node, path):
+    expected_digest, expected_children = expected_tree
+    actual_digest, actual_children = actual_tree
+    if expected_digest == actual_digest:
+        return None
+    if len(expected_children) != len(actual_children):
+        return path
+    for expected_child, actual_child, child in zip(expected_children, actual_children, node.children):
+        mismatch = _first_difference(expected_child, actual_child, child, path + (child.type,))
+        if mismatch:
+            return mismatch
+    # Children match, so this node's own type or value differs
+    return path
@@ -0,0 +1,152 @@
+# src/watch.py
+
+import os
+import json
+import time
+from obfuscator import Obfuscator
+from control_flow import ControlFlowObfuscator
+from pipeline import Pipeline
+from incremental import FragmentCache, IncrementalGenerator
+from batch import collect_sources
+from fileutil import write_atomic
+
+
+class Watcher:
+    def __init__(self, source_args, output_dir, obfuscator=None, cf_budget=None,
+                 map_path='identifier_map.json', fragment_path=None):
+        """
+        Initializes a watcher that re-obfuscates only the files that change.
+
+        The obfuscator (and with it the identifier map), the parsed AST of
+        every file and the generated code of every function stay in memory
+        between polls, so an edit costs one file's worth of work rather than
+        a whole-tree run. Within a changed file, only the functions whose
+        structure changed are obfuscated and generated again; the others
+        reuse their cached code.
+
+        The names a changed file declares are mapped before any file is
+        generated. When that maps a name other files already used, those
+        files are generated again from their kept ASTs, so a global is
+        renamed everywhere whichever file declares it.
+
+        Args:
+            source_args (list): Files, directories or glob patterns to watch.
+            output_dir (str): Root directory for the obfuscated tree.
+            obfuscator (Obfuscator, optional): Obfuscator to reuse; a new one by default.
+            cf_budget (float, optional): Also run the control-flow pass with this budget.
+            map_path (str, optional): Where the identifier map is kept up to date.
+            fragment_path (str, optional): File the generated code of each
+                function is cached in between runs; kept in memory only by default.
+        """
+        self.source_args = source_args
+        self.output_dir = output_dir
+        self.obfuscator = obfuscator or Obfuscator()
+        self.cf_budget = cf_budget
+        self.map_path = map_path
+        self.stamps = {}
+        self.asts = {}
+        # Names each file's output left alone because they were not mapped yet
+        self.unmapped = {}
+        passes = [] if cf_budget is None else [ControlFlowObfuscator(budget=cf_budget).obfuscate]
+        self.generator = IncrementalGenerator(
+            self.obfuscator, FragmentCache(fragment_path, {'cf_budget': cf_budget}), passes)
+
+    def scan(self):
+        """
+        Returns the current (mtime, size) stamp and output path of every watched file.
+        """
+        current = {}
+        for size, path, relative in collect_sources(self.source_args):
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            current[path] = ((mtime, size), os.path.join(self.output_dir, relative))
+        return current
+
+    def poll_once(self):
+        """
+        Re-obfuscates every file that is new or changed since the last poll,
+        and every unchanged file using a name the changed ones newly declare.
+
+        Returns:
+            list: (file_path, output_path or None, seconds, error message or None)
+            for each file processed.
+        """
+        current = self.scan()
+        for path in set(self.stamps) - set(current):
+            # Deleted files are picked up again if they come back
+            del self.stamps[path]
+            self.asts.pop(path, None)
+            self.unmapped.pop(path, None)
+
+        parsed = {}
+        for path, (stamp, output_path) in current.items():
+            if self.stamps.get(path) == stamp:
+                continue
+            self.stamps[path] = stamp
+            parsed[path] = self._parse(path)
+
+        mapped = set(self.obfuscator.identifier_map)
+        self.obfuscator.rank([self.asts[path] for path in parsed if path in self.asts])
+        results = []
+        for path, (seconds, error) in parsed.items():
+            if error is None:
+                results.append(self._generate(path, current[path][1], seconds))
+            else:
+                results.append((path, None, seconds, error))
+
+        new_names = set(self.obfuscator.identifier_map) - mapped
+        if new_names:
+            for path, names in list(self.unmapped.items()):
+                if path not in parsed and names & new_names:
+                    results.append(self._generate(path, current[path][1]))
+            write_atomic(self.map_path, json.dumps(self.obfuscator.identifier_map, indent=4))
+        # Saved after the map, so saved fragments never use names the map lacks
+        self.generator.cache.save()
+        return results
+
+    def _parse(self, path):
+        """
+        Parses a changed file into self.asts and returns (seconds, error
+        message or None). A file that fails to parse is dropped until it
+        changes again.
+        """
+        start = time.perf_counter()
+        self.asts.pop(path, None)
+        self.unmapped.pop(path, None)
+        try:
+            with open(path, 'r') as f:
+                source_code = f.read()
+            self.asts[path] = Pipeline().parse(source_code)
+        except Exception as e:
+            return time.perf_counter() - start, f"{type(e).__name__}: {e}"
+        return time.perf_counter() - start, None
+
+    def _generate(self, path, output_path, seconds=0.0):
+        start = time.perf_counter()
+        try:
+            write_atomic(output_path, self.generator.generate(self.asts[path]))
+            self.unmapped[path] = self.generator.unmapped
+        except Exception as e:
+            return path, None, seconds + time.perf_counter() - start, f"{type(e).__name__}: {e}"
+        return path, output_path, seconds + time.perf_counter() - start, None
+
+    def run(self, interval=0.5, report=print):
+        """
+        Polls until interrupted, reporting each processed file.
+
+        Args:
+            interval (float, optional): Seconds between polls.
+            report (callable, optional): Receives one status line per processed file.
+        """
+        try:
+            while True:
+                for file_path, output_path, seconds, error in self.poll_once():
+                    if error:
+                        report(f"FAILED {file_path}: {error}")
+                    else:
+                        report(f"{file_path} -> {output_path} ({seconds * 1000:.1f} ms)")
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            report("Stopped watching.")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The src modules import each other by bare name (e.g. `from lexer import Lexer`)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
@@ -0,0 +1,26 @@
+import pytest
+from src.artifacts import ArtifactStore
+
+def test_ids_are_unique_and_lru_is_evicted_by_size():
+    store = ArtifactStore(max_bytes=10)
+    first = store.put(b'aaaa', 'out.zip')
+    second = store.put(b'bbbb', 'out.zip')
+    assert first != second
+    store.get(first)  # second is now least recently used
+    third = store.put(b'cccc', 'out.zip')
+    assert store.get(second) is None
+    assert store.get(first) == (b'aaaa', 'out.zip')
+    assert third in store and store.total_bytes == 8
+    with pytest.raises(ValueError):
+        store.put(b'x' * 11, 'big.zip')
+
+def test_idle_artifacts_expire():
+    now = [0.0]
+    store = ArtifactStore(ttl=60, clock=lambda: now[0])
+    old = store.put(b'old', 'a.zip')
+    now[0] = 30
+    kept = store.put(b'new', 'b.zip', artifact_id='job-1')
+    now[0] = 70
+    assert store.get(old) is None
+    assert store.get(kept) == (b'new', 'b.zip')
+    assert len(store) == 1 and store.total_bytes == 3
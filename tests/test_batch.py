@@ -0,0 +1,79 @@
+import os
+import pytest
+from src.deobfuscator import Deobfuscator
+from src.obfuscator import Obfuscator
+from src.hooks import StageHook, StageHooks
+from src import batch
+from src.batch import deobfuscate_files, collect_sources, obfuscate_files
+
+def test_deobfuscate_files_reports_failures_without_stopping(tmp_path):
+    deobfuscator = Deobfuscator({'a': 'Ab3_xyzw'})
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"obfuscated_{i}.c"
+        path.write_text(f"int Ab3_xyzw = {i};\n")
+        paths.append(str(path))
+    paths.insert(1, str(tmp_path / "missing.c"))
+
+    results = list(deobfuscate_files(deobfuscator, paths, str(tmp_path), jobs=2))
+
+    assert len(results) == 4
+    failed = [r for r in results if r[3]]
+    assert [r[0] for r in failed] == [paths[1]]
+    for i in range(3):
+        assert (tmp_path / f"deobfuscated_{i}.c").read_text() == f"int a = {i};\n"
+
+def test_deobfuscate_files_leaves_no_deobfuscator_behind(tmp_path):
+    path = tmp_path / "obfuscated_0.c"
+    path.write_text("int Ab3_xyzw = 0;\n")
+    for jobs in (1, 2):
+        list(deobfuscate_files(Deobfuscator({'a': 'Ab3_xyzw'}), [str(path), str(path)], str(tmp_path), jobs=jobs))
+        assert batch._worker_deobfuscator is None
+    results = list(deobfuscate_files(Deobfuscator({'b': 'Ab3_xyzw'}), [str(path)], str(tmp_path)))
+    assert results[0][3] is None
+    assert (tmp_path / "deobfuscated_0.c").read_text() == "int b = 0;\n"
+
+def test_obfuscate_files_streams_directory_largest_first(tmp_path):
+    source_dir = tmp_path / "proj"
+    (source_dir / "sub").mkdir(parents=True)
+    (source_dir / "small.c").write_text("int a = 1;\n")
+    (source_dir / "sub" / "large.c").write_text("int a = 1;\nint b = a + 2;\nint c = b * 3;\n")
+    (source_dir / "notes.txt").write_text("not C")
+
+    sources = collect_sources([str(source_dir)])
+    assert [relative for _, _, relative in sources] == [os.path.join("sub", "large.c"), "small.c"]
+
+    obfuscator = Obfuscator()
+    results = list(obfuscate_files(sources, str(tmp_path / "out"), obfuscator, jobs=2))
+    assert all(error is None for _, _, _, error in results)
+    large = (tmp_path / "out" / "sub" / "large.c").read_text()
+    assert obfuscator.identifier_map['b'] in large
+    assert 'b' not in large.split()
+
+def test_names_declared_in_one_file_are_renamed_in_every_file(tmp_path):
+    source_dir = tmp_path / "proj"
+    source_dir.mkdir()
+    # The larger file, which reads the global, is renamed first
+    (source_dir / "use.c").write_text("int main() {\n    int total = limit + 1;\n    return total;\n}\n")
+    (source_dir / "defs.c").write_text("int limit = 3;\n")
+    obfuscator = Obfuscator()
+    results = list(obfuscate_files(collect_sources([str(source_dir)]), str(tmp_path / "out"), obfuscator, jobs=1))
+    assert all(error is None for _, _, _, error in results)
+    use = (tmp_path / "out" / "use.c").read_text()
+    assert obfuscator.identifier_map['limit'] in use
+    assert 'limit' not in use
+
+def test_obfuscate_files_parses_each_file_once(tmp_path):
+    parsed = []
+
+    class ParseRecorder(StageHook):
+        def after_stage(self, stage, info):
+            if stage == 'parse':
+                parsed.append(info['path'])
+
+    for name in ("a.c", "b.c"):
+        (tmp_path / name).write_text("int main() {\n    return 0;\n}\n")
+    results = list(obfuscate_files(collect_sources([str(tmp_path)]), str(tmp_path / "out"), Obfuscator(), jobs=2,
+                                   hooks=StageHooks([ParseRecorder()])))
+    assert all(error is None for _, _, _, error in results)
+    assert sorted(parsed) == sorted(path for path, _, _, _ in results)
@@ -1,6 +1,6 @@
 import pytest
 from src.lexer import Lexer
-from src.parser import Parser
+from src.code_parser import Parser
 from src.code_generator import CodeGenerator
 
 def test_generate_code():
@@ -11,5 +11,22 @@ def test_generate_code():
     ast = parser.parse()
     generator = CodeGenerator()
     code = generator.generate(ast)
-    expected = "int a;\na = (5 + 3);"
-    assert code.strip() == expected
\ No newline at end of file
+    expected = "int a = 5 + 3;"
+    assert code.strip() == expected
+
+def test_generate_nested_unary_operators_round_trip():
+    source = "a = -(!b);"
+    ast = Parser(Lexer(source).tokenize()).parse()
+    code = CodeGenerator().generate(ast)
+    assert code.strip() == "a = -(!b);"
+    assert Parser(Lexer(code).tokenize()).parse().to_dict() == ast.to_dict()
+
+def test_generate_preprocessor_directives_and_prototypes():
+    source = '#include <stdio.h>\n#include "util.h"\n#define LIMIT 10\nint add(int a, int b);\n'
+    code = CodeGenerator().generate(Parser(Lexer(source).tokenize()).parse())
+    assert code == source
+
+def test_generate_escaped_strings_and_chars_round_trip():
+    source = "char c = '\\''; puts(\"a\\\"b\");"
+    code = CodeGenerator().generate(Parser(Lexer(source).tokenize()).parse())
+    assert code == "char c = '\\'';\nputs(\"a\\\"b\");\n"
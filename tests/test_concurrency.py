@@ -0,0 +1,52 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from benchmarks.synthetic import generate_program
+from src.lexer import Lexer
+from src.code_parser import Parser
+from src.code_generator import CodeGenerator
+from src.obfuscator import Obfuscator
+from src.deobfuscator import Deobfuscator
+
+@pytest.fixture
+def fast_switching():
+    # Switch threads as often as possible to shake out races on GIL builds too
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+def test_shared_instances_survive_concurrent_use(fast_switching):
+    sources = [generate_program(functions=3, statements=8, identifiers=24, seed=seed) for seed in range(48)]
+    lexer = Lexer()
+    parser = Parser()
+    generator = CodeGenerator()
+    obfuscator = Obfuscator()
+
+    def parse(source):
+        return parser.parse(lexer.tokenize(source))
+
+    expected = [generator.generate(parse(source)) for source in sources]
+
+    def obfuscate(source):
+        return generator.generate(obfuscator.obfuscate(parse(source)))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        obfuscated = list(executor.map(obfuscate, sources))
+        names = list(obfuscator.identifier_map.values())
+        assert len(set(names)) == len(names)
+
+        deobfuscator = Deobfuscator(obfuscator.identifier_map)
+
+        def deobfuscate(code):
+            return generator.generate(deobfuscator.deobfuscate(parse(code)))
+
+        assert list(executor.map(deobfuscate, obfuscated)) == expected
+
+def test_one_parser_parses_its_tokens_from_many_threads(fast_switching):
+    parser = Parser(Lexer(generate_program(functions=4, seed=1)).tokenize())
+    expected = parser.get_parse_tree()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        trees = list(executor.map(lambda _: parser.parse().to_dict(), range(16)))
+    assert all(tree == expected for tree in trees)
+    assert parser.position == 0
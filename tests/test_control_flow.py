@@ -0,0 +1,82 @@
+import pytest
+from src.lexer import Lexer
+from src.code_parser import Parser
+from src.code_generator import CodeGenerator
+from src.control_flow import ControlFlowObfuscator
+
+SOURCE = """
+int main() {
+    int a = 0;
+    if (a == 0) { a = 1; }
+    while (a < 10) {
+        if (a > 5) { a = a + 2; }
+        a = a + 1;
+    }
+    return a;
+}
+"""
+
+def parse(source):
+    return Parser(Lexer(source).tokenize()).parse()
+
+def test_zero_budget_leaves_code_unchanged():
+    expected = CodeGenerator().generate(parse(SOURCE))
+    control_flow = ControlFlowObfuscator(budget=0)
+    code = CodeGenerator().generate(control_flow.obfuscate(parse(SOURCE)))
+    assert code == expected
+    assert control_flow.applied == []
+
+def test_small_budget_skips_loop_bodies():
+    control_flow = ControlFlowObfuscator(budget=0.5, seed=0)
+    ast = control_flow.obfuscate(parse(SOURCE))
+    body = ast.children[0].children[2]
+    loop = body.children[2]
+    assert control_flow.spent <= control_flow.baseline_cost * 0.5
+    assert body.children[1].children[0].type == 'LogicalAnd'
+    assert loop.children[1].children[0].children[0].type == 'Relational'
+
+def test_output_reparses():
+    control_flow = ControlFlowObfuscator(budget=100, seed=0)
+    code = CodeGenerator().generate(control_flow.obfuscate(parse(SOURCE)))
+    assert len(control_flow.applied) == 5
+    assert parse(code).type == 'Program'
+
+INT_MIN, INT_MAX = -2 ** 31, 2 ** 31 - 1
+
+def evaluate_int32(node, x):
+    """Evaluates a predicate with C int semantics, failing on signed overflow."""
+    if node.type == 'Identifier':
+        return x
+    if node.type == 'Number':
+        return int(node.value or 0)
+    left, right = (evaluate_int32(child, x) for child in node.children)
+    if node.value == '/':
+        result = abs(left) // abs(right) * (1 if (left < 0) == (right < 0) else -1)
+    else:
+        result = {'+': lambda: left + right, '-': lambda: left - right, '*': lambda: left * right,
+                  '==': lambda: int(left == right), '!=': lambda: int(left != right)}[node.value]()
+    assert INT_MIN <= result <= INT_MAX, f"{left} {node.value} {right} overflows int"
+    return result
+
+def test_opaque_predicate_holds_without_overflow():
+    ast = ControlFlowObfuscator(budget=100, seed=0).obfuscate(
+        parse("int f(int x) { if (x > 0) { return 1; } return 0; }"))
+    if_statement = ast.children[0].children[2].children[0]
+    predicates = [if_statement.children[0].children[1], if_statement.children[1].children[0].children[0]]
+    for value in [INT_MIN, INT_MIN + 1, -46341, -1, 0, 1, 46341, INT_MAX]:
+        for predicate, truth in zip(predicates, (1, 0)):
+            assert evaluate_int32(predicate, value) == truth
+
+def test_uninitialized_variables_are_never_read():
+    source = """
+int g;
+int main() {
+    int a;
+    if (a == 0) { a = 1; }
+    return a;
+}
+"""
+    control_flow = ControlFlowObfuscator(budget=100, seed=0)
+    code = CodeGenerator().generate(control_flow.obfuscate(parse(source)))
+    assert len(control_flow.applied) == 2
+    assert 'g / 2' in code and 'a / 2' not in code
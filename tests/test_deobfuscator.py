@@ -1,7 +1,8 @@
+import io
 import sys
 import pytest
 from src.lexer import Lexer  # Updated import path
-from src.parser import Parser  # Added import for Parser
+from src.code_parser import Parser  # Added import for Parser
 from src.obfuscator import Obfuscator  # Added import for Obfuscator
 from src.deobfuscator import Deobfuscator  # Updated import path
 
@@ -17,5 +18,50 @@ def test_deobfuscate_identifiers():
     deobfuscator = Deobfuscator(obfuscator.identifier_map)
     deobf_ast = deobfuscator.deobfuscate(obf_ast)
     
-    assign = deobf_ast.children[2]
-    assert assign.value == 'a'
\ No newline at end of file
+    decl_b = deobf_ast.children[1]
+    assert deobf_ast.children[0].value == 'a'
+    assert decl_b.value == 'b'
+    assert decl_b.children[1].children[0].children[0].value == 'a'
+
+def test_deobfuscate_source_preserves_formatting():
+    deobfuscator = Deobfuscator({'count': 'Xq3_abcd', 'main': 'Zz9_efgh'})
+    source = 'int Zz9_efgh() {\n    // Xq3_abcd in a comment is left alone\n    int Xq3_abcd = 1; /* keep */\n    puts("Xq3_abcd");\n    return Xq3_abcd;\n}\n'
+    expected = 'int main() {\n    // Xq3_abcd in a comment is left alone\n    int count = 1; /* keep */\n    puts("Xq3_abcd");\n    return count;\n}\n'
+    assert deobfuscator.deobfuscate_source(source) == expected
+
+def test_deobfuscate_source_handles_unparseable_code():
+    deobfuscator = Deobfuscator({'arr': 'Kk1_mnop'})
+    source = "int Kk1_mnop[4]; x = Kk1_mnop[0] ? 1 : 2;"
+    assert deobfuscator.deobfuscate_source(source) == "int arr[4]; x = arr[0] ? 1 : 2;"
+
+def test_deobfuscate_source_resyncs_after_escaped_quotes_and_chars():
+    deobfuscator = Deobfuscator({'count': 'Xq3_abcd'})
+    source = 'puts("say \\"Xq3_abcd\\""); c = \'"\'; Xq3_abcd = 1;'
+    expected = 'puts("say \\"Xq3_abcd\\""); c = \'"\'; count = 1;'
+    assert deobfuscator.deobfuscate_source(source) == expected
+
+def test_deobfuscate_stream_matches_whole_identifiers_only():
+    deobfuscator = Deobfuscator({'counter': 'Ab3_xyzw', 'main': 'Qq_1rstu'})
+    log = (b"crash in Qq_1rstu at 0x10\n"
+           b"Ab3_xyzw=4 xAb3_xyzw Ab3_xyzw_1 Ab3_xyzw.next\n"
+           b"frame #2 Qq_1rstu()")
+    out = io.BytesIO()
+    deobfuscator.deobfuscate_stream(io.BytesIO(log), out, chunk_size=7)
+    assert out.getvalue() == (b"crash in main at 0x10\n"
+                              b"counter=4 xAb3_xyzw Ab3_xyzw_1 counter.next\n"
+                              b"frame #2 main()")
+
+def test_deobfuscate_stream_bounds_carry_over_without_newlines():
+    # Names of equal length, so input and output offsets line up
+    deobfuscator = Deobfuscator({'counters': 'Ab3_xyzw'})
+    out = io.BytesIO()
+
+    class Reader(io.BytesIO):
+        def read(self, size=-1):
+            # At most one name is held back between reads
+            assert self.tell() - len(out.getvalue()) <= 8
+            return super().read(size)
+
+    data = b"Ab3_xyzw+" * 50 + b"x" * 500 + b" Ab3_xyzw"
+    deobfuscator.deobfuscate_stream(Reader(data), out, chunk_size=7)
+    assert out.getvalue() == b"counters+" * 50 + b"x" * 500 + b" counters"
@@ -0,0 +1,45 @@
+import json
+import pytest
+from src.identifier_map import write_binary_map
+from src.deobfuscator_cache import DeobfuscatorCache, map_digest
+
+def map_bytes(size, prefix='v'):
+    return json.dumps({f'{prefix}{i}': f'Obf{prefix}{i:05d}' for i in range(size)}).encode()
+
+def test_repeat_maps_reuse_one_deobfuscator():
+    cache = DeobfuscatorCache()
+    first, cached = cache.get(map_bytes(10))
+    assert not cached and first.reverse_map['Obfv00003'] == 'v3'
+    again, cached = cache.get(map_bytes(10))
+    assert cached and again is first
+    assert cache.lookup(map_digest(map_bytes(10))) is first and cache.lookup('0' * 32) is None
+    assert (cache.hits, cache.misses, len(cache)) == (2, 2, 1)
+    assert cache.total_bytes > len(map_bytes(10))
+
+def test_least_recently_used_maps_are_evicted_by_size():
+    a, b, c = map_bytes(50, 'a'), map_bytes(50, 'b'), map_bytes(50, 'c')
+    probe = DeobfuscatorCache()
+    probe.get(a)
+    cache = DeobfuscatorCache(max_bytes=probe.total_bytes * 2)
+    cache.get(a)
+    cache.get(b)
+    cache.get(a)  # b is now least recently used
+    cache.get(c)
+    assert a in cache and c in cache and b not in cache
+    assert cache.total_bytes <= cache.max_bytes
+
+    deobfuscator, cached = DeobfuscatorCache(max_bytes=10).get(a)
+    assert not cached and deobfuscator.reverse_map['Obfa00001'] == 'a1'
+
+def test_binary_maps_are_charged_their_bytes_and_bad_maps_raise(tmp_path):
+    path = tmp_path / "map.cidmap"
+    write_binary_map({'total': 'Xy_12345'}, str(path))
+    data = path.read_bytes()
+    cache = DeobfuscatorCache()
+    deobfuscator, _ = cache.get(data)
+    assert deobfuscator.deobfuscate_source("int Xy_12345;") == "int total;"
+    assert cache.total_bytes == len(data)
+    for bad in (b'[1, 2]', b'{not json', b'\xff\xfe'):
+        with pytest.raises(ValueError):
+            cache.get(bad)
+    assert len(cache) == 1
@@ -0,0 +1,26 @@
+import os
+from src.fileutil import write_atomic, current_umask
+
+def test_write_atomic_keeps_mode_and_honours_umask(tmp_path):
+    existing = tmp_path / "existing.c"
+    existing.write_text("old")
+    os.chmod(existing, 0o600)
+    write_atomic(str(existing), "new")
+    assert existing.read_text() == "new"
+    assert os.stat(existing).st_mode & 0o777 == 0o600
+
+    fresh = tmp_path / "fresh.c"
+    previous = os.umask(0o022)
+    try:
+        write_atomic(str(fresh), "text")
+    finally:
+        os.umask(previous)
+    assert os.stat(fresh).st_mode & 0o777 == 0o644
+
+def test_current_umask_follows_later_changes():
+    previous = os.umask(0o027)
+    try:
+        assert current_umask() == 0o027
+        assert current_umask() == 0o027
+    finally:
+        os.umask(previous)
@@ -0,0 +1,32 @@
+import pytest
+from src.hooks import StageHook, StageHooks
+
+class Recorder(StageHook):
+    def __init__(self, name, events):
+        self.name = name
+        self.events = events
+
+    def before_stage(self, stage, info):
+        self.events.append((self.name, 'before', stage, info['path']))
+
+    def after_stage(self, stage, info):
+        self.events.append((self.name, 'after', stage, type(info['error']).__name__, info['seconds'] >= 0))
+
+def test_hooks_wrap_stages_in_order():
+    events = []
+    hooks = StageHooks([Recorder('a', events)])
+    hooks.register(Recorder('b', events))
+    with hooks.stage('lex', path='x.c'):
+        events.append('body')
+    assert events == [
+        ('a', 'before', 'lex', 'x.c'), ('b', 'before', 'lex', 'x.c'), 'body',
+        ('b', 'after', 'lex', 'NoneType', True), ('a', 'after', 'lex', 'NoneType', True),
+    ]
+
+def test_after_hooks_see_errors():
+    events = []
+    hooks = StageHooks([Recorder('a', events)])
+    with pytest.raises(RuntimeError):
+        with hooks.stage('parse', path='bad.c'):
+            raise RuntimeError('Unexpected token')
+    assert events[-1] == ('a', 'after', 'parse', 'RuntimeError', True)
@@ -0,0 +1,52 @@
+import io
+import json
+import pickle
+import pytest
+from src.identifier_map import (
+    MAGIC, MappedIdentifierMap, write_binary_map, load_identifier_map, decode_identifier_map,
+    json_to_binary, binary_to_json
+)
+from src.deobfuscator import Deobfuscator
+
+IDENTIFIER_MAP = {'main': 'Qq_1rstu', 'counter': 'Ab3_xyzw', 'zeta': 'b0000000', 'naïve': 'C9_klmno'}
+
+def test_forward_and_reverse_lookups(tmp_path):
+    path = tmp_path / "map.cidmap"
+    write_binary_map(IDENTIFIER_MAP, str(path))
+    mapped = MappedIdentifierMap.open(str(path))
+    assert len(mapped) == 4
+    assert dict(mapped.items()) == IDENTIFIER_MAP
+    assert mapped['naïve'] == 'C9_klmno'
+    assert 'missing' not in mapped
+    reverse = mapped.reverse_view()
+    assert reverse['Ab3_xyzw'] == 'counter'
+    assert reverse.get('main') is None
+    assert pickle.loads(pickle.dumps(reverse))['Qq_1rstu'] == 'main'
+
+def test_json_round_trip_and_deobfuscation(tmp_path):
+    json_path, binary_path, back_path = tmp_path / "a.json", tmp_path / "a.cidmap", tmp_path / "b.json"
+    json_path.write_text(json.dumps(IDENTIFIER_MAP))
+    json_to_binary(str(json_path), str(binary_path))
+    binary_to_json(str(binary_path), str(back_path))
+    assert json.loads(back_path.read_text()) == IDENTIFIER_MAP
+    assert isinstance(load_identifier_map(str(json_path)), dict)
+    deobfuscator = Deobfuscator(load_identifier_map(str(binary_path)))
+    assert deobfuscator.deobfuscate_source("int Ab3_xyzw = Qq_1rstu();") == "int counter = main();"
+
+def test_truncated_or_corrupt_maps_raise_value_error(tmp_path):
+    path = tmp_path / "map.cidmap"
+    write_binary_map(IDENTIFIER_MAP, str(path))
+    data = path.read_bytes()
+    for broken in [MAGIC + b'\x01', MAGIC, data[:40], data[:-10]]:
+        with pytest.raises(ValueError):
+            decode_identifier_map(broken)
+    assert dict(decode_identifier_map(data).items()) == IDENTIFIER_MAP
+
+def test_stream_deobfuscation_searches_binary_map_in_place(tmp_path):
+    path = tmp_path / "map.cidmap"
+    write_binary_map(IDENTIFIER_MAP, str(path))
+    deobfuscator = Deobfuscator(MappedIdentifierMap.open(str(path)))
+    assert deobfuscator.reverse_map.key_lengths() == (8, 8)
+    out = io.BytesIO()
+    deobfuscator.deobfuscate_stream(io.BytesIO(b"Qq_1rstu: Ab3_xyzw=C9_klmno b0000000x"), out, chunk_size=5)
+    assert out.getvalue() == "main: counter=naïve b0000000x".encode()
@@ -0,0 +1,61 @@
+import pytest
+from src.obfuscator import Obfuscator
+from src.pipeline import Pipeline
+from src.incremental import FragmentCache, IncrementalGenerator
+
+FUNCTIONS = [
+    "int add(int left, int right) {\n    return left + right;\n}\n",
+    "int twice(int value) {\n    return add(value, value);\n}\n",
+    "int main() {\n    int total = twice(4);\n    return total;\n}\n",
+]
+
+def generate(generator, source):
+    return generator.generate(Pipeline().parse(source))
+
+def test_only_changed_functions_are_regenerated():
+    obfuscator = Obfuscator()
+    generator = IncrementalGenerator(obfuscator)
+    source = ''.join(FUNCTIONS)
+    first = generate(generator, source)
+    assert (generator.reused, generator.regenerated) == (0, 3)
+    assert first == Pipeline([obfuscator]).run(source)
+
+    assert generate(generator, source) == first
+    assert (generator.reused, generator.regenerated) == (3, 0)
+
+    edited = source.replace("twice(4)", "twice(5)")
+    second = generate(generator, edited)
+    assert (generator.reused, generator.regenerated) == (2, 1)
+    assert second == first.replace("(4)", "(5)")
+    assert second == Pipeline([obfuscator]).run(edited)
+
+def test_fragments_are_dropped_when_a_name_they_use_gets_mapped():
+    obfuscator = Obfuscator()
+    generator = IncrementalGenerator(obfuscator)
+    use = "int show() {\n    return counter;\n}\n"
+    assert 'counter' in generate(generator, use)
+    output = generate(generator, "int counter = 1;\n" + use)
+    assert (generator.reused, generator.regenerated) == (0, 2)
+    assert 'counter' not in output and output.count(obfuscator.identifier_map['counter']) == 2
+
+def test_saved_fragments_are_reused_with_the_same_map_and_settings(tmp_path):
+    path = str(tmp_path / "fragments.json")
+    obfuscator = Obfuscator()
+    cache = FragmentCache(path, {'cf_budget': None})
+    first = generate(IncrementalGenerator(obfuscator, cache), ''.join(FUNCTIONS))
+    cache.save()
+
+    reloaded = IncrementalGenerator(obfuscator, FragmentCache(path, {'cf_budget': None}))
+    assert generate(reloaded, ''.join(FUNCTIONS)) == first
+    assert reloaded.regenerated == 0
+
+    other_map = IncrementalGenerator(Obfuscator(), FragmentCache(path, {'cf_budget': None}))
+    generate(other_map, ''.join(FUNCTIONS))
+    assert other_map.reused == 0
+    assert FragmentCache(path, {'cf_budget': 0.2}).fragments == {}
+
+def test_least_recently_used_fragments_are_evicted():
+    cache = FragmentCache(max_entries=2)
+    for digest in ('a', 'b', 'c'):
+        cache.store(digest, digest, {})
+    assert list(cache.fragments) == ['b', 'c']
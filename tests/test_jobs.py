@@ -0,0 +1,65 @@
+import json
+import time
+import threading
+import pytest
+from src.jobs import JobQueue, QueueFull, MapNotCached, run_obfuscation, run_deobfuscation
+from src.deobfuscator_cache import map_digest
+
+def test_queue_rejects_work_beyond_max_pending():
+    release = threading.Event()
+    queue = JobQueue(max_workers=1, max_pending=1)
+    # A thread pool keeps the blocking job in-process so it can be released
+    from concurrent.futures import ThreadPoolExecutor
+    queue._executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        job_id = queue.submit('obfuscate', release.wait)
+        with pytest.raises(QueueFull):
+            queue.submit('obfuscate', release.wait)
+        release.set()
+        queue.get(job_id)['future'].result(timeout=5)
+        assert queue.status(job_id) == 'done'
+        queue.submit('obfuscate', release.wait)
+    finally:
+        release.set()
+        queue.shutdown()
+
+def test_obfuscation_job_runs_in_worker_process():
+    queue = JobQueue(max_workers=1)
+    try:
+        job_id = queue.submit('obfuscate', run_obfuscation, "int main() { int a = 1; return a; }")
+        result = queue.get(job_id)['future'].result(timeout=30)
+        assert set(result['identifier_map']) == {'main', 'a'}
+        assert result['identifier_map']['a'] in result['obf_code']
+    finally:
+        queue.shutdown()
+
+def wait_for(queue, job_id):
+    for _ in range(600):
+        status = queue.status(job_id)
+        if status in ('done', 'failed'):
+            return status
+        time.sleep(0.05)
+    raise AssertionError('job did not finish')
+
+def test_workers_cache_deobfuscators_by_map_digest():
+    map_bytes = json.dumps({'a': 'Ab3_xyzw'}).encode()
+    digest = map_digest(map_bytes)
+    queue = JobQueue(max_workers=1)
+    try:
+        first = queue.submit('deobfuscate', run_deobfuscation, "int Ab3_xyzw = 1;", digest, map_bytes)
+        assert wait_for(queue, first) == 'done'
+        cached = queue.submit('deobfuscate', run_deobfuscation, "int Ab3_xyzw = 2;", digest)
+        assert wait_for(queue, cached) == 'done'
+        assert queue.get(cached)['future'].result()['original_code'] == "int a = 2;\n"
+
+        other_bytes = json.dumps({'b': 'Zz9_qwer'}).encode()
+        other = map_digest(other_bytes)
+        missing = queue.submit('deobfuscate', run_deobfuscation, "int Zz9_qwer;", other)
+        assert wait_for(queue, missing) == 'failed'
+        assert isinstance(queue.get(missing)['future'].exception(), MapNotCached)
+        retried = queue.submit('deobfuscate', run_deobfuscation, "int Zz9_qwer;", other,
+                               fallback=("int Zz9_qwer;", other, other_bytes))
+        assert wait_for(queue, retried) == 'done'
+        assert queue.get(retried)['future'].result()['original_code'] == "int b;\n"
+    finally:
+        queue.shutdown()
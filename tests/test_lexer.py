@@ -10,11 +10,31 @@ def test_tokenize_simple():
     assert tokens[1].type == 'IDENT'
     assert tokens[2].type == 'OP'
     assert tokens[3].type == 'NUMBER'
-    assert tokens[4].type == 'OP'
+    assert tokens[4].type == 'SEMICOLON'
     assert tokens[5].type == 'EOF'
 
 def test_tokenize_invalid():
     source = "int @ = 5;"
     lexer = Lexer(source)
     with pytest.raises(RuntimeError):
-        lexer.tokenize()
\ No newline at end of file
+        lexer.tokenize()
+
+def test_tokenize_is_repeatable():
+    lexer = Lexer("int a = 5;")
+    first = lexer.tokenize()
+    assert lexer.tokenize() == first
+    assert len(lexer.tokens) == len(first) == 6
+    assert lexer.tokenize("b = 1;")[0].value == 'b'
+    assert lexer.tokens == first
+
+def test_identifier_spans_skip_escaped_quotes():
+    source = 'puts("a\\"b"); total = 1;'
+    names = [name for _, _, name in Lexer(source).identifier_spans()]
+    assert names == ['puts', 'total']
+
+def test_identifier_spans_skip_char_literals():
+    source = "c = '\"'; total = c + '\\'';"
+    names = [name for _, _, name in Lexer(source).identifier_spans()]
+    assert names == ['c', 'total', 'c']
+    tokens = Lexer(source).tokenize()
+    assert [token.value for token in tokens if token.type == 'CHAR'] == ["'\"'", "'\\''"]
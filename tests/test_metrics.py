@@ -0,0 +1,24 @@
+from src.metrics import PipelineMetrics, timed
+
+def test_histogram_buckets_are_cumulative():
+    metrics = PipelineMetrics(buckets=(0.01, 0.1))
+    metrics.observe('lexer', 0.005)
+    metrics.observe('lexer', 0.05)
+    metrics.observe('lexer', 5)
+    text = metrics.render()
+    assert 'obfuscator_stage_seconds_bucket{stage="lexer",le="0.01"} 1' in text
+    assert 'obfuscator_stage_seconds_bucket{stage="lexer",le="0.1"} 2' in text
+    assert 'obfuscator_stage_seconds_bucket{stage="lexer",le="+Inf"} 3' in text
+    assert 'obfuscator_stage_seconds_count{stage="lexer"} 3' in text
+
+def test_counters_and_recorded_timings():
+    metrics = PipelineMetrics()
+    timings = {}
+    with timed(timings, 'parser'):
+        pass
+    metrics.record(timings)
+    metrics.count('input_chars', 'source', 40)
+    metrics.count('input_chars', 'source', 2)
+    text = metrics.render()
+    assert 'obfuscator_stage_seconds_count{stage="parser"} 1' in text
+    assert 'obfuscator_input_chars_total{kind="source"} 42' in text
@@ -1,8 +1,9 @@
 import sys
+import itertools
 import pytest
 from src.lexer import Lexer  # Updated import path
-from src.parser import Parser  # Added import for Parser
-from src.obfuscator import Obfuscator  # Updated import path
+from src.code_parser import Parser  # Added import for Parser
+from src.obfuscator import Obfuscator, short_names  # Updated import path
 
 def test_obfuscate_identifiers():
     source = "int a = 5; float b = a + 3;"
@@ -15,8 +16,39 @@ def test_obfuscate_identifiers():
     
     decl_a = obf_ast.children[0]
     decl_b = obf_ast.children[1]
-    assign = obf_ast.children[2]
+    use_of_a = decl_b.children[1].children[0].children[0]
     
-    assert decl_a.children[0].value.startswith('var_')
-    assert decl_b.children[0].value.startswith('var_')
-    assert assign.value.startswith('var_')
\ No newline at end of file
+    assert decl_a.value == obfuscator.identifier_map['a'] != 'a'
+    assert decl_b.value == obfuscator.identifier_map['b'] != 'b'
+    assert use_of_a.value == decl_a.value
+    assert decl_a.children[0].value == 'int'
+
+def test_minify_gives_frequent_identifiers_the_shortest_names():
+    source = """int rare = 1;
+int often = rare;
+int f(int often_param) {
+    often = often + often_param;
+    often = often * often;
+    return printf(often);
+}
+"""
+    obfuscator = Obfuscator(minify=True)
+    obfuscator.obfuscate(Parser(Lexer(source).tokenize()).parse())
+    names = obfuscator.identifier_map
+    assert names['often'] == 'a'
+    assert sorted(names.values()) == ['a', 'b', 'c', 'd']
+    assert 'printf' not in names
+    assert len(set(names.values())) == len(names)
+
+def test_minify_skips_taken_reserved_and_external_names():
+    obfuscator = Obfuscator(minify=True)
+    obfuscator.identifier_map = {'kept': 'a'}
+    obfuscator.reserved_keywords = obfuscator.reserved_keywords | {'c'}
+    # 'b' is used but never declared, like a library function, so it is never handed out
+    obfuscator.obfuscate(Parser(Lexer("int x = b;\nint y = x;\n").tokenize()).parse())
+    assert obfuscator.identifier_map == {'kept': 'a', 'x': 'd', 'y': 'e'}
+
+def test_short_names_are_shortest_first():
+    names = list(itertools.islice(short_names(), 60))
+    assert names[:3] == ['a', 'b', 'c'] and names[52] == 'aa'
+    assert not any(name.startswith('_') for name in names)
@@ -0,0 +1,91 @@
+import random
+import shutil
+import subprocess
+import pytest
+from src.lexer import Lexer
+from src.code_parser import Parser
+from src.code_generator import CodeGenerator
+from src.optimizer import Optimizer
+
+def optimized(source):
+    optimizer = Optimizer()
+    ast = optimizer.optimize(Parser(Lexer(source).tokenize()).parse())
+    return CodeGenerator().generate(ast), optimizer
+
+def test_constant_subexpressions_are_folded():
+    code, optimizer = optimized("int a = 2 * 3 + 4;\nint b = (7 - 10) / 2 + x;\nint c = !(1 < 2) || 0;\n")
+    assert code == "int a = 10;\nint b = -1 + x;\nint c = 0;\n"
+    assert optimizer.folded == 7
+
+def test_unsafe_expressions_are_left_alone():
+    source = "int a = 1 / 0;\nint b = 2147483647 + 1;\nint c = 1.5 * 2;\nint d = x * 0;\n"
+    code, optimizer = optimized(source)
+    assert code == CodeGenerator().generate(Parser(Lexer(source).tokenize()).parse())
+    assert optimizer.folded == 0
+
+def test_dead_branches_are_removed():
+    source = """int f(int x) {
+    if (0) {
+        x = 1;
+    }
+    while (2 < 1) {
+        x = 2;
+    }
+    if (1) {
+        x = x + 1;
+    }
+    if (1) {
+        int y = 3;
+        x = y;
+    }
+    return x;
+    x = 4;
+}
+"""
+    code, optimizer = optimized(source)
+    assert code == "int f(int x) {\nx = x + 1;\nif (1) {\nint y = 3;\nx = y;\n}\nreturn x;\n}\n\n"
+    assert optimizer.removed == 4
+
+def random_expression(rng, depth):
+    if depth == 0 or rng.random() < 0.25:
+        return rng.choice(['x', 'y', str(rng.randint(0, 20))])
+    kind = rng.random()
+    if kind < 0.15:
+        return f"{rng.choice(['-', '!'])}({random_expression(rng, depth - 1)})"
+    if kind < 0.25:
+        # Only divide by positive literals, so neither program divides by zero
+        return f"({random_expression(rng, depth - 1)}) / {rng.randint(1, 7)}"
+    op = rng.choice(['+', '-', '*', '<', '>', '<=', '>=', '==', '!=', '&&', '||'])
+    return f"({random_expression(rng, depth - 1)}) {op} ({random_expression(rng, depth - 1)})"
+
+def random_program(seed, count=40):
+    rng = random.Random(seed)
+    lines = ['#include <stdio.h>', 'int check(int x, int y) {', '    int r = 0;']
+    for _ in range(count):
+        lines.append(f"    r = r * 3 + ({random_expression(rng, 4)});")
+        if rng.random() < 0.3:
+            lines.append(f"    if ({random_expression(rng, 2).replace('x', '1').replace('y', '0')}) {{")
+            lines.append(f"        r = r + {rng.randint(1, 9)};")
+            lines.append("    }")
+    lines += ['    return r;', '    r = 0;', '}', 'int main() {',
+              '    int x = -3;', '    while (x < 4) {',
+              '        printf("%d\\n", check(x, 2 - x));', '        x = x + 1;', '    }',
+              '    return 0;', '}', '']
+    return '\n'.join(lines)
+
+def run_c(code, tmp_path, name):
+    source = tmp_path / f"{name}.c"
+    source.write_text(code)
+    binary = tmp_path / name
+    subprocess.run(['gcc', '-fwrapv', '-w', '-o', str(binary), str(source)], check=True)
+    return subprocess.run([str(binary)], check=True, capture_output=True, text=True).stdout
+
+@pytest.mark.skipif(shutil.which('gcc') is None, reason="needs gcc")
+@pytest.mark.parametrize('seed', range(3))
+def test_optimized_programs_behave_like_unoptimized_ones(tmp_path, seed):
+    source = random_program(seed)
+    ast = Parser(Lexer(source).tokenize()).parse()
+    plain = CodeGenerator().generate(ast)
+    code, optimizer = optimized(source)
+    assert optimizer.folded > 0 and len(code) < len(plain)
+    assert run_c(code, tmp_path, 'optimized') == run_c(plain, tmp_path, 'plain')
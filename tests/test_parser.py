@@ -1,7 +1,7 @@
 import sys
 import pytest
 from src.lexer import Lexer  # Updated import path
-from src.parser import Parser  # Added import for Parser
+from src.code_parser import Parser  # Added import for Parser
 
 def test_parse_declaration():
     source = "int a;"
@@ -24,8 +24,8 @@ def test_parse_assignment():
     parser = Parser(tokens)
     ast = parser.parse()
     assign = ast.children[0]
-    assert assign.type == 'Assignment'
+    assert assign.type == 'AssignmentStatement'
     assert assign.value == 'a'
     expr = assign.children[0]
-    assert expr.type == 'BinOp'
+    assert expr.type == 'Additive'
     assert expr.value == '+'
\ No newline at end of file
@@ -0,0 +1,54 @@
+from src.pipeline import Pipeline, FusedPass
+from src.lexer import Lexer
+from src.code_parser import Parser
+from src.obfuscator import Obfuscator
+from src.deobfuscator import Deobfuscator
+from src.code_generator import CodeGenerator
+from src.control_flow import ControlFlowObfuscator
+
+SOURCE = """int add(int left, int right) {
+    int total = left + right;
+    while (total > 10) {
+        total = total - right;
+    }
+    return total;
+}
+"""
+
+def test_fused_rename_matches_separate_passes():
+    separate = Obfuscator()
+    tree = separate.obfuscate(Parser(Lexer(SOURCE).tokenize()).parse())
+    expected_shape = CodeGenerator().generate(tree)
+
+    fused = Obfuscator()
+    names = iter(separate.identifier_map.values())
+    fused._generate_random_name = lambda length=8: next(names)
+    code = Pipeline([fused]).run(SOURCE)
+    assert fused.identifier_map == separate.identifier_map
+    assert code == expected_shape
+
+def test_round_trip_fuses_obfuscate_and_deobfuscate_into_generation():
+    original = Pipeline().run(SOURCE)
+    obfuscator = Obfuscator()
+    obfuscated = Pipeline([obfuscator]).run(SOURCE)
+    assert 'total' not in obfuscated
+    pipeline = Pipeline([Deobfuscator(obfuscator.identifier_map)])
+    steps, fused = pipeline.plan()
+    assert steps == [] and len(fused.passes) == 1
+    assert pipeline.run(obfuscated) == original
+
+def test_tree_passes_split_fused_groups():
+    obfuscator = Obfuscator()
+    control_flow = ControlFlowObfuscator(budget=1.0, seed=1)
+    steps, fused = Pipeline([obfuscator, control_flow.obfuscate, Deobfuscator({})]).plan()
+    assert isinstance(steps[0], FusedPass) and steps[1] == control_flow.obfuscate
+    assert len(fused.passes) == 1
+
+def test_minified_output_is_much_smaller_than_random_names():
+    from benchmarks.synthetic import generate_program
+    source = generate_program(functions=10, statements=20, seed=3)
+    random_code = Pipeline([Obfuscator()]).run(source)
+    minifier = Obfuscator(minify=True)
+    minified = Pipeline([minifier]).run(source)
+    assert len(minified) < 0.8 * len(random_code)
+    assert Pipeline([Deobfuscator(minifier.identifier_map)]).run(minified) == Pipeline().run(source)
@@ -0,0 +1,15 @@
+import os
+import sys
+import subprocess
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'main.py')
+
+def test_profile_report_covers_every_stage(tmp_path):
+    source = tmp_path / 'prog.c'
+    source.write_text("int main() {\n    int a = 5;\n    return a;\n}\n")
+    subprocess.run([sys.executable, MAIN, str(source), '--profile', 'report.txt'],
+                   cwd=tmp_path, capture_output=True, text=True, check=True)
+    report = (tmp_path / 'report.txt').read_text()
+    for stage in ('lex', 'parse', 'obfuscate', 'generate', 'write'):
+        assert f"== {stage}: top" in report
+    assert 'tokenize' in report
@@ -0,0 +1,62 @@
+from collections import Counter
+from src.hooks import StageHook, StageHooks
+from src.obfuscator import Obfuscator
+from src.batch import collect_sources, obfuscate_files
+from src.project import HeaderCache
+
+class ParseCounter(StageHook):
+    def __init__(self):
+        self.counts = Counter()
+
+    def after_stage(self, stage, info):
+        if stage == 'parse':
+            self.counts[info['path']] += 1
+
+def make_project(root):
+    (root / "src").mkdir()
+    (root / "include").mkdir()
+    (root / "include" / "config.h").write_text("int scale(int value);\n")
+    (root / "include" / "util.h").write_text('#include "config.h"\nint counter;\nint add(int left, int right);\n')
+    (root / "src" / "a.c").write_text(
+        '#include <stdio.h>\n#include "util.h"\nint add(int left, int right) {\n    return left + right;\n}\n')
+    for name in ("b.c", "c.c", "d.c"):
+        (root / "src" / name).write_text(
+            '#include "util.h"\nint run() {\n    counter = add(1, scale(2));\n    return counter;\n}\n')
+
+def test_headers_are_parsed_once_and_names_match_across_files(tmp_path):
+    make_project(tmp_path)
+    obfuscator = Obfuscator()
+    counter = ParseCounter()
+    hooks = StageHooks([counter])
+    out = tmp_path / "out"
+    headers = HeaderCache(obfuscator, str(out), [str(tmp_path)], [str(tmp_path / "include")], hooks)
+
+    sources = collect_sources([str(tmp_path / "src")])
+    results = list(obfuscate_files(sources, str(out), obfuscator, 3, hooks=hooks, headers=headers))
+    assert all(error is None for _, _, _, error in results)
+
+    header_counts = {path: n for path, n in counter.counts.items() if path.endswith('.h')}
+    assert sorted(header_counts.values()) == [1, 1]
+    util = headers.headers[str((tmp_path / "include" / "util.h").resolve())]
+    assert [header.path for header in util.includes] == [str((tmp_path / "include" / "config.h").resolve())]
+
+    names = obfuscator.identifier_map
+    header_code = (out / "include" / "util.h").read_text()
+    assert header_code.startswith('#include "config.h"\n')
+    assert f"int {names['add']}(int" in header_code
+    for name in ("b.c", "c.c", "d.c"):
+        code = (out / name).read_text()
+        assert f"{names['counter']} = {names['add']}(1, {names['scale']}(2));" in code
+
+def test_broken_header_fails_every_includer_without_reparsing(tmp_path):
+    (tmp_path / "bad.h").write_text("int = ;\n")
+    for name in ("a.c", "b.c"):
+        (tmp_path / name).write_text('#include "bad.h"\nint x = 1;\n')
+    counter = ParseCounter()
+    hooks = StageHooks([counter])
+    obfuscator = Obfuscator()
+    headers = HeaderCache(obfuscator, str(tmp_path / "out"), [str(tmp_path)], hooks=hooks)
+    results = list(obfuscate_files(collect_sources([str(tmp_path)]), str(tmp_path / "out"),
+                                   obfuscator, 2, hooks=hooks, headers=headers))
+    assert [error is not None and 'bad.h' in error for _, _, _, error in results] == [True, True]
+    assert counter.counts[str((tmp_path / "bad.h").resolve())] == 1
@@ -0,0 +1,42 @@
+import io
+import json
+import pytest
+from src.server import WorkerServer
+
+def run(server, *requests):
+    infile = io.StringIO(''.join(json.dumps(r) + '\n' for r in requests) + 'not json\n')
+    outfile = io.StringIO()
+    server.serve(infile, outfile)
+    return [json.loads(line) for line in outfile.getvalue().splitlines()]
+
+def test_requests_share_one_identifier_map(tmp_path):
+    source = tmp_path / "b.c"
+    source.write_text("int total = 1;\n")
+    map_path = tmp_path / "identifier_map.json"
+    server = WorkerServer(map_path=str(map_path))
+
+    first, second, third, fourth, invalid = run(
+        server,
+        {'id': 1, 'op': 'obfuscate', 'source': "int total = 0;\nint count = total;\n"},
+        {'id': 2, 'op': 'obfuscate', 'path': str(source), 'output': str(tmp_path / "obf_b.c")},
+        {'id': 3, 'op': 'deobfuscate', 'path': str(tmp_path / "obf_b.c")},
+        {'id': 4, 'op': 'compile'},
+    )
+
+    identifier_map = json.loads(map_path.read_text())
+    assert first['ok'] and identifier_map['total'] in first['code']
+    assert second['ok'] and second['output'] == str(tmp_path / "obf_b.c")
+    assert identifier_map['total'] in (tmp_path / "obf_b.c").read_text()
+    assert third['code'] == "int total = 1;\n"
+    assert fourth == {'id': 4, 'ok': False, 'error': "ValueError: Unknown op 'compile'.", 'ms': fourth['ms']}
+    assert invalid['ok'] is False
+
+def test_deobfuscate_with_a_map_file(tmp_path):
+    map_path = tmp_path / "other.json"
+    map_path.write_text(json.dumps({'total': 'Xy_12345'}))
+    server = WorkerServer()
+    request = {'op': 'deobfuscate', 'source': "int Xy_12345 = 1;\n", 'map': str(map_path)}
+    first = server.handle(request)
+    second = server.handle(dict(request, mode='ast'))
+    assert first['code'] == second['code'] == "int total = 1;\n"
+    assert (server.deobfuscators.hits, server.deobfuscators.misses) == (1, 1)
@@ -0,0 +1,34 @@
+import pytest
+from src.lexer import Lexer
+from src.code_parser import Parser
+from src.obfuscator import Obfuscator
+from src.deobfuscator import Deobfuscator
+from src.verify import find_mismatch
+
+SOURCE = "int f(int x) { int y = x + 1; return y; }"
+
+def parse(source):
+    return Parser(Lexer(source).tokenize()).parse()
+
+def test_round_trip_verifies():
+    ast = parse(SOURCE)
+    expected = ast.hash_tree()
+    obfuscator = Obfuscator()
+    obfuscator.obfuscate(ast)
+    assert find_mismatch(expected, ast) is not None
+    assert find_mismatch(expected, Deobfuscator(obfuscator.identifier_map).deobfuscate(ast)) is None
+
+def test_mismatch_points_at_changed_subtree():
+    expected = parse(SOURCE).hash_tree()
+    changed = parse("int f(int x) { int y = x + 2; return y; }")
+    assert find_mismatch(expected, changed) == (
+        'Program', 'FunctionDeclaration', 'Body', 'Declaration', 'Assignment', 'Additive', 'Number')
+
+def test_minified_round_trip_leaves_literals_alone():
+    ast = parse('int x = 1; int main() { printf("a"); x = x + 1; return x; }')
+    expected = ast.hash_tree()
+    obfuscator = Obfuscator(minify=True)
+    obfuscator.obfuscate(ast)
+    assert 'a' in obfuscator.identifier_map.values()
+    deobfuscated = Deobfuscator(obfuscator.identifier_map).deobfuscate(ast)
+    assert find_mismatch(expected, deobfuscated) is None
@@ -0,0 +1,68 @@
+import os
+import json
+import pytest
+from src.watch import Watcher
+
+def test_poll_only_reprocesses_changed_files(tmp_path):
+    source_dir = tmp_path / "proj"
+    source_dir.mkdir()
+    (source_dir / "a.c").write_text("int alpha = 1;\n")
+    (source_dir / "b.c").write_text("int beta = 2;\n")
+    map_path = tmp_path / "identifier_map.json"
+    watcher = Watcher([str(source_dir)], str(tmp_path / "out"), map_path=str(map_path))
+
+    first = watcher.poll_once()
+    assert sorted(os.path.basename(r[0]) for r in first) == ["a.c", "b.c"]
+    assert watcher.poll_once() == []
+    alpha = json.loads(map_path.read_text())['alpha']
+
+    b_output = os.stat(tmp_path / "out" / "b.c").st_mtime_ns
+    (source_dir / "a.c").write_text("int alpha = 1;\nint gamma = alpha;\n")
+    stat = os.stat(source_dir / "a.c")
+    os.utime(source_dir / "a.c", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    second = watcher.poll_once()
+    assert [os.path.basename(r[0]) for r in second] == ["a.c"]
+    assert os.stat(tmp_path / "out" / "b.c").st_mtime_ns == b_output
+    output = (tmp_path / "out" / "a.c").read_text()
+    assert alpha in output
+    assert 'gamma' in json.loads(map_path.read_text())
+
+def test_watch_keeps_function_fragments_between_runs(tmp_path):
+    source = tmp_path / "a.c"
+    source.write_text("int f() {\n    return 1;\n}\nint g() {\n    return 2;\n}\n")
+    fragments = tmp_path / "fragments.json"
+    watcher = Watcher([str(source)], str(tmp_path / "out"), map_path=str(tmp_path / "map.json"),
+                      fragment_path=str(fragments))
+    watcher.poll_once()
+    assert watcher.generator.regenerated == 2
+    assert len(json.loads(fragments.read_text())['fragments']) == 2
+
+    source.write_text("int f() {\n    return 1;\n}\nint g() {\n    return 3;\n}\n")
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    watcher.poll_once()
+    assert (watcher.generator.reused, watcher.generator.regenerated) == (1, 1)
+    assert "return 3;" in (tmp_path / "out" / "a.c").read_text()
+
+def test_names_declared_in_another_file_are_renamed_in_every_order(tmp_path):
+    source_dir = tmp_path / "proj"
+    source_dir.mkdir()
+    (source_dir / "use.c").write_text("int show() {\n    return limit;\n}\n")
+    (source_dir / "defs.c").write_text("int limit = 3;\n")
+    watcher = Watcher([str(source_dir)], str(tmp_path / "out"), map_path=str(tmp_path / "map.json"))
+    watcher.poll_once()
+    use = (tmp_path / "out" / "use.c").read_text()
+    assert 'limit' not in use and watcher.obfuscator.identifier_map['limit'] in use
+
+    later_dir = tmp_path / "later"
+    later_dir.mkdir()
+    (later_dir / "use.c").write_text("int show() {\n    return limit;\n}\n")
+    watcher = Watcher([str(later_dir)], str(tmp_path / "later_out"), map_path=str(tmp_path / "later_map.json"))
+    watcher.poll_once()
+    assert 'limit' in (tmp_path / "later_out" / "use.c").read_text()
+    (later_dir / "defs.c").write_text("int limit = 3;\n")
+    results = watcher.poll_once()
+    assert sorted(os.path.basename(r[0]) for r in results) == ["defs.c", "use.c"]
+    use = (tmp_path / "later_out" / "use.c").read_text()
+    assert 'limit' not in use and watcher.obfuscator.identifier_map['limit'] in use
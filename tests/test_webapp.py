@@ -0,0 +1,191 @@
+import io
+import os
+import sys
+import time
+import json
+import zipfile
+import importlib.util
+import pytest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'webapp', 'app.py')
+SOURCE = b"int main() {\n    int a = 5;\n    return a;\n}\n"
+
+@pytest.fixture(scope='module')
+def webapp(tmp_path_factory):
+    # app.py opens app.log in the working directory at import time
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('webapp'))
+    try:
+        spec = importlib.util.spec_from_file_location('webapp_app', APP_PATH)
+        module = importlib.util.module_from_spec(spec)
+        # Flask finds templates relative to the registered module's file
+        sys.modules['webapp_app'] = module
+        spec.loader.exec_module(module)
+    finally:
+        os.chdir(cwd)
+    module.app.config['TESTING'] = True
+    return module
+
+def test_obfuscate_archive_is_built_in_memory(webapp, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = webapp.app.test_client()
+    response = client.post('/obfuscate', data={'source_file': (io.BytesIO(SOURCE), 'prog.c')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    link = '/download_zip/' + response.get_data(as_text=True).split('/download_zip/')[1].split('"')[0]
+    download = client.get(link)
+    assert download.mimetype == 'application/zip'
+    assert 'obfuscated_code.zip' in download.headers['Content-Disposition']
+    with zipfile.ZipFile(io.BytesIO(download.data)) as archive:
+        assert sorted(archive.namelist()) == ['identifier_map.json', 'obfuscated_code.c']
+    assert os.listdir(tmp_path) == []
+
+def _wait_for_job(client, job):
+    for _ in range(200):
+        state = client.get(job['status_url']).get_json()
+        if state['status'] in ('done', 'failed'):
+            return state['status']
+        time.sleep(0.05)
+    raise AssertionError('job did not finish')
+
+def test_background_obfuscation_job(webapp):
+    client = webapp.app.test_client()
+    response = client.post('/jobs/obfuscate', data={'source_file': (io.BytesIO(SOURCE), 'prog.c')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 202
+    job = response.get_json()
+    assert _wait_for_job(client, job) == 'done'
+    result = client.get(job['result_url']).get_json()
+    assert result['kind'] == 'obfuscate' and 'return' in result['code']
+    download = client.get(result['download_link'])
+    with zipfile.ZipFile(io.BytesIO(download.data)) as archive:
+        assert sorted(archive.namelist()) == ['identifier_map.json', 'obfuscated_code.c']
+
+def test_job_with_unparseable_input_is_a_client_error(webapp):
+    client = webapp.app.test_client()
+    response = client.post('/jobs/obfuscate', data={'source_file': (io.BytesIO(b"int main( {"), 'prog.c')},
+                           content_type='multipart/form-data')
+    job = response.get_json()
+    assert _wait_for_job(client, job) == 'failed'
+    assert client.get(job['result_url']).status_code == 422
+
+def test_deobfuscation_jobs_reuse_a_cached_deobfuscator(webapp):
+    client = webapp.app.test_client()
+    result = client.post('/api/obfuscate', json={'source': SOURCE.decode()}).get_json()
+    map_bytes = json.dumps(result['identifier_map'], sort_keys=True).encode()
+    for _ in range(2):
+        response = client.post('/jobs/deobfuscate', data={
+            'obf_file': (io.BytesIO(result['code'].encode()), 'prog.c'),
+            'map_file': (io.BytesIO(map_bytes), 'map.json'),
+        }, content_type='multipart/form-data')
+        job = response.get_json()
+        assert _wait_for_job(client, job) == 'done'
+        assert 'int a = 5;' in client.get(job['result_url']).get_json()['code']
+    assert map_bytes in webapp.DEOBFUSCATORS
+
+def test_full_job_queue_answers_503(webapp, monkeypatch):
+    def full(*args, **kwargs):
+        raise webapp.QueueFull()
+    monkeypatch.setattr(webapp.JOBS, 'submit', full)
+    response = webapp.app.test_client().post('/jobs/obfuscate', data={'source_file': (io.BytesIO(SOURCE), 'prog.c')},
+                                             content_type='multipart/form-data')
+    assert response.status_code == 503
+    assert response.headers['Retry-After']
+
+def test_api_obfuscate_returns_only_requested_artifacts(webapp):
+    client = webapp.app.test_client()
+    response = client.post('/api/obfuscate', json={'source': SOURCE.decode(), 'include': ['code']})
+    assert response.status_code == 200
+    assert list(response.get_json()) == ['code']
+
+    response = client.post('/api/obfuscate', json={'source': SOURCE.decode()})
+    result = response.get_json()
+    assert sorted(result) == ['code', 'identifier_map']
+    restored = client.post('/api/deobfuscate', json={'source': result['code'],
+                                                     'identifier_map': result['identifier_map']})
+    assert 'int a = 5;' in restored.get_json()['code']
+
+def test_uploaded_maps_reuse_a_cached_deobfuscator(webapp):
+    client = webapp.app.test_client()
+    result = client.post('/api/obfuscate', json={'source': SOURCE.decode()}).get_json()
+    map_bytes = json.dumps(result['identifier_map']).encode()
+    for _ in range(2):
+        response = client.post('/api/deobfuscate', data={
+            'obf_file': (io.BytesIO(result['code'].encode()), 'prog.c'),
+            'map_file': (io.BytesIO(map_bytes), 'map.json'),
+        }, content_type='multipart/form-data')
+        assert 'int a = 5;' in response.get_json()['code']
+    assert map_bytes in webapp.DEOBFUSCATORS
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'obfuscator_deobfuscator_cache_total{kind="hit"}' in text
+
+def test_truncated_binary_map_is_a_client_error(webapp):
+    client = webapp.app.test_client()
+    response = client.post('/api/deobfuscate', data={
+        'obf_file': (io.BytesIO(b"int Ab3_xyzw;"), 'prog.c'),
+        'map_file': (io.BytesIO(b'CIDMAP1\0\x01'), 'map.cidmap'),
+    }, content_type='multipart/form-data')
+    assert response.status_code == 400
+
+def test_api_obfuscate_reports_parse_errors(webapp):
+    response = webapp.app.test_client().post('/api/obfuscate', json={'source': 'int main( {'})
+    assert response.status_code == 422
+    assert 'error' in response.get_json()
+
+def test_api_batch_shares_one_identifier_map(webapp):
+    upload = io.BytesIO()
+    with zipfile.ZipFile(upload, 'w') as archive:
+        archive.writestr('a.c', 'int total = 1;\n')
+        archive.writestr('lib/b.c', 'int f() {\n    total = 2;\n    return total;\n}\n')
+    upload.seek(0)
+    response = webapp.app.test_client().post('/api/obfuscate/batch', data={'archive': (upload, 'src.zip')},
+                                             content_type='multipart/form-data')
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+        assert sorted(archive.namelist()) == ['a.c', 'identifier_map.json', 'lib/b.c']
+        identifier_map = json.loads(archive.read('identifier_map.json'))
+        assert identifier_map['total'] in archive.read('lib/b.c').decode()
+
+def test_api_batch_renames_names_declared_in_a_later_member(webapp):
+    upload = io.BytesIO()
+    with zipfile.ZipFile(upload, 'w') as archive:
+        archive.writestr('lib/b.c', 'int f() {\n    return total + 1;\n}\n')
+        archive.writestr('a.c', 'int total = 1;\n')
+    upload.seek(0)
+    response = webapp.app.test_client().post('/api/obfuscate/batch', data={'archive': (upload, 'src.zip')},
+                                             content_type='multipart/form-data')
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+        identifier_map = json.loads(archive.read('identifier_map.json'))
+        use = archive.read('lib/b.c').decode()
+        assert 'total' not in use and identifier_map['total'] in use
+
+def test_metrics_endpoint_reports_stage_latencies(webapp):
+    client = webapp.app.test_client()
+    client.post('/api/obfuscate', json={'source': SOURCE.decode()})
+    response = client.get('/metrics')
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    for stage in ('lex', 'parse', 'obfuscate', 'generate'):
+        assert f'obfuscator_stage_seconds_count{{stage="{stage}"}}' in text
+    assert 'obfuscator_input_chars_total{kind="source"}' in text
+
+def test_result_page_loads_tokens_and_tree_in_pages(webapp):
+    client = webapp.app.test_client()
+    response = client.post('/obfuscate', data={'source_file': (io.BytesIO(SOURCE), 'prog.c')},
+                           content_type='multipart/form-data')
+    page = response.get_data(as_text=True)
+    assert '<td>' not in page
+    result_id = page.split('/results/')[1].split('/')[0]
+
+    first = client.get(f'/results/{result_id}/tokens?limit=3').get_json()
+    assert [token['value'] for token in first['tokens']] == ['int', 'main', '(']
+    rest = client.get(f'/results/{result_id}/tokens?offset=3&limit=1000').get_json()
+    assert len(first['tokens']) + len(rest['tokens']) == first['total']
+
+    root = client.get(f'/results/{result_id}/tree?limit=0').get_json()
+    assert root['type'] == 'Program' and root['child_count'] == 1 and root['children'] == []
+    function = client.get(f'/results/{result_id}/tree?path=0').get_json()
+    assert function['value'] == 'main'
+    assert [child['path'] for child in function['children']] == ['0.0', '0.1', '0.2']
+    assert client.get(f'/results/{result_id}/tree?path=0.-1').status_code == 404
@@ -1,11 +1,14 @@
 # webapp/app.py
 
+import io
 import os
 import sys
+import uuid
 import logging
-import tempfile
+import threading
 import zipfile
 import json
+from collections import OrderedDict
 from flask import (
     Flask,
     request,
@@ -13,7 +16,8 @@ from flask import (
     send_file,
     redirect,
     url_for,
-    flash
+    flash,
+    jsonify
 )
 
 # Add the src directory to the system path
@@ -24,6 +28,11 @@ from code_parser import Parser
 from obfuscator import Obfuscator
 from deobfuscator import Deobfuscator
 from code_generator import CodeGenerator
+from jobs import JobQueue, QueueFull, InputError, run_obfuscation, run_deobfuscation
+from metrics import PipelineMetrics
+from hooks import StageHooks
+from artifacts import ArtifactStore
+from deobfuscator_cache import DeobfuscatorCache, map_digest
 
 app = Flask(__name__)
 
@@ -34,8 +43,12 @@ app = Flask(__name__)
 app.secret_key = 'your_secure_secret_key'  # Replace with a strong, random key in production
 
 # **Logging Configuration**
+# INFO by default; set OBFUSCATOR_LOG_LEVEL=DEBUG for step-by-step messages.
+# Token lists, identifier maps and parse trees are only logged when
+# OBFUSCATOR_LOG_PAYLOADS=1, since formatting them costs more than the request.
+LOG_PAYLOADS = os.environ.get('OBFUSCATOR_LOG_PAYLOADS') == '1'
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=os.environ.get('OBFUSCATOR_LOG_LEVEL', 'INFO').upper(),
     format='%(asctime)s %(levelname)s: %(message)s',
     handlers=[
         logging.FileHandler("app.log"),  # Logs to a file named app.log
@@ -44,9 +57,50 @@ logging.basicConfig(
 )
 
 # **Upload Configuration**
-UPLOAD_FOLDER = tempfile.gettempdir()  # Temporary directory for file uploads
-ALLOWED_EXTENSIONS = {'c', 'json'}      # Allowed file extensions
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+ALLOWED_EXTENSIONS = {'c', 'json', 'cidmap'}      # Allowed file extensions
+
+# **Generated Archives**
+# ZIP archives are built and kept in memory under unique ids until downloaded;
+# nothing touches disk. Archives idle for ARTIFACT_TTL seconds expire, and the
+# least recently used are evicted to stay under ARTIFACT_MAX_BYTES.
+ARTIFACT_TTL = 15 * 60
+ARTIFACT_MAX_BYTES = 256 * 1024 * 1024
+ARTIFACTS = ArtifactStore(max_bytes=ARTIFACT_MAX_BYTES, ttl=ARTIFACT_TTL)
+
+# **Compiled Deobfuscators**
+# Users upload the same few maps again and again, so deobfuscators are cached
+# by a digest of the uploaded map bytes; a repeat map skips decoding and the
+# reverse-map build entirely. Bounded by estimated size, least recently used
+# first out.
+DEOBFUSCATOR_CACHE_BYTES = 64 * 1024 * 1024
+DEOBFUSCATORS = DeobfuscatorCache(max_bytes=DEOBFUSCATOR_CACHE_BYTES)
+
+# **Parse Results**
+# Tokens of recent obfuscations, kept so the result page can page through them
+# (and a lazily built parse tree) instead of receiving everything inline.
+PARSE_RESULTS = OrderedDict()
+PARSE_RESULTS_LOCK = threading.Lock()
+MAX_PARSE_RESULTS = 32
+TOKEN_PAGE_SIZE = 200
+TREE_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# **Background Jobs**
+# Large uploads run in a small local process pool; when it is saturated new
+# submissions are turned away with 503 instead of piling up.
+JOBS = JobQueue(max_workers=2, max_pending=8)
+JOB_RETRY_AFTER = 2  # Seconds clients should wait before resubmitting to a full queue
+
+# **JSON API**
+API_ARTIFACTS = {'code', 'identifier_map', 'tokens', 'parse_tree'}
+API_DEFAULT_ARTIFACTS = ['code', 'identifier_map']
+MAX_BATCH_BYTES = 64 * 1024 * 1024  # Uncompressed size limit for batch archives
+
+# **Metrics**
+# Every pipeline stage runs inside HOOKS.stage(); the metrics hook turns those
+# into per-stage latency histograms, served at /metrics with input-size counters.
+METRICS = PipelineMetrics()
+HOOKS = StageHooks([METRICS])
 
 def allowed_file(filename):
     """
@@ -61,6 +115,96 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def build_zip(entries):
+    """
+    Build a ZIP archive in memory.
+
+    Args:
+        entries (dict): Archive member names mapped to their text contents.
+
+    Returns:
+        bytes: The complete ZIP archive.
+    """
+    buffer = io.BytesIO()
+    with HOOKS.stage('zip'):
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            for arcname, text in entries.items():
+                zipf.writestr(arcname, text)
+    return buffer.getvalue()
+
+def store_artifact(filename, data, artifact_id=None):
+    """
+    Keep a generated archive available for the download route.
+
+    Args:
+        filename (str): The download name of the archive.
+        data (bytes): The archive contents.
+        artifact_id (str, optional): Key to store under, e.g. a job id; a new
+            unique id by default.
+
+    Returns:
+        str: The id to pass to the download route.
+    """
+    return ARTIFACTS.put(data, filename, artifact_id)
+
+def cached_deobfuscator(map_bytes):
+    """
+    Return the deobfuscator for an uploaded map, reusing a cached one when
+    the same map bytes were seen before.
+
+    Args:
+        map_bytes (bytes): The uploaded JSON or binary map.
+
+    Returns:
+        Deobfuscator: A shared deobfuscator for the map.
+
+    Raises:
+        ValueError: If the upload is neither a valid JSON nor a valid binary map.
+    """
+    METRICS.count('input_bytes', 'identifier_map', len(map_bytes))
+    deobfuscator, cached = DEOBFUSCATORS.get(map_bytes)
+    METRICS.count('deobfuscator_cache', 'hit' if cached else 'miss')
+    return deobfuscator
+
+def cache_parse_result(tokens):
+    """
+    Keep a token list for the paginated result views, evicting the least
+    recently used result once MAX_PARSE_RESULTS are held.
+
+    Args:
+        tokens (list): Tokens from the Lexer.
+
+    Returns:
+        str: The result id for the /results routes.
+    """
+    result_id = uuid.uuid4().hex
+    with PARSE_RESULTS_LOCK:
+        PARSE_RESULTS[result_id] = {'tokens': tokens, 'ast': None}
+        while len(PARSE_RESULTS) > MAX_PARSE_RESULTS:
+            PARSE_RESULTS.popitem(last=False)
+    return result_id
+
+def get_parse_result(result_id):
+    """
+    Look up a cached parse result and mark it recently used.
+
+    Returns:
+        dict or None: The cached tokens and parse tree, or None if evicted.
+    """
+    with PARSE_RESULTS_LOCK:
+        entry = PARSE_RESULTS.get(result_id)
+        if entry is not None:
+            PARSE_RESULTS.move_to_end(result_id)
+        return entry
+
+def page_args(default_limit):
+    """
+    Read 'offset' and 'limit' query parameters, clamped to sane bounds.
+    """
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', default_limit, type=int), 0), MAX_PAGE_SIZE)
+    return offset, limit
+
 @app.route('/')
 def home():
     """
@@ -100,32 +244,40 @@ def obfuscate():
         try:
             # Read and decode the source code from the uploaded file
             source_code = file.read().decode('utf-8')
+            METRICS.count('input_chars', 'source', len(source_code))
             logging.debug("Source Code Received for Obfuscation.")
             
             # **Obfuscation Process**
-            lexer = Lexer(source_code)
-            tokens = lexer.tokenize()
-            logging.debug(f"Tokenization Complete. Tokens: {tokens}")
+            with HOOKS.stage('lex'):
+                lexer = Lexer(source_code)
+                tokens = lexer.tokenize()
+            METRICS.count('input_tokens', 'source', len(tokens))
+            logging.debug("Tokenization Complete.")
+            if LOG_PAYLOADS:
+                logging.debug("Tokens: %s", tokens)
             
-            parser = Parser(tokens)
-            ast = parser.parse()
+            with HOOKS.stage('parse'):
+                parser = Parser(tokens)
+                ast = parser.parse()
             logging.debug("Parsing Complete. AST Generated.")
             
-            obfuscator = Obfuscator()
-            obf_ast = obfuscator.obfuscate(ast)
+            with HOOKS.stage('obfuscate'):
+                obfuscator = Obfuscator()
+                obf_ast = obfuscator.obfuscate(ast)
             logging.debug("Obfuscation Complete.")
             
             # Store the identifier_map for deobfuscation
             identifier_map = obfuscator.identifier_map
-            logging.debug(f"Identifier Map: {identifier_map}")
+            if LOG_PAYLOADS:
+                logging.debug("Identifier Map: %s", identifier_map)
             
-            generator = CodeGenerator()
-            obf_code = generator.generate(obf_ast)
+            with HOOKS.stage('generate'):
+                generator = CodeGenerator()
+                obf_code = generator.generate(obf_ast)
             logging.debug("Code Generation Complete.")
             
-            # Generate Parse Tree for visualization or analysis
-            parse_tree = parser.get_parse_tree()
-            logging.debug("Parse Tree Generated.")
+            # Tokens (and the parse tree, built on first request) are served by the /results routes
+            result_id = cache_parse_result(tokens)
             
             # **File Handling**
             # Define filenames for the obfuscated code and identifier map
@@ -133,41 +285,20 @@ def obfuscate():
             identifier_map_filename = 'identifier_map.json'
             zip_filename = 'obfuscated_code.zip'
             
-            # Write obfuscated code to a temporary file
-            with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.c') as obf_file:
-                obf_file.write(obf_code)
-                obf_filepath = obf_file.name
-            logging.debug(f"Obfuscated code written to {obf_filepath}")
-            
-            # Serialize the identifier_map to JSON and write to a temporary file
-            with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as map_file:
-                json.dump(identifier_map, map_file, indent=4)
-                identifier_map_path = map_file.name
-            logging.debug(f"Identifier map written to {identifier_map_path}")
-            
-            # **Create ZIP Archive**
-            zip_path = os.path.join(app.config['UPLOAD_FOLDER'], zip_filename)
-            with zipfile.ZipFile(zip_path, 'w') as zipf:
-                zipf.write(obf_filepath, arcname=obf_filename)
-                zipf.write(identifier_map_path, arcname=identifier_map_filename)
-            logging.debug(f"ZIP Archive Created at {zip_path}")
-            
-            # **Clean Up Temporary Files**
-            os.remove(obf_filepath)
-            os.remove(identifier_map_path)
-            logging.debug("Temporary Files Removed.")
-            
-            # **Serialize parse_tree for JSON**
-            parse_tree_json = json.dumps(parse_tree, indent=4)
-            logging.debug(f"Serialized Parse Tree: {parse_tree_json}")
+            # **Create ZIP Archive in Memory**
+            artifact_id = store_artifact(zip_filename, build_zip({
+                obf_filename: obf_code,
+                identifier_map_filename: json.dumps(identifier_map, indent=4)
+            }))
+            logging.debug(f"ZIP Archive Created in memory as {zip_filename} ({artifact_id})")
             
             # **Render Template with Results**
-            return render_template(
-                'index.html',
-                tokens=tokens,
-                parse_tree=parse_tree_json,                # Pass as JSON string
-                download_link=url_for('download_zip', filename=zip_filename)
-            )
+            with HOOKS.stage('render'):
+                return render_template(
+                    'index.html',
+                    result_id=result_id,
+                    download_link=url_for('download_zip', artifact_id=artifact_id)
+                )
         
         except Exception as e:
             logging.exception('Obfuscation failed.')
@@ -207,6 +338,7 @@ def deobfuscate():
         try:
             # Read and decode the obfuscated code from the uploaded file
             obf_code = obf_file.read().decode('utf-8')
+            METRICS.count('input_chars', 'obfuscated', len(obf_code))
             logging.debug("Obfuscated Code Received for Deobfuscation.")
         except UnicodeDecodeError:
             logging.error("Failed to decode the obfuscated file.")
@@ -214,58 +346,61 @@ def deobfuscate():
             return redirect(request.url)
         
         try:
-            # Load the identifier_map from the uploaded JSON file
-            identifier_map = json.loads(map_file.read().decode('utf-8'))
-            logging.debug(f"Identifier Map Received: {identifier_map}")
-        except json.JSONDecodeError:
+            # Load the identifier_map from the uploaded JSON or binary file,
+            # or reuse the deobfuscator already built from the same bytes
+            deobfuscator = cached_deobfuscator(map_file.read())
+            if LOG_PAYLOADS:
+                logging.debug("Reverse Identifier Map: %s", deobfuscator.reverse_map)
+        except (json.JSONDecodeError, UnicodeDecodeError, ValueError):
             logging.error("Invalid identifier mapping file.")
             flash('Invalid identifier mapping file. Please provide a valid JSON file.')
             return redirect(request.url)
         
         # **Deobfuscation Process**
         try:
-            lexer = Lexer(obf_code)
-            obf_tokens = lexer.tokenize()
-            logging.debug(f"Tokenization Complete. Tokens: {obf_tokens}")
-            
-            parser = Parser(obf_tokens)
-            obf_ast = parser.parse()
-            logging.debug("Parsing Complete. AST Generated.")
-            
-            deobfuscator = Deobfuscator(identifier_map)
-            deobf_ast = deobfuscator.deobfuscate(obf_ast)
-            logging.debug("Deobfuscation Complete.")
-            
-            generator = CodeGenerator()
-            original_code = generator.generate(deobf_ast)
-            logging.debug("Original Code Generation Complete.")
+            if request.form.get('preserve_formatting'):
+                # Token-level fast path: no parser, original layout kept
+                with HOOKS.stage('deobfuscate'):
+                    original_code = deobfuscator.deobfuscate_source(obf_code)
+                logging.debug("Token-Level Deobfuscation Complete.")
+            else:
+                with HOOKS.stage('lex'):
+                    lexer = Lexer(obf_code)
+                    obf_tokens = lexer.tokenize()
+                METRICS.count('input_tokens', 'obfuscated', len(obf_tokens))
+                logging.debug("Tokenization Complete.")
+                if LOG_PAYLOADS:
+                    logging.debug("Tokens: %s", obf_tokens)
+                
+                with HOOKS.stage('parse'):
+                    parser = Parser(obf_tokens)
+                    obf_ast = parser.parse()
+                logging.debug("Parsing Complete. AST Generated.")
+                
+                with HOOKS.stage('deobfuscate'):
+                    deobf_ast = deobfuscator.deobfuscate(obf_ast)
+                logging.debug("Deobfuscation Complete.")
+                
+                with HOOKS.stage('generate'):
+                    generator = CodeGenerator()
+                    original_code = generator.generate(deobf_ast)
+                logging.debug("Original Code Generation Complete.")
             
             # **File Handling**
             deobf_filename = 'deobfuscated_code.c'
             zip_filename = 'deobfuscated_code.zip'
             
-            # Write deobfuscated code to a temporary file
-            with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.c') as deobf_file:
-                deobf_file.write(original_code)
-                deobf_filepath = deobf_file.name
-            logging.debug(f"Deobfuscated code written to {deobf_filepath}")
-            
-            # **Create ZIP Archive**
-            zip_path = os.path.join(app.config['UPLOAD_FOLDER'], zip_filename)
-            with zipfile.ZipFile(zip_path, 'w') as zipf:
-                zipf.write(deobf_filepath, arcname=deobf_filename)
-            logging.debug(f"ZIP Archive Created at {zip_path}")
-            
-            # **Clean Up Temporary Files**
-            os.remove(deobf_filepath)
-            logging.debug("Temporary Files Removed.")
+            # **Create ZIP Archive in Memory**
+            artifact_id = store_artifact(zip_filename, build_zip({deobf_filename: original_code}))
+            logging.debug(f"ZIP Archive Created in memory as {zip_filename} ({artifact_id})")
             
             # **Render Template with Results**
-            return render_template(
-                'index.html',
-                original_code=original_code,
-                download_link=url_for('download_zip', filename=zip_filename)
-            )
+            with HOOKS.stage('render'):
+                return render_template(
+                    'index.html',
+                    original_code=original_code,
+                    download_link=url_for('download_zip', artifact_id=artifact_id)
+                )
         
         except Exception as e:
             logging.exception('Deobfuscation failed.')
@@ -275,29 +410,443 @@ def deobfuscate():
         flash('Invalid file types. Please ensure you upload a `.c` file and a `.json` mapping file.')
         return redirect(request.url)
 
-@app.route('/download_zip/<filename>')
-def download_zip(filename):
+@app.route('/results/<result_id>/tokens')
+def result_tokens(result_id):
+    """
+    Return one page of a cached token list.
+
+    Query parameters 'offset' and 'limit' select the page.
+
+    Returns:
+        JSON response with the total token count and the page, or 404 if the
+        result has expired.
+    """
+    entry = get_parse_result(result_id)
+    if entry is None:
+        return jsonify(error='Unknown or expired result.'), 404
+    offset, limit = page_args(TOKEN_PAGE_SIZE)
+    tokens = entry['tokens']
+    return jsonify(
+        total=len(tokens),
+        offset=offset,
+        tokens=[token._asdict() for token in tokens[offset:offset + limit]]
+    )
+
+@app.route('/results/<result_id>/tree')
+def result_tree(result_id):
+    """
+    Return one parse-tree node with a page of its direct children.
+
+    'path' is a dot-separated list of child indices from the root (empty for
+    the root itself); 'offset' and 'limit' page through the children. Each
+    child carries its own path and child count so it can be expanded later.
+    The tree is parsed from the cached tokens on first request.
+
+    Returns:
+        JSON response with the node, or 404 if the result has expired or the
+        path does not exist.
+    """
+    entry = get_parse_result(result_id)
+    if entry is None:
+        return jsonify(error='Unknown or expired result.'), 404
+    if entry['ast'] is None:
+        with HOOKS.stage('parse'):
+            entry['ast'] = Parser(entry['tokens']).parse()
+
+    path = request.args.get('path', '')
+    node = entry['ast']
+    try:
+        for index in path.split('.') if path else []:
+            if not index.isdigit():
+                raise ValueError(index)
+            node = node.children[int(index)]
+    except (ValueError, IndexError):
+        return jsonify(error=f'No node at path {path!r}.'), 404
+
+    offset, limit = page_args(TREE_PAGE_SIZE)
+    prefix = f'{path}.' if path else ''
+    children = []
+    for index, child in enumerate(node.children[offset:offset + limit], start=offset):
+        child_dict = child.to_dict(depth=0)
+        child_dict['path'] = f'{prefix}{index}'
+        children.append(child_dict)
+    return jsonify(
+        type=node.type,
+        value=node.value,
+        path=path,
+        child_count=len(node.children),
+        offset=offset,
+        children=children
+    )
+
+def submit_job(kind, func, *args, fallback=None):
+    """
+    Queue a background job and describe where to poll for it; see
+    JobQueue.submit for the fallback arguments.
+
+    Returns:
+        JSON response: 202 with the job id and its status/result URLs, or
+        503 with a Retry-After header when the queue is full.
+    """
+    try:
+        job_id = JOBS.submit(kind, func, *args, fallback=fallback)
+    except QueueFull:
+        logging.warning(f"Job queue full; rejected {kind} job.")
+        response = jsonify(error='The server is busy. Please try again shortly.')
+        response.status_code = 503
+        response.headers['Retry-After'] = str(JOB_RETRY_AFTER)
+        return response
+    logging.debug(f"Queued {kind} job {job_id}.")
+    return jsonify(
+        job_id=job_id,
+        status='queued',
+        status_url=url_for('job_status', job_id=job_id),
+        result_url=url_for('job_result', job_id=job_id)
+    ), 202
+
+@app.route('/jobs/obfuscate', methods=['POST'])
+def submit_obfuscation_job():
+    """
+    Queue obfuscation of an uploaded source file.
+
+    Returns:
+        JSON response from submit_job, or 400 if the upload is invalid.
+    """
+    file = request.files.get('source_file')
+    if file is None or file.filename == '' or not allowed_file(file.filename):
+        return jsonify(error='Please upload a `.c` source file.'), 400
+    try:
+        source_code = file.read().decode('utf-8')
+    except UnicodeDecodeError:
+        return jsonify(error='The source file is not valid UTF-8.'), 400
+    METRICS.count('input_chars', 'source', len(source_code))
+    return submit_job('obfuscate', run_obfuscation, source_code)
+
+@app.route('/jobs/deobfuscate', methods=['POST'])
+def submit_deobfuscation_job():
+    """
+    Queue deobfuscation of an uploaded file with its identifier map.
+
+    Returns:
+        JSON response from submit_job, or 400 if the uploads are invalid.
+    """
+    obf_file = request.files.get('obf_file')
+    map_file = request.files.get('map_file')
+    if obf_file is None or map_file is None or obf_file.filename == '' or map_file.filename == '' \
+            or not allowed_file(obf_file.filename) or not allowed_file(map_file.filename):
+        return jsonify(error='Please upload both the obfuscated file and the identifier mapping file.'), 400
+    try:
+        obf_code = obf_file.read().decode('utf-8')
+        map_bytes = map_file.read()
+        # Validates the map here, so a bad one is a 400 rather than a failed job
+        _, seen = DEOBFUSCATORS.get(map_bytes)
+    except (UnicodeDecodeError, ValueError):
+        return jsonify(error='Invalid obfuscated file or identifier mapping file.'), 400
+    METRICS.count('input_chars', 'obfuscated', len(obf_code))
+    METRICS.count('deobfuscator_cache', 'hit' if seen else 'miss')
+    # Workers cache deobfuscators by map digest. A map seen before is sent
+    # as its digest alone, and only re-sent to a worker that lacks it.
+    digest = map_digest(map_bytes)
+    preserve_formatting = bool(request.form.get('preserve_formatting'))
+    if not seen:
+        return submit_job('deobfuscate', run_deobfuscation, obf_code, digest, map_bytes, preserve_formatting)
+    return submit_job('deobfuscate', run_deobfuscation, obf_code, digest, None, preserve_formatting,
+                      fallback=(obf_code, digest, map_bytes, preserve_formatting))
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """
+    Report whether a job is queued, running, done or failed.
+
+    Returns:
+        JSON response with the job status, or 404 for unknown jobs.
+    """
+    status = JOBS.status(job_id)
+    if status is None:
+        return jsonify(error='Unknown job.'), 404
+    return jsonify(job_id=job_id, status=status)
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    """
+    Return a finished job's code and archive download link.
+
+    Returns:
+        JSON response: 200 with the result, 202 while the job is still pending,
+        422 if the submitted code could not be parsed, 500 if the job failed
+        for any other reason, or 404 for unknown jobs.
+    """
+    status = JOBS.status(job_id)
+    if status is None:
+        return jsonify(error='Unknown job.'), 404
+    if status in ('queued', 'running'):
+        return jsonify(job_id=job_id, status=status), 202
+    job = JOBS.get(job_id)
+    if status == 'failed':
+        error = job['future'].exception()
+        # Bad input is the client's to fix; anything else is a fault on this side
+        code = 422 if isinstance(error, InputError) else 500
+        return jsonify(job_id=job_id, status=status, error=f"{job['kind'].capitalize()} failed: {error}"), code
+
+    result = job['future'].result()
+    if not job.get('recorded'):
+        # First collection of this result: record the worker's stage timings once
+        job['recorded'] = True
+        METRICS.record(result['timings'])
+    if job_id not in ARTIFACTS:
+        # Archives are keyed by job id; rebuilt if it expired before this poll
+        if job['kind'] == 'obfuscate':
+            store_artifact('obfuscated_code.zip', build_zip({
+                'obfuscated_code.c': result['obf_code'],
+                'identifier_map.json': json.dumps(result['identifier_map'], indent=4)
+            }), job_id)
+        else:
+            store_artifact('deobfuscated_code.zip', build_zip({'deobfuscated_code.c': result['original_code']}), job_id)
+    code = result.get('obf_code', result.get('original_code'))
+    return jsonify(
+        job_id=job_id,
+        status=status,
+        kind=job['kind'],
+        code=code,
+        download_link=url_for('download_zip', artifact_id=job_id)
+    )
+
+def api_error(message, status=400, **extra):
+    """
+    Build a JSON error response for the API routes.
+    """
+    return jsonify(error=message, **extra), status
+
+def api_source(field, file_field):
+    """
+    Read source text from a JSON body field or a multipart file upload.
+
+    Returns:
+        str or None: The source text, or None if neither was supplied.
+
+    Raises:
+        UnicodeDecodeError: If an uploaded file is not UTF-8.
+    """
+    body = request.get_json(silent=True)
+    if isinstance(body, dict) and isinstance(body.get(field), str):
+        return body[field]
+    file = request.files.get(file_field)
+    if file is not None and file.filename != '':
+        return file.read().decode('utf-8')
+    return None
+
+def api_include():
+    """
+    Return the artifacts a caller asked for, from a JSON 'include' list or a
+    comma-separated 'include' query or form parameter.
+
+    Raises:
+        ValueError: If an unknown artifact is requested.
+    """
+    body = request.get_json(silent=True)
+    if isinstance(body, dict) and 'include' in body:
+        include = body['include']
+    elif 'include' in request.values:
+        include = request.values['include'].split(',')
+    else:
+        return API_DEFAULT_ARTIFACTS
+    unknown = set(include) - API_ARTIFACTS
+    if unknown:
+        raise ValueError(f"Unknown artifacts: {', '.join(sorted(unknown))}.")
+    return include
+
+@app.route('/api/obfuscate', methods=['POST'])
+def api_obfuscate():
+    """
+    Obfuscate one source file and return only the requested artifacts.
+
+    The source comes from a JSON body {"source": ...} or a 'source_file'
+    upload. 'include' selects among code, identifier_map, tokens and
+    parse_tree; code and identifier_map are returned by default.
+
+    Returns:
+        JSON response with the requested artifacts, 400 for bad input or
+        422 if the source cannot be parsed.
+    """
+    try:
+        include = api_include()
+        source_code = api_source('source', 'source_file')
+    except (ValueError, UnicodeDecodeError) as e:
+        return api_error(str(e))
+    if source_code is None:
+        return api_error('Provide "source" in a JSON body or upload "source_file".')
+
+    METRICS.count('input_chars', 'source', len(source_code))
+    try:
+        with HOOKS.stage('lex'):
+            tokens = Lexer(source_code).tokenize()
+        METRICS.count('input_tokens', 'source', len(tokens))
+        with HOOKS.stage('parse'):
+            ast = Parser(tokens).parse()
+    except RuntimeError as e:
+        return api_error(f'Parsing failed: {e}', 422)
+
+    result = {}
+    if 'tokens' in include:
+        result['tokens'] = [token._asdict() for token in tokens]
+    if 'parse_tree' in include:
+        # Taken before obfuscation renames the tree in place
+        result['parse_tree'] = ast.to_dict()
+    obfuscator = Obfuscator()
+    with HOOKS.stage('obfuscate'):
+        obfuscator.obfuscate(ast)
+    if 'code' in include:
+        with HOOKS.stage('generate'):
+            result['code'] = CodeGenerator().generate(ast)
+    if 'identifier_map' in include:
+        result['identifier_map'] = obfuscator.identifier_map
+    return jsonify(result)
+
+@app.route('/api/deobfuscate', methods=['POST'])
+def api_deobfuscate():
+    """
+    Deobfuscate one file and return the restored code.
+
+    The code comes from JSON {"source": ..., "identifier_map": {...}} or from
+    'obf_file' and 'map_file' uploads (JSON or binary maps). 'mode' is 'ast'
+    (regenerate from the parse tree, the default) or 'tokens' (rename in
+    place, keeping the original layout).
+
+    Returns:
+        JSON response {"code": ...}, 400 for bad input or 422 if the code
+        cannot be parsed.
+    """
+    body = request.get_json(silent=True)
+    try:
+        obf_code = api_source('source', 'obf_file')
+        if isinstance(body, dict) and isinstance(body.get('identifier_map'), dict):
+            deobfuscator = Deobfuscator(body['identifier_map'])
+        elif request.files.get('map_file') is not None:
+            deobfuscator = cached_deobfuscator(request.files['map_file'].read())
+        else:
+            deobfuscator = None
+    except (ValueError, UnicodeDecodeError):
+        return api_error('Invalid obfuscated file or identifier mapping file.')
+    if obf_code is None or deobfuscator is None:
+        return api_error('Provide the obfuscated source and its identifier map.')
+    mode = body.get('mode', 'ast') if isinstance(body, dict) else request.values.get('mode', 'ast')
+    if mode not in ('ast', 'tokens'):
+        return api_error(f'Unknown mode {mode!r}; use "ast" or "tokens".')
+
+    METRICS.count('input_chars', 'obfuscated', len(obf_code))
+    if mode == 'tokens':
+        with HOOKS.stage('deobfuscate'):
+            return jsonify(code=deobfuscator.deobfuscate_source(obf_code))
+    try:
+        with HOOKS.stage('lex'):
+            tokens = Lexer(obf_code).tokenize()
+        METRICS.count('input_tokens', 'obfuscated', len(tokens))
+        with HOOKS.stage('parse'):
+            ast = Parser(tokens).parse()
+    except RuntimeError as e:
+        return api_error(f'Parsing failed: {e}', 422)
+    with HOOKS.stage('deobfuscate'):
+        deobfuscator.deobfuscate(ast)
+    with HOOKS.stage('generate'):
+        return jsonify(code=CodeGenerator().generate(ast))
+
+@app.route('/api/obfuscate/batch', methods=['POST'])
+def api_obfuscate_batch():
+    """
+    Obfuscate every `.c` file in an uploaded ZIP archive against one shared
+    identifier map.
+
+    Returns:
+        A ZIP archive with each obfuscated file at its original path plus
+        identifier_map.json; 400 for a bad archive, 413 if it is too large,
+        or 422 listing the files that could not be parsed.
+    """
+    upload = request.files.get('archive')
+    if upload is None or upload.filename == '':
+        return api_error('Upload a ZIP archive of `.c` files as "archive".')
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(upload.read()))
+    except zipfile.BadZipFile:
+        return api_error('The uploaded archive is not a valid ZIP file.')
+
+    with archive:
+        members = [info for info in archive.infolist()
+                   if not info.is_dir() and info.filename.endswith('.c')]
+        if not members:
+            return api_error('The archive contains no `.c` files.')
+        if sum(info.file_size for info in members) > MAX_BATCH_BYTES:
+            return api_error('The archive is too large.', 413)
+
+        asts = {}
+        failures = {}
+        for info in members:
+            try:
+                source_code = archive.read(info).decode('utf-8')
+                METRICS.count('input_chars', 'source', len(source_code))
+                with HOOKS.stage('lex'):
+                    tokens = Lexer(source_code).tokenize()
+                METRICS.count('input_tokens', 'source', len(tokens))
+                with HOOKS.stage('parse'):
+                    asts[info.filename] = Parser(tokens).parse()
+            except (RuntimeError, UnicodeDecodeError) as e:
+                failures[info.filename] = f"{type(e).__name__}: {e}"
+
+    if failures:
+        return api_error('Some files could not be obfuscated.', 422, failures=failures)
+    obfuscator = Obfuscator()
+    generator = CodeGenerator()
+    # Map every member's names before renaming any member, so a global is
+    # renamed in the files that use it whatever their order in the archive
+    with HOOKS.stage('declare'):
+        obfuscator.rank(asts.values())
+    outputs = {}
+    for filename, ast in asts.items():
+        with HOOKS.stage('obfuscate'):
+            obfuscator.obfuscate(ast)
+        with HOOKS.stage('generate'):
+            outputs[filename] = generator.generate(ast)
+    outputs['identifier_map.json'] = json.dumps(obfuscator.identifier_map, indent=4)
+    return send_file(
+        io.BytesIO(build_zip(outputs)),
+        mimetype='application/zip',
+        as_attachment=True,
+        download_name='obfuscated_batch.zip'
+    )
+
+@app.route('/metrics')
+def metrics():
+    """
+    Expose stage latencies and input sizes for Prometheus to scrape.
+
+    Returns:
+        Plain-text response in the Prometheus exposition format.
+    """
+    return METRICS.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+@app.route('/download_zip/<artifact_id>')
+def download_zip(artifact_id):
     """
     Provide the ZIP file for download.
 
     Args:
-        filename (str): The name of the ZIP file to download.
+        artifact_id (str): The id the archive was stored under.
 
     Returns:
         send_file response to initiate the download.
     """
-    zip_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    try:
-        return send_file(
-            zip_path,
-            as_attachment=True,
-            download_name=filename
-        )
-    except Exception as e:
-        logging.exception('Download failed.')
-        flash('Download failed. Please try the operation again.')
+    artifact = ARTIFACTS.get(artifact_id)
+    if artifact is None:
+        logging.warning(f"Download requested for unknown or expired archive {artifact_id}")
+        flash('Download failed. The file may have expired; please try the operation again.')
         return redirect(url_for('home'))
+    data, filename = artifact
+    return send_file(
+        io.BytesIO(data),
+        mimetype='application/zip',
+        as_attachment=True,
+        download_name=filename
+    )
 
 if __name__ == '__main__':
     # It's recommended to set debug=False in production for security reasons
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)